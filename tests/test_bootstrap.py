@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from viroconcom.bootstrap import Bootstrap
+from viroconcom.contours import IFormContour
+
+
+class BootstrapTest(unittest.TestCase):
+
+    def setUp(self):
+        prng = np.random.RandomState(42)
+        self.sample_hs = prng.weibull(1.5, 500) * 3
+        self.sample_tz = 0.1 + 1.5 * np.exp(0.2 * self.sample_hs) + \
+            prng.lognormal(2, 0.2, 500)
+        self.dist_descriptions = (
+            {'name': 'Weibull_2p', 'dependency': (None, None, None),
+             'width_of_intervals': 2},
+            {'name': 'Lognormal', 'dependency': (None, None, 0),
+             'functions': (None, None, 'exp3')})
+
+    def test_bootstrap_contour(self):
+        """
+        Bands of an IFORM contour, reproducible and independent of workers.
+        """
+        kwargs = {'n_resamples': 6, 'contour': IFormContour,
+                  'contour_kwargs': {'return_period': 50, 'n_points': 20},
+                  'random_state': 1}
+        serial = Bootstrap((self.sample_hs, self.sample_tz),
+                           self.dist_descriptions, **kwargs)
+        parallel = Bootstrap((self.sample_hs, self.sample_tz),
+                             self.dist_descriptions, workers=2, **kwargs)
+
+        self.assertEqual(serial.n_failed, 0)
+        self.assertEqual(serial.parameters.shape, (6, len(serial.parameter_names)))
+        self.assertEqual(serial.parameter_names[0], 'dimension 0 shape')
+        self.assertEqual(serial.parameter_names[-1], 'dimension 1 scale c')
+        self.assertEqual(serial.contours.shape, (6, 2, 20))
+        self.assertEqual(serial.contour_quantiles.shape, (3, 2, 20))
+        np.testing.assert_allclose(serial.parameters, parallel.parameters)
+        lower, median, upper = serial.parameter_quantiles
+        self.assertTrue(np.all(lower <= median) and np.all(median <= upper))
+
+    def test_checkpoint(self):
+        """
+        A bootstrap resumed from its checkpoint equals an uninterrupted one.
+        """
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'bootstrap.npz')
+        complete = Bootstrap((self.sample_hs, self.sample_tz),
+                             self.dist_descriptions, n_resamples=4,
+                             random_state=3, checkpoint=path)
+        self.assertTrue(os.path.exists(path))
+        stored = dict(np.load(path))
+        stored['done'][2:] = False
+        stored['parameters'][2:] = np.nan
+        np.savez(path, **stored)
+
+        resumed = Bootstrap((self.sample_hs, self.sample_tz),
+                            self.dist_descriptions, n_resamples=4,
+                            checkpoint=path)
+        np.testing.assert_allclose(resumed.parameters, complete.parameters)
+
+        with self.assertRaises(ValueError):
+            Bootstrap((self.sample_hs, self.sample_tz), self.dist_descriptions,
+                      n_resamples=5, checkpoint=path)
+        os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from viroconcom.fitting import Fit
+from viroconcom.caching import FitCache
+
+
+class FitCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        prng = np.random.RandomState(42)
+        self.sample_1 = prng.weibull(1.5, 1000) * 3
+        self.sample_2 = 0.1 + 1.5 * np.exp(0.2 * self.sample_1) + \
+            prng.lognormal(2, 0.2, 1000)
+        self.dist_descriptions = (
+            {'name': 'Weibull_2p', 'dependency': (None, None, None),
+             'width_of_intervals': 2},
+            {'name': 'Lognormal', 'dependency': (None, None, 0),
+             'functions': (None, None, 'exp3')})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cached_fit(self):
+        """
+        A repeated fit is loaded from the cache.
+        """
+        my_fit = Fit((self.sample_1, self.sample_2), self.dist_descriptions,
+                     cache=self.directory)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+        with mock.patch.object(Fit, '_fit_serial') as fit_serial:
+            cached_fit = Fit(np.array([self.sample_1, self.sample_2]),
+                             self.dist_descriptions, cache=self.directory)
+        fit_serial.assert_not_called()
+        self.assertEqual(str(cached_fit.mul_var_dist.distributions[1].scale),
+                         str(my_fit.mul_var_dist.distributions[1].scale))
+        columns = cached_fit.multiple_fit_inspection_data[1].get_columns('scale')
+        expected = my_fit.multiple_fit_inspection_data[1].get_columns('scale')
+        for name in ('at', 'shape', 'scale', 'n_samples'):
+            np.testing.assert_allclose(columns[name], expected[name])
+
+        # The samples of the fits are the same as when fitting.
+        for dimension in range(2):
+            for param in ('shape', 'loc', 'scale'):
+                name = '{}_samples'.format(param)
+                cached_samples = getattr(
+                    cached_fit.multiple_fit_inspection_data[dimension], name)
+                samples = getattr(my_fit.multiple_fit_inspection_data[dimension], name)
+                self.assertEqual(len(cached_samples), len(samples))
+                for cached_sample, sample in zip(cached_samples, samples):
+                    np.testing.assert_array_equal(cached_sample, sample)
+        self.assertEqual(len(cached_fit.multiple_fit_inspection_data[1].scale_samples),
+                         len(columns['at']))
+        cached_fit.update((self.sample_1[:10], self.sample_2[:10]))
+
+        # Without samples the same entry is loaded.
+        with mock.patch.object(Fit, '_fit_serial') as fit_serial:
+            lean_fit = Fit((self.sample_1, self.sample_2), self.dist_descriptions,
+                           cache=self.directory, keep_samples=False)
+        fit_serial.assert_not_called()
+        self.assertIsNone(lean_fit.samples)
+        self.assertIsNone(lean_fit.multiple_fit_inspection_data[1].scale_samples[0])
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+        # Other settings or other data are fitted again.
+        Fit((self.sample_1, self.sample_2), self.dist_descriptions,
+            cache=self.directory, weights=np.full(1000, 2.0))
+        Fit((self.sample_1, self.sample_2[::-1]), self.dist_descriptions,
+            cache=self.directory)
+        self.assertEqual(len(os.listdir(self.directory)), 3)
+
+    def test_eviction(self):
+        """
+        The least recently used entries are removed.
+        """
+        cache = FitCache(self.directory, max_size=4000)
+        keys = [cache.get_key([np.arange(i + 1.0)]) for i in range(4)]
+        for i, key in enumerate(keys):
+            cache.store(key, {'values': list(range(200))})
+            os.utime(os.path.join(self.directory, key + '.json'), (i, i))
+        # Use the first entry, such that the second is the oldest.
+        self.assertIsNotNone(cache.load(keys[0]))
+        cache.store(cache.get_key([np.arange(10.0)]), {'values': list(range(200))})
+        self.assertIsNone(cache.load(keys[1]))
+        self.assertIsNotNone(cache.load(keys[0]))
+        total = sum(os.path.getsize(os.path.join(self.directory, name))
+                    for name in os.listdir(self.directory))
+        self.assertLessEqual(total, 4000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -351,6 +351,31 @@ class ContourCreationTest(unittest.TestCase):
         for r,s in [(r, s) for r in true_coordinates.index for s in true_coordinates.columns]:
           self.assertAlmostEqual(calculated_coordinates.loc[r, s], true_coordinates.loc[r, s], places=8)
 
+    def test_IForm_rosenblatt(self):
+        """
+        The points of an IFORM contour are transformed into points with the
+        radius beta.
+        """
+        mu = FunctionParam(0.1000, 1.489, 0.1901, "power3")
+        sigma = FunctionParam(0.0400, 0.1748, -0.2243, "exp3")
+        dist1 = WeibullDistribution(ConstantParam(1.471), ConstantParam(0.8888),
+                                    ConstantParam(2.776))
+        dist2 = LognormalDistribution(mu=mu, sigma=sigma)
+        mul_dist = MultivariateDistribution([dist1, dist2],
+                                            [(None, None, None), (0, None, 0)])
+
+        contour = IFormContour(mul_dist, 50, 3, 50)
+        points = np.column_stack(contour.coordinates[0])
+        u, radii = mul_dist.rosenblatt(points, chunk_size=7)
+        np.testing.assert_allclose(u, contour.sphere_points, atol=1e-8)
+        np.testing.assert_allclose(radii, contour.beta)
+
+        u_at_once, _ = mul_dist.rosenblatt(points)
+        np.testing.assert_array_equal(u, u_at_once)
+
+        with self.assertRaises(ValueError):
+            mul_dist.rosenblatt(points[:, 0])
+
     def test_IForm3d(self): # TODO what does this test do
         """
         3-dimensional IFORM contour.
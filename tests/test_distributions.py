@@ -2,12 +2,14 @@ import unittest
 
 
 import numpy as np
+import scipy.stats as sts
 
 from .context import viroconcom
 
 from viroconcom.params import ConstantParam, FunctionParam
 from viroconcom.distributions import (WeibullDistribution, LognormalDistribution, NormalDistribution,
                                    KernelDensityDistribution,
+                                   ConditionalKernelDensityDistribution,
                                    MultivariateDistribution)
 
 class MultivariateDistributionTest(unittest.TestCase):
@@ -108,6 +110,125 @@ class MultivariateDistributionTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             MultivariateDistribution(distributions, dependencies)
 
+    def test_compile(self):
+        """
+        The compiled distribution gives the same results as the
+        distributions and its transformations are inverse to each other.
+        """
+        import scipy.stats as sts
+
+        mul_dist = MultivariateDistribution(
+            [self.dist1, self.dist2], [(None, None, None), self.dependencies[1]])
+        plan = mul_dist.compile()
+
+        u = np.array([[0.5, -1.0], [2.0, 1.0], [-3.0, 0.2]])
+        points = plan.inverse_rosenblatt(u)
+        np.testing.assert_allclose(plan.rosenblatt(points), u)
+
+        rv_values = points.T
+        for dimension in range(2):
+            dist = mul_dist.distributions[dimension]
+            dependency = mul_dist.dependencies[dimension]
+            np.testing.assert_allclose(
+                plan.cdf(dimension, rv_values[dimension], rv_values),
+                dist.cdf(rv_values[dimension], rv_values, dependency))
+            np.testing.assert_allclose(
+                points[:, dimension],
+                dist.i_cdf(sts.norm.cdf(u[:, dimension]), rv_values, dependency))
+        np.testing.assert_allclose(
+            plan.joint_pdf(points),
+            np.exp(self.dist1.logpdf(rv_values[0], rv_values, (None, None, None)) +
+                   self.dist2.logpdf(rv_values[1], rv_values, self.dependencies[1])))
+
+        # The cell averaged pdf is computed with the plan, too.
+        coords = [np.arange(1, 5, 0.5), np.arange(0.5, 8, 0.5)]
+        fbar = mul_dist.cell_averaged_pdf(1, coords)
+        expected = (self.dist2.cdf(coords[1] + 0.25, [3, 0], self.dependencies[1]) -
+                    self.dist2.cdf(coords[1] - 0.25, [3, 0], self.dependencies[1])) / 0.5
+        np.testing.assert_allclose(fbar[4], expected)
+
+        with self.assertRaises(ValueError):
+            plan.rosenblatt(np.ones((3, 3)))
+        with self.assertRaises(ValueError):
+            MultivariateDistribution(
+                [WeibullDistribution(ConstantParam(-1), None, ConstantParam(1))],
+                [(None, None, None)]).compile()
+
+    def test_joint_logpdf(self):
+        """
+        The joint logpdf is the sum of the conditional logpdfs and stays
+        finite where the joint pdf is rounded to 0.
+        """
+        mul_dist = MultivariateDistribution(
+            [self.dist1, self.dist2], [(None, None, None), self.dependencies[1]])
+        points = np.array([[2, 4], [5, 6], [1.5, 1], [3, 400]])
+        rv_values = points.T
+
+        logpdf = mul_dist.logpdf(points, chunk_size=3)
+        np.testing.assert_allclose(
+            logpdf,
+            self.dist1.logpdf(rv_values[0], rv_values, (None, None, None)) +
+            self.dist2.logpdf(rv_values[1], rv_values, self.dependencies[1]))
+        np.testing.assert_array_equal(logpdf, mul_dist.logpdf(points))
+        np.testing.assert_allclose(mul_dist.pdf(points[:3]), np.exp(logpdf[:3]))
+
+        self.assertTrue(np.isfinite(logpdf[3]))
+        self.assertEqual(mul_dist.pdf(points)[3], 0)
+        # Outside of the support of the Weibull distribution.
+        self.assertEqual(mul_dist.logpdf([[0.5, 4]])[0], -np.inf)
+
+    def test_kernel_density_logpdf(self):
+        """
+        The density of kernel density distributions is the slope of their
+        interpolated cdf and can be used in the joint logpdf.
+        """
+        probabilities = np.linspace(0, 1, 201)
+        quantiles = [np.sqrt(probabilities), 1 + 2 * probabilities ** 0.75]
+        dist2 = ConditionalKernelDensityDistribution([1, 3], quantiles)
+        dependency = (None, None, 0)
+
+        x = np.linspace(-0.5, 3.5, 4001)
+        for condition in [0.5, 2, 2.7, 4]:
+            rv_values = [np.full(x.shape, condition)]
+            pdf = np.exp(dist2.logpdf(x, rv_values, dependency))
+            # The integral of the pdf is the cdf.
+            integral = np.concatenate(
+                [[0], np.cumsum((pdf[1:] + pdf[:-1]) / 2 * np.diff(x))])
+            np.testing.assert_allclose(
+                integral, dist2.cdf(x, rv_values, dependency), atol=2e-3)
+        self.assertEqual(dist2.logpdf([-0.5], [[1]], dependency)[0], -np.inf)
+
+        dist1 = KernelDensityDistribution((None, np.sqrt(probabilities)))
+        np.testing.assert_allclose(
+            np.exp(dist1.logpdf([0.25, 0.75], None, None)),
+            [0.5, 1.5], rtol=0.01)
+
+        mul_dist = MultivariateDistribution(
+            [self.dist1, dist2], [(None, None, None), dependency])
+        points = np.array([[2, 1.5], [5, 2], [1.5, 0.5]])
+        rv_values = points.T
+        np.testing.assert_allclose(
+            mul_dist.logpdf(points),
+            self.dist1.logpdf(rv_values[0], rv_values, (None, None, None)) +
+            dist2.logpdf(rv_values[1], rv_values, dependency))
+
+    def test_kernel_density_rosenblatt(self):
+        """
+        The Rosenblatt transformation of a model with a kernel density is
+        evaluated for all points at once.
+        """
+        # A uniform distribution between 0 and 4.
+        coordinates = (np.linspace(0, 1, 401), np.linspace(0, 4, 401))
+        mul_dist = MultivariateDistribution(
+            [KernelDensityDistribution(coordinates), self.dist2],
+            [(None, None, None), self.dependencies[1]])
+        expected_u = np.random.RandomState(42).uniform(-3, 3, (1000, 2))
+        points = mul_dist.compile().inverse_rosenblatt(expected_u)
+        np.testing.assert_allclose(points[:, 0], 4 * sts.norm.cdf(expected_u[:, 0]))
+
+        u, _ = mul_dist.rosenblatt(points, chunk_size=300)
+        np.testing.assert_allclose(u, expected_u, atol=1e-8)
+
     def test_latex_representation(self):
         """
         Tests if the latex representation is correct.
@@ -215,6 +336,51 @@ class ParametricDistributionTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             dist._check_parameter_value(2, np.inf)
 
+    def test_logpdf(self):
+        """
+        The logpdf equals the logpdf of scipy with the conditional parameters.
+        """
+        import scipy.stats as sts
+
+        x = np.array([0.5, 2, 4])
+        rv_values = np.array([[1, 2, 3], x])
+        scale = FunctionParam(1, 2, 0.5, "power3")
+
+        dist = WeibullDistribution(ConstantParam(1.5), None, scale)
+        np.testing.assert_allclose(
+            dist.logpdf(x, rv_values, (None, None, 0)),
+            sts.weibull_min.logpdf(x, c=1.5, scale=scale(rv_values[0])))
+
+        dist = LognormalDistribution(sigma=ConstantParam(0.3), mu=ConstantParam(1))
+        np.testing.assert_allclose(
+            dist.logpdf(x, rv_values, (None, None, None)),
+            sts.lognorm.logpdf(x, s=0.3, scale=np.exp(1)))
+
+        dist = NormalDistribution(None, ConstantParam(1), scale)
+        np.testing.assert_allclose(
+            dist.logpdf(x, rv_values, (None, None, 0)),
+            sts.norm.logpdf(x, loc=1, scale=scale(rv_values[0])))
+
+    def test_pickle(self):
+        """
+        A pickled distribution is recreated from its parameters.
+        """
+        import pickle
+
+        x = np.array([0.5, 2, 4])
+        rv_values = np.array([[1, 2, 3], x])
+        mu = FunctionParam(0.1, 1.5, 0.2, "exp3")
+        for dist in (WeibullDistribution(ConstantParam(1.5), None, ConstantParam(3)),
+                     LognormalDistribution(sigma=ConstantParam(0.3), mu=mu)):
+            restored = pickle.loads(pickle.dumps(dist))
+            self.assertEqual(restored.name, dist.name)
+            self.assertEqual(restored._valid_scale, dist._valid_scale)
+            np.testing.assert_allclose(
+                restored.cdf(x, rv_values, (None, None, 0)),
+                dist.cdf(x, rv_values, (None, None, 0)))
+        self.assertEqual(restored.mu.func_name, "exp3")
+        self.assertEqual(restored.scale.func_name, "exp3")
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
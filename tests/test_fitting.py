@@ -1,8 +1,10 @@
 import unittest
 
 import numpy as np
+import scipy.stats as sts
 
-from viroconcom.fitting import Fit
+from viroconcom.fitting import Fit, FitInspectionData, BasicFit
+from viroconcom.contours import IFormContour
 
 class FittingTest(unittest.TestCase):
 
@@ -36,9 +38,9 @@ class FittingTest(unittest.TestCase):
                      (dist_description_0, dist_description_1))
         dist0 = my_fit.mul_var_dist.distributions[0]
         dist1 = my_fit.mul_var_dist.distributions[1]
-        self.assertAlmostEqual(dist0.shape(0), 1.4165147571863412, places=5)
-        self.assertAlmostEqual(dist0.scale(0), 2.833833521811032, places=5)
-        self.assertAlmostEqual(dist0.loc(0), 0.07055663251419833, places=5)
+        self.assertAlmostEqual(dist0.shape(0), 1.4165477219694242, places=5)
+        self.assertAlmostEqual(dist0.scale(0), 2.8338543809390115, places=5)
+        self.assertAlmostEqual(dist0.loc(0), 0.07054653243717851, places=5)
         self.assertAlmostEqual(dist1.shape(0), 0.17742685807554776 , places=5)
         #self.assertAlmostEqual(dist1.scale, 7.1536437634240135+2.075539206642004e^{0.1515051024957754x}, places=5)
         self.assertAlmostEqual(dist1.loc, None, places=5)
@@ -74,3 +76,780 @@ class FittingTest(unittest.TestCase):
         my_fit = Fit((sample_1, sample_2),
                      (dist_description_0, dist_description_1),
                      timeout=10)
+
+    def test_conditional_kernel_density(self):
+        """
+        2-d Fit with a kernel density that depends on the first dimension.
+        """
+
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 1000)*3
+        sample_2 = [0.1 + 1.5 * np.exp(0.2 * point) +
+                    prng.lognormal(2, 0.2) for point in sample_1]
+        dist_description_0 = {'name': 'Weibull_2p',
+                              'dependency': (None, None, None),
+                              'width_of_intervals': 2}
+        dist_description_1 = {'name': 'KernelDensity',
+                              'dependency': (None, None, 0)}
+        my_fit = Fit((sample_1, sample_2),
+                     (dist_description_0, dist_description_1))
+        dist1 = my_fit.mul_var_dist.distributions[1]
+        self.assertEqual(dist1.name, 'KernelDensity')
+        self.assertEqual(len(dist1.interval_centers),
+                         dist_description_0['used_number_of_intervals'])
+
+        # cdf and i_cdf are vectorized over the conditioning values and
+        # inverse to each other.
+        probabilities = np.array([0.1, 0.5, 0.9, 0.99])
+        hs = np.array([0.5, 2.2, 5, 20])
+        tz = dist1.i_cdf(probabilities, [hs], (None, None, 0))
+        np.testing.assert_allclose(dist1.cdf(tz, [hs], (None, None, 0)),
+                                   probabilities, atol=1e-3)
+        self.assertTrue(np.all(np.diff(dist1.i_cdf(
+            probabilities, [np.full(4, 3.0)], (None, None, 0))) > 0))
+
+        # The distribution can be used to compute contours.
+        my_contour = IFormContour(my_fit.mul_var_dist, 25, 3, 50)
+        self.assertEqual(len(my_contour.coordinates[0][1]), 50)
+        self.assertTrue(np.all(np.isfinite(my_contour.coordinates[0][1])))
+
+    def test_parallel_interval_fits(self):
+        """
+        Fitting the intervals in a pool gives the same result as serial fitting.
+        """
+
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 1000)*3
+        sample_2 = [0.1 + 1.5 * np.exp(0.2 * point) +
+                    prng.lognormal(2, 0.2) for point in sample_1]
+        dist_description_0 = {'name': 'Weibull_2p',
+                              'dependency': (None, None, None),
+                              'width_of_intervals': 1}
+        dist_description_1 = {'name': 'Weibull_2p',
+                              'dependency': (0, None, 0),
+                              'functions': ('power3', None, 'power3')}
+
+        serial_fit = Fit((sample_1, sample_2),
+                         (dist_description_0, dist_description_1))
+        serial_data = serial_fit.multiple_fit_inspection_data[1]
+        for backend in ('process', 'thread'):
+            parallel_fit = Fit((sample_1, sample_2),
+                               (dist_description_0, dist_description_1),
+                               interval_workers=2, interval_backend=backend)
+            parallel_data = parallel_fit.multiple_fit_inspection_data[1]
+            # Serial fits are warm started from the previous interval, thus
+            # the results only agree up to the tolerance of the solver.
+            np.testing.assert_array_equal(parallel_data.scale_at,
+                                          serial_data.scale_at)
+            np.testing.assert_allclose(parallel_data.scale_value,
+                                       serial_data.scale_value, rtol=1e-9)
+            np.testing.assert_allclose(parallel_data.shape_value,
+                                       serial_data.shape_value, rtol=1e-9)
+
+        # One pool fits the intervals of all parameters and dimensions.
+        from unittest import mock
+        with mock.patch.object(Fit, '_get_interval_pool',
+                               wraps=Fit._get_interval_pool) as get_interval_pool:
+            Fit((sample_1, sample_2, sample_2),
+                (dist_description_0, dist_description_1, dist_description_1),
+                interval_workers=2, interval_backend='thread')
+        self.assertEqual(get_interval_pool.call_count, 1)
+
+        # Inside of the timeout worker processes a thread pool is used.
+        Fit((sample_1, sample_2), (dist_description_0, dist_description_1),
+            timeout=60, interval_workers=2)
+
+        with self.assertRaises(ValueError):
+            Fit((sample_1, sample_2), (dist_description_0, dist_description_1),
+                interval_workers=2, interval_backend='gpu')
+
+    def test_closed_form_estimators(self):
+        """
+        The closed form estimators of normal and lognormal distributions are
+        the maximum likelihood estimates of scipy.
+        """
+
+        prng = np.random.RandomState(42)
+        sample = prng.lognormal(1.2, 0.3, 500)
+
+        shape, loc, scale = Fit._fit_distribution(sample, 'Lognormal')
+        ref_shape, _, ref_scale = sts.lognorm.fit(sample, floc=0)
+        self.assertAlmostEqual(shape(None), ref_shape, places=5)
+        self.assertEqual(loc(None), 0)
+        self.assertAlmostEqual(scale(None), ref_scale, places=5)
+
+        _, loc, scale = Fit._fit_distribution(sample, 'Normal')
+        ref_loc, ref_scale = sts.norm.fit(sample)
+        self.assertAlmostEqual(loc(None), ref_loc, places=10)
+        self.assertAlmostEqual(scale(None), ref_scale, places=10)
+
+        # Samples that are not positive are passed to scipy's optimizer,
+        # which does not accept them.
+        with self.assertRaises(ValueError):
+            Fit._fit_distribution(sample - 10, 'Lognormal')
+
+    def test_weibull_solvers(self):
+        """
+        The Weibull solvers find the maximum likelihood estimates independent
+        of the initial shape.
+        """
+
+        prng = np.random.RandomState(42)
+        sample = prng.weibull(1.5, 1000) * 3 + 0.5
+
+        for shape_guess in (None, 0.2, 1.5, 50):
+            shape, loc, scale = Fit._fit_weibull_2p(sample, shape_guess)
+            self.assertEqual(loc, 0)
+            # The derivative of the log-likelihood is zero at the estimate.
+            log_sample = np.log(sample)
+            weights = sample ** shape
+            self.assertAlmostEqual(
+                np.sum(weights * log_sample) / np.sum(weights) - 1 / shape -
+                np.mean(log_sample), 0, places=10)
+            self.assertAlmostEqual(scale, np.mean(weights) ** (1 / shape),
+                                   places=10)
+
+        shape, loc, scale = Fit._fit_weibull_3p(sample)
+        self.assertAlmostEqual(shape, 1.5, delta=0.15)
+        self.assertAlmostEqual(loc, 0.5, delta=0.1)
+        self.assertGreaterEqual(
+            np.sum(sts.weibull_min.logpdf(sample, shape, loc, scale)),
+            np.sum(sts.weibull_min.logpdf(
+                sample, *sts.weibull_min.fit(sample))) - 1e-6)
+
+    def test_inspection_samples(self):
+        """
+        The samples of the intervals are views of one sorted array or are not
+        kept at all.
+        """
+
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 1000)*3
+        sample_2 = [0.1 + 1.5 * np.exp(0.2 * point) +
+                    prng.lognormal(2, 0.2) for point in sample_1]
+        dist_description_0 = {'name': 'Weibull_2p',
+                              'dependency': (None, None, None),
+                              'width_of_intervals': 2}
+        dist_description_1 = {'name': 'Weibull_2p',
+                              'dependency': (0, None, 0),
+                              'functions': ('power3', None, 'power3')}
+
+        my_fit = Fit((sample_1, sample_2),
+                     (dist_description_0, dist_description_1))
+        data = my_fit.multiple_fit_inspection_data[1]
+        base = data.scale_samples[0].base
+        self.assertIsNotNone(base)
+        for shape_samples, scale_samples in zip(data.shape_samples,
+                                                data.scale_samples):
+            self.assertIs(shape_samples, scale_samples)
+            self.assertIs(scale_samples.base, base)
+        self.assertEqual(sum(len(s) for s in data.scale_samples),
+                         np.sum(np.asarray(sample_1) < data.scale_at[-1] + 1))
+
+        lean_fit = Fit((sample_1, sample_2),
+                       (dist_description_0, dist_description_1),
+                       keep_samples=False)
+        lean_data = lean_fit.multiple_fit_inspection_data[1]
+        self.assertTrue(all(s is None for s in lean_data.scale_samples))
+        self.assertTrue(all(s is None for s in
+                            lean_fit.multiple_fit_inspection_data[0].scale_samples))
+        np.testing.assert_array_equal(lean_data.scale_value, data.scale_value)
+
+    def test_inspection_columns(self):
+        """
+        The fit inspection data holds the results of all fits as columns.
+        """
+
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 1000)*3
+        sample_2 = [0.1 + 1.5 * np.exp(0.2 * point) +
+                    prng.lognormal(2, 0.2) for point in sample_1]
+        dist_description_0 = {'name': 'Weibull_2p',
+                              'dependency': (None, None, None),
+                              'width_of_intervals': 2}
+        dist_description_1 = {'name': 'Weibull_2p',
+                              'dependency': (0, None, 0),
+                              'functions': ('power3', None, 'power3')}
+
+        my_fit = Fit((sample_1, sample_2),
+                     (dist_description_0, dist_description_1),
+                     keep_samples=False)
+        data = my_fit.multiple_fit_inspection_data[1]
+        columns = data.get_columns('scale')
+        self.assertEqual(columns['scale'].shape, columns['at'].shape)
+        np.testing.assert_array_equal(columns['scale'], data.scale_value)
+        np.testing.assert_array_equal(columns['shape'], data.shape_value)
+        np.testing.assert_array_equal(columns['n_samples'],
+                                      data.shape_n_samples)
+        self.assertTrue(np.all(columns['n_samples'] >= 10))
+        self.assertEqual(columns['n_samples'].sum(),
+                         np.sum(sample_1 < data.scale_at[-1] + 1))
+
+        basic_fit = data.get_basic_fit('scale', 1)
+        self.assertEqual(basic_fit.scale, data.scale_value[1])
+        self.assertEqual(basic_fit.n_samples, columns['n_samples'][1])
+        self.assertIsNone(basic_fit.samples)
+
+        data_0 = my_fit.multiple_fit_inspection_data[0]
+        np.testing.assert_array_equal(data_0.shape_n_samples, [1000])
+        self.assertRaises(ValueError, data.get_columns, 'mu')
+
+        # Fits that are appended one by one are stored in the same columns.
+        appended = FitInspectionData()
+        for i in range(20):
+            appended.append_basic_fit('scale', BasicFit(1.5, 0, i + 1, None, 10 * i),
+                                      (0.1 * i, np.nan))
+        appended.append_basic_fit('scale', BasicFit(1.5, 0, 21, None, 2.5))
+        columns = appended.get_columns('scale')
+        np.testing.assert_array_equal(columns['scale'], np.arange(1, 22))
+        np.testing.assert_array_equal(columns['n_samples'][[0, 19, 20]], [0, 190, 2.5])
+        self.assertEqual(columns['ks'][19], 0.1 * 19)
+        self.assertEqual(appended.get_basic_fit('scale', 4).scale, 5)
+        self.assertEqual(len(appended.scale_samples), 21)
+
+    def test_shared_samples(self):
+        """
+        With a timeout the dimensions are fitted to memory-mapped samples,
+        which gives the same result as the serial fit.
+        """
+        import glob
+        import os
+        import tempfile
+
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 1000)*3
+        sample_2 = [0.1 + 1.5 * np.exp(0.2 * point) +
+                    prng.lognormal(2, 0.2) for point in sample_1]
+        dist_description_0 = {'name': 'Weibull_2p',
+                              'dependency': (None, None, None),
+                              'width_of_intervals': 2}
+        dist_description_1 = {'name': 'Lognormal',
+                              'dependency': (None, None, 0),
+                              'functions': (None, None, 'exp3')}
+        shared_files = os.path.join(tempfile.gettempdir(), 'viroconcom_*')
+        files_before = set(glob.glob(shared_files))
+
+        serial_fit = Fit((sample_1, sample_2),
+                         (dist_description_0, dist_description_1))
+        parallel_fit = Fit((sample_1, sample_2),
+                           (dist_description_0, dist_description_1),
+                           timeout=60)
+        for serial_dist, parallel_dist in zip(
+                serial_fit.mul_var_dist.distributions,
+                parallel_fit.mul_var_dist.distributions):
+            self.assertEqual(str(serial_dist.shape), str(parallel_dist.shape))
+            self.assertEqual(str(serial_dist.scale), str(parallel_dist.scale))
+        self.assertEqual(parallel_fit.dist_descriptions[0]['used_number_of_intervals'],
+                         serial_fit.dist_descriptions[0]['used_number_of_intervals'])
+        self.assertEqual(set(glob.glob(shared_files)), files_before)
+
+        # Dimensions with different numbers of samples are sent directly.
+        Fit((sample_1, sample_1[:500]),
+            (dist_description_0, dict(dist_description_0)), timeout=60)
+
+    def test_fit_from_chunks(self):
+        """
+        A fit from chunks equals a fit of the whole data if the subsamples
+        hold all samples.
+        """
+
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 2000)*3
+        sample_2 = np.array([0.1 + 1.5 * np.exp(0.2 * point) +
+                             prng.lognormal(2, 0.2) for point in sample_1])
+        sample_3 = 0.3 * sample_2 + prng.normal(0, 0.5, 2000)
+        data = np.array([sample_1, sample_2, sample_3])
+
+        def get_descriptions():
+            return [{'name': 'Weibull_2p',
+                     'dependency': (None, None, None),
+                     'width_of_intervals': 1},
+                    {'name': 'Weibull_2p',
+                     'dependency': (0, None, 0),
+                     'functions': ('exp3', None, 'power3'),
+                     'number_of_intervals': 6},
+                    {'name': 'Lognormal',
+                     'dependency': (None, None, 1),
+                     'functions': (None, None, 'power3')}]
+
+        whole_fit = Fit(list(data), get_descriptions())
+        chunk_fit = Fit.from_chunks(data, get_descriptions(), chunk_size=300,
+                                    random_state=42)
+        for whole_dist, chunk_dist in zip(
+                whole_fit.mul_var_dist.distributions,
+                chunk_fit.mul_var_dist.distributions):
+            for whole_param, chunk_param in zip(
+                    (whole_dist.shape, whole_dist.loc, whole_dist.scale),
+                    (chunk_dist.shape, chunk_dist.loc, chunk_dist.scale)):
+                if whole_param is None:
+                    self.assertIsNone(chunk_param)
+                    continue
+                np.testing.assert_allclose(chunk_param(np.arange(1, 20)),
+                                           whole_param(np.arange(1, 20)),
+                                           rtol=1e-6)
+        np.testing.assert_array_equal(
+            chunk_fit.multiple_fit_inspection_data[1].scale_n_samples,
+            whole_fit.multiple_fit_inspection_data[1].scale_n_samples)
+
+        # Subsamples keep at most reservoir_size samples per interval.
+        chunks = [data[:, :1000], data[:, 1000:]]
+        small_fit = Fit.from_chunks(lambda: iter(chunks), get_descriptions(),
+                                    reservoir_size=50, random_state=42)
+        data_1 = small_fit.multiple_fit_inspection_data[1]
+        self.assertTrue(all(len(samples) <= 50 for samples in data_1.scale_samples))
+        self.assertTrue(all(np.isin(samples, sample_2).all()
+                            for samples in data_1.scale_samples))
+        self.assertIsNone(small_fit.multiple_fit_inspection_data[2].scale_samples[0])
+
+        self.assertRaises(ValueError, Fit.from_chunks, iter(chunks),
+                          get_descriptions())
+        self.assertRaises(ValueError, Fit.from_chunks, data[:2],
+                          get_descriptions())
+
+    def test_weighted_fit(self):
+        """
+        A fit of unique samples weighted by their counts equals the fit of
+        all samples.
+        """
+
+        prng = np.random.RandomState(42)
+        sample_1 = np.round(prng.weibull(1.5, 5000) * 6) / 2 + 0.25
+        sample_2 = np.round([0.1 + 1.5 * np.exp(0.2 * point) +
+                             prng.lognormal(2, 0.2) for point in sample_1]) + 0.5
+        unique_samples, counts = np.unique(np.array([sample_1, sample_2]), axis=1,
+                                           return_counts=True)
+
+        for name in ('Weibull_2p', 'Lognormal', 'Normal'):
+            def get_descriptions():
+                return [{'name': 'Weibull_2p',
+                         'dependency': (None, None, None),
+                         'width_of_intervals': 1},
+                        {'name': name,
+                         'dependency': (0, None, 0),
+                         'functions': ('power3', None, 'power3')}]
+            whole_fit = Fit((sample_1, sample_2), get_descriptions())
+            weighted_fit = Fit(list(unique_samples), get_descriptions(),
+                               weights=counts)
+            for whole_dist, weighted_dist in zip(
+                    whole_fit.mul_var_dist.distributions,
+                    weighted_fit.mul_var_dist.distributions):
+                for param in ('shape', 'scale'):
+                    np.testing.assert_allclose(
+                        getattr(weighted_dist, param)(np.arange(1, 8)),
+                        getattr(whole_dist, param)(np.arange(1, 8)), rtol=1e-5)
+            np.testing.assert_array_equal(
+                weighted_fit.multiple_fit_inspection_data[1].scale_n_samples,
+                whole_fit.multiple_fit_inspection_data[1].scale_n_samples)
+
+        # The numerical optimizer minimizes the weighted negative log-likelihood.
+        sample = prng.normal(3, 2, 50)
+        weights = prng.randint(1, 5, 50)
+        np.testing.assert_allclose(Fit._fit_weighted(sts.norm, sample, weights),
+                                   Fit._fit_normal(sample, weights), rtol=1e-3)
+
+        # A fit that does not converge is reported.
+        from unittest import mock
+        from scipy.optimize import minimize
+
+        def minimize_once(*args, **kwargs):
+            return minimize(*args, options={'maxiter': 1}, **kwargs)
+
+        with mock.patch('viroconcom.fitting.minimize', minimize_once):
+            with self.assertWarns(RuntimeWarning):
+                Fit._fit_weighted(sts.norm, sample, weights)
+
+        self.assertRaises(ValueError, Fit, list(unique_samples),
+                          get_descriptions(), weights=counts[:-1])
+        self.assertRaises(ValueError, Fit, list(unique_samples),
+                          get_descriptions(), weights=-counts)
+
+    def test_scatter_diagram(self):
+        """
+        Fit a scatter diagram of counts.
+        """
+
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 5000) * 3
+        sample_2 = [0.1 + 1.5 * np.exp(0.2 * point) +
+                    prng.lognormal(2, 0.2) for point in sample_1]
+        counts, hs_edges, tz_edges = np.histogram2d(
+            sample_1, sample_2, bins=(np.arange(0, 16, 0.5), np.arange(0, 40, 1)))
+        hs = hs_edges[:-1] + 0.25
+        tz = tz_edges[:-1] + 0.5
+        dist_description_0 = {'name': 'Weibull_2p',
+                              'dependency': (None, None, None),
+                              'width_of_intervals': 1}
+        dist_description_1 = {'name': 'Lognormal',
+                              'dependency': (None, None, 0),
+                              'functions': (None, None, 'exp3')}
+        my_fit = Fit.from_scatter_diagram(counts, (hs, tz),
+                                          (dist_description_0, dist_description_1))
+        dist_0 = my_fit.mul_var_dist.distributions[0]
+        self.assertAlmostEqual(dist_0.shape(0), 1.5, delta=0.1)
+        self.assertAlmostEqual(dist_0.scale(0), 3, delta=0.2)
+        self.assertEqual(my_fit.multiple_fit_inspection_data[0].scale_n_samples[0],
+                         counts.sum())
+        self.assertRaises(ValueError, Fit.from_scatter_diagram, counts, (hs, tz[1:]),
+                          (dist_description_0, dist_description_1))
+
+    def test_deduplicate(self):
+        """
+        Duplicate observations are merged into weighted samples.
+        """
+
+        prng = np.random.RandomState(42)
+        sample_1 = np.round(prng.weibull(1.5, 2000) * 30) / 10
+        sample_2 = np.round([0.1 + 1.5 * np.exp(0.2 * point) +
+                             prng.lognormal(2, 0.2) for point in sample_1])
+
+        def get_descriptions():
+            return [{'name': 'Weibull_2p',
+                     'dependency': (None, None, None),
+                     'width_of_intervals': 1},
+                    {'name': 'Lognormal',
+                     'dependency': (None, None, 0),
+                     'functions': (None, None, 'exp3')}]
+
+        whole_fit = Fit((sample_1, sample_2), get_descriptions())
+        compact_fit = Fit((sample_1, sample_2), get_descriptions(),
+                          deduplicate=True)
+        for whole_dist, compact_dist in zip(
+                whole_fit.mul_var_dist.distributions,
+                compact_fit.mul_var_dist.distributions):
+            for param in ('shape', 'scale'):
+                np.testing.assert_allclose(
+                    getattr(compact_dist, param)(np.arange(1, 8)),
+                    getattr(whole_dist, param)(np.arange(1, 8)), rtol=1e-5)
+        data = compact_fit.multiple_fit_inspection_data[0]
+        self.assertEqual(data.scale_n_samples[0], 2000)
+        self.assertLess(len(data.scale_samples[0]), 2000)
+
+        samples, weights = Fit._deduplicate(([1, 2, 1, 1], [3, 4, 3, 5]),
+                                            np.array([1, 1, 2, 1]))
+        np.testing.assert_array_equal(samples, [[1, 1, 2], [3, 5, 4]])
+        np.testing.assert_array_equal(weights, [3, 1, 1])
+        self.assertRaises(ValueError, Fit._deduplicate, ([1, 2], [1]))
+
+    def test_update(self):
+        """
+        Update a fit with new observations.
+        """
+
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 2000) * 3
+        sample_2 = 0.1 + 1.5 * np.exp(0.2 * sample_1) + \
+            prng.lognormal(2, 0.2, 2000)
+        new_sample_1 = prng.uniform(0.1, 0.9, 100)
+        new_sample_2 = 0.1 + 1.5 * np.exp(0.2 * new_sample_1) + \
+            prng.lognormal(2, 0.2, 100)
+
+        def get_descriptions():
+            return [{'name': 'Weibull_2p',
+                     'dependency': (None, None, None),
+                     'width_of_intervals': 1},
+                    {'name': 'Weibull_2p',
+                     'dependency': (0, None, 0),
+                     'functions': ('power3', None, 'power3')}]
+
+        my_fit = Fit((sample_1, sample_2), get_descriptions())
+        old_data = my_fit.multiple_fit_inspection_data[1]
+        self.assertIs(my_fit.update((new_sample_1, new_sample_2)), my_fit)
+        new_data = my_fit.multiple_fit_inspection_data[1]
+        self.assertEqual(len(my_fit.samples[0]), 2100)
+
+        # Only the first interval got new samples.
+        np.testing.assert_array_equal(new_data.scale_at, old_data.scale_at)
+        self.assertEqual(new_data.scale_n_samples[0], old_data.scale_n_samples[0] + 100)
+        self.assertNotEqual(new_data.scale_value[0], old_data.scale_value[0])
+        np.testing.assert_array_equal(new_data.scale_value[1:], old_data.scale_value[1:])
+
+        # The update equals a fit of all samples.
+        whole_fit = Fit((np.concatenate((sample_1, new_sample_1)),
+                         np.concatenate((sample_2, new_sample_2))),
+                        get_descriptions())
+        np.testing.assert_allclose(
+            new_data.scale_value,
+            whole_fit.multiple_fit_inspection_data[1].scale_value, rtol=1e-8)
+        for param in ('shape', 'scale'):
+            np.testing.assert_allclose(
+                getattr(my_fit.mul_var_dist.distributions[1], param)(np.arange(1, 8)),
+                getattr(whole_fit.mul_var_dist.distributions[1], param)(np.arange(1, 8)),
+                rtol=1e-5)
+
+        # The new samples can be a DataFrame or a structured array as well.
+        import pandas as pd
+        structured = np.zeros(100, dtype=[('hs', 'f8'), ('tz', 'f8')])
+        structured['hs'] = new_sample_1
+        structured['tz'] = new_sample_2
+        frame = pd.DataFrame({'hs': new_sample_1, 'tz': new_sample_2},
+                             columns=['hs', 'tz'])
+        for new_samples in (frame, structured):
+            other_fit = Fit((sample_1, sample_2), get_descriptions())
+            other_fit.update(new_samples)
+            np.testing.assert_array_equal(other_fit.samples, whole_fit.samples)
+            np.testing.assert_allclose(
+                other_fit.multiple_fit_inspection_data[1].scale_value,
+                whole_fit.multiple_fit_inspection_data[1].scale_value, rtol=1e-8)
+
+        # Without new samples in the intervals the dependence functions are kept.
+        scale = my_fit.mul_var_dist.distributions[1].scale
+        my_fit.update(([], []))
+        self.assertIs(my_fit.mul_var_dist.distributions[1].scale, scale)
+
+        lean_fit = Fit((sample_1, sample_2), get_descriptions(), keep_samples=False)
+        self.assertRaises(RuntimeError, lean_fit.update, (new_sample_1, new_sample_2))
+        self.assertRaises(ValueError, my_fit.update, (new_sample_1,))
+
+    def test_dependence_functions(self):
+        """
+        The Jacobians and the initial coefficients of the dependence functions.
+        """
+        from viroconcom.fitting import _power3, _exp3
+
+        x = np.linspace(0, 10, 21)
+        for function_name, function, coefficients in (
+                ('power3', _power3, (0.5, 2.0, 1.3)),
+                ('exp3', _exp3, (0.1, 1.5, 0.2))):
+            jacobian = Fit._get_jacobian(function_name)(x, *coefficients)
+            step = 1e-7
+            for i in range(3):
+                shifted = list(coefficients)
+                shifted[i] += step
+                np.testing.assert_allclose(
+                    jacobian[:, i],
+                    (function(x, *shifted) - function(x, *coefficients)) / step,
+                    rtol=1e-5, atol=1e-5)
+
+            y = function(x, *coefficients)
+            initial = Fit._get_initial_coefficients(function_name, x, y)
+            self.assertLess(np.sum((function(x, *initial) - y) ** 2),
+                            np.sum((function(x, 1, 1, 1) - y) ** 2))
+            param = Fit._fit_dependence_function(x, y, function_name, 'scale', 1)
+            np.testing.assert_allclose((param.a, param.b, param.c), coefficients,
+                                       rtol=1e-5)
+
+        self.assertIsNone(Fit._get_initial_coefficients('power3', [0, 0], [1, 2]))
+        self.assertRaises(ValueError, Fit._get_jacobian, 'power4')
+
+    def test_model_selection(self):
+        """
+        Candidates are ranked by information criteria per dimension.
+        """
+        from viroconcom.fitting import ModelSelection
+
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 1000) * 3
+        sample_2 = 0.1 + 1.5 * np.exp(0.2 * sample_1) + \
+            prng.lognormal(2, 0.2, 1000)
+        candidates_1 = [{'name': name,
+                         'dependency': (None, None, None),
+                         'width_of_intervals': 2}
+                        for name in ('Normal', 'Weibull_2p', 'KernelDensity')]
+        candidates_2 = [{'name': 'Lognormal',
+                         'dependency': (0, None, 0),
+                         'functions': ('exp3', None, 'power3')},
+                        {'name': 'Normal',
+                         'dependency': (None, 0, 0),
+                         'functions': (None, 'power3', 'power3')}]
+        self.assertRaises(ValueError, ModelSelection, (sample_1, sample_2),
+                          (candidates_1, candidates_2))
+        candidates_1 = candidates_1[:2]
+
+        selection = ModelSelection((sample_1, sample_2),
+                                   (candidates_1, candidates_2), criterion='bic')
+        self.assertEqual([description['name'] for description
+                          in selection.best_descriptions],
+                         ['Weibull_2p', 'Lognormal'])
+        self.assertEqual(len(selection.table), 4)
+        for entry in selection.table:
+            self.assertAlmostEqual(entry['bic'], entry['n_parameters'] * np.log(1000)
+                                   - 2 * entry['log_likelihood'])
+        self.assertEqual([entry['rank'] for entry in selection.table], [2, 1, 1, 2])
+        self.assertEqual([entry['n_parameters'] for entry in selection.table],
+                         [2, 2, 6, 6])
+
+        # The best candidate equals a Fit of it.
+        my_fit = Fit((sample_1, sample_2), selection.best_descriptions)
+        self.assertEqual(str(my_fit.mul_var_dist.distributions[1].scale),
+                         str(selection.mul_var_dist.distributions[1].scale))
+        weibull = my_fit.mul_var_dist.distributions[0]
+        self.assertAlmostEqual(selection.table[1]['log_likelihood'], np.sum(
+            sts.weibull_min.logpdf(sample_1, c=weibull.shape(None),
+                                   scale=weibull.scale(None))))
+
+        concurrent_selection = ModelSelection((sample_1, sample_2),
+                                              (candidates_1, candidates_2),
+                                              criterion='bic', workers=2)
+        self.assertEqual([entry['bic'] for entry in concurrent_selection.table],
+                         [entry['bic'] for entry in selection.table])
+
+    def test_goodness_of_fit(self):
+        """
+        Kolmogorov-Smirnov and Anderson-Darling statistics of each fit.
+        """
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 1000) * 3
+        sample_2 = 0.1 + 1.5 * np.exp(0.2 * sample_1) + \
+            prng.lognormal(2, 0.2, 1000)
+        dist_description_1 = {'name': 'Weibull_3p',
+                              'dependency': (None, None, None),
+                              'width_of_intervals': 2}
+        dist_description_2 = {'name': 'Lognormal',
+                              'dependency': (None, None, 0),
+                              'functions': (None, None, 'exp3')}
+        my_fit = Fit((sample_1, sample_2),
+                     (dist_description_1, dist_description_2),
+                     goodness_of_fit=True)
+
+        def anderson_darling(sample, cdf):
+            values = cdf(np.sort(sample))
+            n = len(values)
+            i = np.arange(1, n + 1)
+            return -n - np.mean((2 * i - 1) * np.log(values) +
+                                (2 * n - 2 * i + 1) * np.log1p(-values))
+
+        inspection_data = my_fit.multiple_fit_inspection_data[0]
+        weibull = my_fit.mul_var_dist.distributions[0]
+        cdf = lambda x: sts.weibull_min.cdf(
+            x, weibull.shape(None), weibull.loc(None), weibull.scale(None))
+        self.assertAlmostEqual(inspection_data.shape_ks[0],
+                               sts.kstest(sample_1, cdf).statistic)
+        self.assertAlmostEqual(inspection_data.scale_ad[0],
+                               anderson_darling(sample_1, cdf))
+
+        columns = my_fit.multiple_fit_inspection_data[1].get_columns('scale')
+        for i in range(len(columns['at'])):
+            interval_sample = my_fit.multiple_fit_inspection_data[1].scale_samples[i]
+            cdf = lambda x: sts.lognorm.cdf(x, columns['shape'][i],
+                                            scale=columns['scale'][i])
+            self.assertAlmostEqual(columns['ks'][i],
+                                   sts.kstest(interval_sample, cdf).statistic)
+            self.assertAlmostEqual(columns['ad'][i],
+                                   anderson_darling(interval_sample, cdf), places=6)
+
+        # Weighted statistics equal those of the expanded samples.
+        samples = (np.round(sample_1), np.round(sample_2))
+        expanded = Fit(samples, (dist_description_1, dist_description_2),
+                       goodness_of_fit=True)
+        weighted = Fit(samples, (dist_description_1, dist_description_2),
+                       goodness_of_fit=True, deduplicate=True)
+        for statistic in ('ks', 'ad'):
+            np.testing.assert_allclose(
+                weighted.multiple_fit_inspection_data[1].get_columns('scale')[statistic],
+                expanded.multiple_fit_inspection_data[1].get_columns('scale')[statistic])
+
+        my_fit = Fit((sample_1, sample_2), (dist_description_1, dist_description_2))
+        self.assertTrue(np.all(np.isnan(
+            my_fit.multiple_fit_inspection_data[1].scale_ks)))
+
+    def test_interval_methods(self):
+        """
+        Equal count and hybrid intervals of the dependent parameters.
+        """
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 1000) * 3
+        sample_2 = 0.1 + 1.5 * np.exp(0.2 * sample_1) + \
+            prng.lognormal(2, 0.2, 1000)
+        dist_description_2 = {'name': 'Lognormal',
+                              'dependency': (None, None, 0),
+                              'functions': (None, None, 'exp3')}
+
+        dist_description_1 = {'name': 'Weibull_2p',
+                              'dependency': (None, None, None),
+                              'number_of_intervals': 8,
+                              'interval_method': 'equal_count'}
+        my_fit = Fit((sample_1, sample_2), (dist_description_1, dist_description_2))
+        columns = my_fit.multiple_fit_inspection_data[1].get_columns('scale')
+        self.assertEqual(len(columns['at']), 8)
+        self.assertEqual(np.sum(columns['n_samples']), 1000)
+        self.assertLessEqual(np.ptp(columns['n_samples']), 2)
+        # The intervals are fitted at the median of their samples.
+        edges = np.quantile(sample_1, np.linspace(0, 1, 9))
+        self.assertTrue(np.all(columns['at'] > edges[:-1]))
+        self.assertTrue(np.all(columns['at'] < edges[1:]))
+
+        # Hybrid intervals merge the sparse tail instead of skipping it.
+        dist_description_1 = {'name': 'Weibull_2p',
+                              'dependency': (None, None, None),
+                              'width_of_intervals': 1,
+                              'interval_method': 'hybrid'}
+        my_fit = Fit((sample_1, sample_2), (dist_description_1, dist_description_2))
+        columns = my_fit.multiple_fit_inspection_data[1].get_columns('scale')
+        self.assertEqual(np.sum(columns['n_samples']), 1000)
+        self.assertTrue(np.all(columns['n_samples'] >= 10))
+        np.testing.assert_allclose(columns['at'][:7], np.arange(7) + 0.5)
+
+        dist_description_1['interval_method'] = 'quantile'
+        self.assertRaises(ValueError, Fit, (sample_1, sample_2),
+                          (dist_description_1, dist_description_2))
+
+    def test_sample_formats(self):
+        """
+        Samples as 2-d array, structured array or DataFrame.
+        """
+        import pandas as pd
+
+        prng = np.random.RandomState(42)
+        sample_1 = prng.weibull(1.5, 1000) * 3
+        sample_2 = 0.1 + 1.5 * np.exp(0.2 * sample_1) + \
+            prng.lognormal(2, 0.2, 1000)
+        dist_description_1 = {'name': 'Weibull_2p',
+                              'dependency': (None, None, None),
+                              'width_of_intervals': 2}
+        dist_description_2 = {'name': 'Lognormal',
+                              'dependency': (None, None, 0),
+                              'functions': (None, None, 'exp3')}
+        reference = Fit((list(sample_1), list(sample_2)),
+                        (dist_description_1, dist_description_2))
+
+        array = np.array([sample_1, sample_2])
+        structured = np.zeros(1000, dtype=[('hs', 'f4'), ('tz', 'f8')])
+        structured['hs'] = sample_1
+        structured['tz'] = sample_2
+        frame = pd.DataFrame({'hs': sample_1, 'tz': sample_2})
+        for samples in (array, frame, structured):
+            my_fit = Fit(samples, (dist_description_1, dist_description_2))
+            self.assertEqual(my_fit.samples.shape, (2, 1000))
+            self.assertEqual(my_fit.samples.dtype, np.float64)
+            self.assertTrue(my_fit.samples.flags['C_CONTIGUOUS'])
+            if samples is not structured:
+                self.assertEqual(str(my_fit.mul_var_dist.distributions[1].scale),
+                                 str(reference.mul_var_dist.distributions[1].scale))
+
+        # A contiguous float64 array is not copied.
+        my_fit = Fit(array, (dist_description_1, dist_description_2))
+        self.assertTrue(np.shares_memory(my_fit.samples, array))
+
+    def test_shared_sort_order(self):
+        """
+        Dimensions that depend on the same dimension share its sort order.
+        """
+        from unittest import mock
+
+        prng = np.random.RandomState(42)
+        sample_u = prng.weibull(2, 1000) * 10
+        sample_hs = 0.2 * sample_u + prng.weibull(1.5, 1000)
+        sample_tz = 0.1 + 1.5 * np.exp(0.1 * sample_u) + prng.lognormal(2, 0.2, 1000)
+        sample_tp = 1.2 * sample_tz + prng.normal(0, 0.5, 1000)
+        dist_descriptions = (
+            {'name': 'Weibull_2p', 'dependency': (None, None, None),
+             'width_of_intervals': 4},
+            {'name': 'Weibull_2p', 'dependency': (0, None, 0),
+             'functions': ('power3', None, 'power3')},
+            {'name': 'Lognormal', 'dependency': (0, None, 0),
+             'functions': ('exp3', None, 'power3'), 'width_of_intervals': 2},
+            {'name': 'Normal', 'dependency': (None, 2, 2),
+             'functions': (None, 'power3', 'power3')})
+        samples = (sample_u, sample_hs, sample_tz, sample_tp)
+
+        with mock.patch('numpy.argsort', wraps=np.argsort) as argsort:
+            my_fit = Fit(samples, dist_descriptions)
+        sorted_lengths = [len(call[0][0]) for call in argsort.call_args_list]
+        self.assertEqual(sorted_lengths.count(1000), 2)
+
+        # The shared sort orders do not change the result.
+        for dimension in range(1, 4):
+            reference = Fit._get_distribution(
+                dimension, my_fit.samples, **dict(dist_descriptions[dimension]))[0]
+            self.assertEqual(str(my_fit.mul_var_dist.distributions[dimension].scale),
+                             str(reference.scale))
@@ -67,5 +67,22 @@ class ParamsTest(unittest.TestCase):
         self.assertEqual(test_func._value(9), test_func2._value(9))
 
 
+    def test_pickle(self):
+        """
+        tests if a pickled FunctionParam is restored from its function name,
+        coefficients and wrapper
+        """
+        import pickle
+
+        for wrapper in (None, np.exp):
+            test_func = FunctionParam(0.5, 1.0, 0.2, 'exp3', wrapper=wrapper)
+            restored = pickle.loads(pickle.dumps(test_func))
+            self.assertEqual(restored.func_name, 'exp3')
+            self.assertEqual(restored._value(9), test_func._value(9))
+
+        # Only the state is pickled, not the bound methods.
+        self.assertLess(len(pickle.dumps(FunctionParam(0.5, 1.0, 0.2, 'power3'))), 100)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from viroconcom.fitting import Fit
+from viroconcom.serialization import to_dict, from_dict, dump, load
+
+
+class SerializationTest(unittest.TestCase):
+
+    def setUp(self):
+        prng = np.random.RandomState(42)
+        self.sample_1 = prng.weibull(1.5, 1000) * 3
+        self.sample_2 = 0.1 + 1.5 * np.exp(0.2 * self.sample_1) + \
+            prng.lognormal(2, 0.2, 1000)
+        self.sample_3 = 2 + 0.5 * self.sample_2 + prng.normal(0, 1, 1000)
+
+    def assert_same_distribution(self, mul_var_dist, loaded):
+        self.assertEqual(loaded.dependencies, mul_var_dist.dependencies)
+        probabilities = np.array([0.1, 0.5, 0.9])
+        rv_values = [np.array([1.0, 3.0, 6.0]), np.array([8.0, 10.0, 14.0]),
+                     np.array([5.0, 7.0, 9.0])]
+        for dimension, (distribution, loaded_distribution) in enumerate(
+                zip(mul_var_dist.distributions, loaded.distributions)):
+            self.assertIs(type(loaded_distribution), type(distribution))
+            dependency = mul_var_dist.dependencies[dimension]
+            np.testing.assert_allclose(
+                loaded_distribution.i_cdf(probabilities, rv_values, dependency),
+                distribution.i_cdf(probabilities, rv_values, dependency))
+
+    def test_parametric_roundtrip(self):
+        """
+        Fitted parametric distributions are restored exactly.
+        """
+        dist_descriptions = (
+            {'name': 'Weibull_3p', 'dependency': (None, None, None),
+             'width_of_intervals': 2},
+            {'name': 'Lognormal_SigmaMu', 'dependency': (0, None, 0),
+             'functions': ('exp3', None, 'power3'), 'width_of_intervals': 2},
+            {'name': 'Normal', 'dependency': (None, 1, 1),
+             'functions': (None, 'power3', 'exp3')})
+        my_fit = Fit((self.sample_1, self.sample_2, self.sample_3),
+                     dist_descriptions)
+        data = to_dict(my_fit.mul_var_dist)
+        self.assertEqual(data['version'], 1)
+        # The stored data consists of plain values only.
+        loaded = from_dict(json.loads(json.dumps(data)))
+        self.assert_same_distribution(my_fit.mul_var_dist, loaded)
+        self.assertEqual(str(loaded.distributions[1].mu),
+                         str(my_fit.mul_var_dist.distributions[1].mu))
+
+        path = os.path.join(tempfile.mkdtemp(), 'model.json')
+        dump(my_fit.mul_var_dist, path)
+        self.assert_same_distribution(my_fit.mul_var_dist, load(path))
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+    def test_kernel_density_roundtrip(self):
+        """
+        Kernel densities are restored from their grids.
+        """
+        dist_descriptions = (
+            {'name': 'KernelDensity', 'dependency': (None, None, None),
+             'width_of_intervals': 2},
+            {'name': 'KernelDensity', 'dependency': (None, None, 0)})
+        my_fit = Fit((self.sample_1, self.sample_2), dist_descriptions)
+        file = io.StringIO()
+        dump(my_fit.mul_var_dist, file)
+        loaded = load(io.StringIO(file.getvalue()))
+        self.assert_same_distribution(my_fit.mul_var_dist, loaded)
+
+    def test_invalid_data(self):
+        """
+        Unknown schemas and newer versions are rejected.
+        """
+        self.assertRaises(ValueError, from_dict, {'distributions': []})
+        data = {'schema': 'viroconcom.MultivariateDistribution', 'version': 99,
+                'distributions': [], 'dependencies': []}
+        self.assertRaises(ValueError, from_dict, data)
+
+
+if __name__ == '__main__':
+    unittest.main()
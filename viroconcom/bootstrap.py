@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bootstrap uncertainty of fitted models and contours.
+"""
+
+import os
+import warnings
+from multiprocessing import Pool
+
+import numpy as np
+
+from .fitting import Fit, _share_samples
+from .params import FunctionParam
+from .contours import HighestDensityContour
+
+
+__all__ = ["Bootstrap"]
+
+# Number of finished replicates after which the checkpoint is written
+CHECKPOINT_INTERVAL = 10
+
+# Upper bound (exclusive) of the seeds of the replicates
+MAX_SEED = 2 ** 31 - 1
+
+
+def _get_coefficients(mul_var_dist):
+    """
+    Returns the names and values of the coefficients of all parameters of a
+    multivariate distribution, e.g. 'dimension 1 scale b' for the coefficient
+    b of the dependence function of the scale of the second dimension.
+    """
+    names = []
+    values = []
+    for dimension, distribution in enumerate(mul_var_dist.distributions):
+        for param_name in ('shape', 'loc', 'scale'):
+            param = getattr(distribution, param_name, None)
+            if param is None:
+                continue
+            if isinstance(param, FunctionParam):
+                for coefficient in ('a', 'b', 'c'):
+                    names.append('dimension {} {} {}'.format(
+                        dimension, param_name, coefficient))
+                    values.append(getattr(param, coefficient))
+            else:
+                names.append('dimension {} {}'.format(dimension, param_name))
+                values.append(param(None))
+    return names, np.array(values, dtype=np.float64)
+
+
+def _get_radii(coordinates, center, spread, n_angles):
+    """
+    Returns the largest distance of the points of a 2-d contour from center
+    for each of n_angles equally spaced angles (NaN if no point is within
+    that sector). The coordinates are normalized by spread.
+    """
+    x = (np.concatenate([part[0] for part in coordinates]) - center[0]) / spread[0]
+    y = (np.concatenate([part[1] for part in coordinates]) - center[1]) / spread[1]
+    sectors = np.floor(np.mod(np.arctan2(y, x), 2 * np.pi) / (2 * np.pi) * n_angles)
+    sectors = np.minimum(sectors.astype(int), n_angles - 1)
+    radii = np.full(n_angles, -np.inf)
+    np.maximum.at(radii, sectors, np.hypot(x, y))
+    radii[np.isinf(radii)] = np.nan
+    return radii
+
+
+def _bootstrap_replicate(args):
+    """
+    Fits the model (and computes the contour) for one bootstrap resample.
+
+    Module level function, such that it can be sent to a process pool. The
+    resample is drawn as the number of times each sample is drawn, which is
+    used as weight, thus the samples are not copied.
+
+    Returns the index of the replicate, the names and values of the
+    coefficients of the model and the contour summary or None for all of them
+    if the replicate failed.
+    """
+    index, path, shape, seed, settings = args
+    samples = np.asarray(np.memmap(path, dtype=np.float64, mode='r', shape=shape))
+    n = shape[1]
+    prng = np.random.RandomState(seed)
+    counts = np.bincount(prng.randint(0, n, n), minlength=n)
+    dist_descriptions = [dict(dist_description)
+                         for dist_description in settings['dist_descriptions']]
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            fit = Fit(samples, dist_descriptions, weights=counts, keep_samples=False)
+        names, coefficients = _get_coefficients(fit.mul_var_dist)
+        contour = None
+        if settings['contour'] is not None:
+            contour = settings['contour'](fit.mul_var_dist, **settings['contour_kwargs'])
+            if settings['contour'] is HighestDensityContour:
+                contour = _get_radii(contour.coordinates, settings['center'],
+                                     settings['spread'], settings['n_angles'])
+            else:
+                contour = np.array(contour.coordinates[0], dtype=np.float64)
+    except (RuntimeError, ValueError):
+        return index, None, None, None
+    return index, names, coefficients, contour
+
+
+class Bootstrap():
+    """
+    Bootstrap uncertainty of a fitted model and optionally of its contour.
+
+    The model is fitted to n_resamples resamples of the samples (drawn with
+    replacement) and the contour of each fitted model is computed. Quantile
+    bands are computed per coefficient of the model, per point for IFORM and
+    ISORM contours and per angle for highest density contours.
+
+    Attributes
+    ----------
+    parameter_names : list of str
+        The names of the coefficients of the model, e.g.
+        'dimension 1 scale b'.
+    parameters : ndarray
+        The coefficients of the model fitted to each resample, with shape
+        (n_resamples, number of coefficients). NaN for failed replicates.
+    parameter_quantiles : ndarray
+        The quantiles of the coefficients, with shape (len(quantiles),
+        number of coefficients).
+    contours : ndarray
+        The contour of each resample. For IFORM and ISORM contours the
+        coordinates with shape (n_resamples, number of dimensions, n_points),
+        for highest density contours the radius for each angle with shape
+        (n_resamples, n_angles). None if no contour is computed.
+    contour_quantiles : ndarray
+        The quantile bands of the contour as coordinates with shape
+        (len(quantiles), number of dimensions, number of points). For highest
+        density contours the points are at n_angles equally spaced angles
+        around center, in coordinates normalized by spread.
+    center, spread : ndarray
+        The mean and the standard deviation of the samples of each dimension,
+        which define the angles of highest density contours.
+    n_failed : int
+        The number of replicates whose fit or contour failed.
+
+    Examples
+    --------
+    >>> from viroconcom.contours import IFormContour
+    >>> prng = np.random.RandomState(42)
+    >>> sample_hs = prng.weibull(1.5, 500) * 3
+    >>> sample_tz = 0.1 + 1.5 * np.exp(0.2 * sample_hs) + prng.lognormal(2, 0.2, 500)
+    >>> dist_description_hs = {'name': 'Weibull_2p',
+    ...                        'dependency': (None, None, None),
+    ...                        'width_of_intervals': 2}
+    >>> dist_description_tz = {'name': 'Lognormal',
+    ...                        'dependency': (None, None, 0),
+    ...                        'functions': (None, None, 'exp3')}
+    >>> bootstrap = Bootstrap((sample_hs, sample_tz),
+    ...                       (dist_description_hs, dist_description_tz),
+    ...                       n_resamples=5, contour=IFormContour,
+    ...                       contour_kwargs={'return_period': 50, 'n_points': 20},
+    ...                       random_state=42)
+    >>> bootstrap.contour_quantiles.shape
+    (3, 2, 20)
+    """
+
+    def __init__(self, samples, dist_descriptions, n_resamples=100, contour=None,
+                 contour_kwargs=None, quantiles=(0.025, 0.5, 0.975), n_angles=360,
+                 workers=None, random_state=None, checkpoint=None):
+        """
+        Runs the bootstrap.
+
+        Parameters
+        ----------
+        samples : list of list or ndarray or DataFrame
+            The samples, as for Fit. All dimensions must have the same number
+            of samples.
+        dist_descriptions : list of dict
+            The descriptions of the distributions, see Fit.
+        n_resamples : int, optional
+            The number of resamples. Defaults to 100.
+        contour : type, optional
+            The contour class, IFormContour, ISormContour or
+            HighestDensityContour. If None, only the model is fitted.
+        contour_kwargs : dict, optional
+            Keyword arguments of the contour, e.g. return_period and n_points
+            or limits and deltas.
+        quantiles : tuple of float, optional
+            The quantiles of the bands. Defaults to (0.025, 0.5, 0.975).
+        n_angles : int, optional
+            The number of angles of the bands of highest density contours.
+        workers : int, optional
+            Number of processes that compute the replicates. The processes
+            attach to a memory-mapped copy of the samples. If None, the
+            replicates are computed serially.
+        random_state : int, optional
+            Seed of the resamples. Each replicate uses its own seed, drawn
+            from it, thus the results do not depend on workers.
+        checkpoint : str, optional
+            Path of a .npz file the finished replicates are written to every
+            CHECKPOINT_INTERVAL replicates. If the file exists, its
+            replicates are loaded and only the missing ones are computed.
+
+        Raises
+        ------
+        ValueError
+            If the dimensions have different numbers of samples, if a highest
+            density contour is not 2-dimensional or if the checkpoint belongs
+            to another bootstrap.
+        RuntimeError
+            If the fits of all replicates failed.
+        """
+        samples = Fit._as_columns(samples)
+        if isinstance(samples, list):
+            raise ValueError("All dimensions must have the same number of samples.")
+        if contour is HighestDensityContour and len(samples) != 2:
+            raise ValueError("Bands of highest density contours are only "
+                             "supported for 2 dimensions.")
+        self.center = np.array([sample.mean() for sample in samples])
+        self.spread = np.array([sample.std() for sample in samples])
+        self.n_angles = n_angles
+
+        if random_state is None:
+            seed = np.random.randint(MAX_SEED)
+        else:
+            seed = int(random_state)
+
+        done = np.zeros(n_resamples, dtype=bool)
+        self.parameter_names = None
+        self.parameters = None
+        self.contours = None
+        if checkpoint is not None and os.path.exists(checkpoint):
+            with np.load(checkpoint) as stored:
+                if int(stored['n_resamples']) != n_resamples or \
+                        (random_state is not None and int(stored['seed']) != seed):
+                    raise ValueError("The checkpoint '{}' belongs to another "
+                                     "bootstrap.".format(checkpoint))
+                seed = int(stored['seed'])
+                done = stored['done']
+                if 'parameters' in stored:
+                    self.parameter_names = [str(name) for name in
+                                            stored['parameter_names']]
+                    self.parameters = stored['parameters']
+                if 'contours' in stored:
+                    self.contours = stored['contours']
+        seeds = np.random.RandomState(seed).randint(MAX_SEED, size=n_resamples)
+
+        settings = {'dist_descriptions': [dict(dist_description)
+                                          for dist_description in dist_descriptions],
+                    'contour': contour,
+                    'contour_kwargs': contour_kwargs or {},
+                    'center': self.center,
+                    'spread': self.spread,
+                    'n_angles': n_angles}
+
+        shared = _share_samples(samples)
+        try:
+            tasks = [(i, shared[0], shared[1], seeds[i], settings)
+                     for i in np.flatnonzero(~done)]
+            if workers and workers > 1:
+                pool = Pool(processes=workers)
+                results = pool.imap_unordered(_bootstrap_replicate, tasks)
+            else:
+                pool = None
+                results = map(_bootstrap_replicate, tasks)
+            try:
+                for n_finished, (index, names, coefficients, contour_summary) in \
+                        enumerate(results, 1):
+                    done[index] = True
+                    if coefficients is not None:
+                        # The names are taken from the first successful
+                        # replicate, all replicates fit the same model.
+                        if self.parameters is None:
+                            self.parameter_names = names
+                            self.parameters = np.full(
+                                (n_resamples, len(names)), np.nan)
+                        self.parameters[index] = coefficients
+                    if contour_summary is not None:
+                        if self.contours is None:
+                            self.contours = np.full(
+                                (n_resamples,) + contour_summary.shape, np.nan)
+                        self.contours[index] = contour_summary
+                    if checkpoint is not None and \
+                            (n_finished % CHECKPOINT_INTERVAL == 0 or done.all()):
+                        self._save_checkpoint(checkpoint, n_resamples, seed, done)
+            finally:
+                if pool is not None:
+                    pool.terminate()
+        finally:
+            os.remove(shared[0])
+
+        if self.parameters is None:
+            raise RuntimeError("The fits of all {} replicates failed."
+                               "".format(n_resamples))
+        self.n_failed = int(np.sum(np.isnan(self.parameters).any(axis=1)))
+        percentiles = 100 * np.asarray(quantiles)
+        self.parameter_quantiles = np.nanpercentile(self.parameters, percentiles, axis=0)
+        self.contour_quantiles = None
+        if self.contours is not None:
+            contour_quantiles = np.nanpercentile(self.contours, percentiles, axis=0)
+            if contour is HighestDensityContour:
+                angles = (np.arange(n_angles) + 0.5) * 2 * np.pi / n_angles
+                contour_quantiles = np.stack((
+                    self.center[0] + contour_quantiles * np.cos(angles) * self.spread[0],
+                    self.center[1] + contour_quantiles * np.sin(angles) * self.spread[1]),
+                    axis=1)
+            self.contour_quantiles = contour_quantiles
+
+    def _save_checkpoint(self, path, n_resamples, seed, done):
+        """
+        Writes the finished replicates to path, replacing the file at once
+        such that an interrupted write does not corrupt the checkpoint.
+        """
+        arrays = {'n_resamples': n_resamples,
+                  'seed': seed,
+                  'done': done}
+        if self.parameters is not None:
+            arrays['parameter_names'] = np.array(self.parameter_names)
+            arrays['parameters'] = self.parameters
+        if self.contours is not None:
+            arrays['contours'] = self.contours
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary_path, path)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of fitted models.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+
+import numpy as np
+
+
+__all__ = ["FitCache"]
+
+# Default maximal size of a cache directory in bytes
+DEFAULT_CACHE_SIZE = 2 ** 30
+
+# Version of the stored entries, part of each key
+CACHE_VERSION = 1
+
+
+class FitCache():
+    """
+    A directory that stores the results of fits, keyed by a hash of the
+    samples and the settings of the fit.
+
+    Each entry is a JSON file. If the directory grows larger than max_size,
+    the least recently used entries are removed. Several processes can use
+    the same directory, entries are written atomically.
+
+    Attributes
+    ----------
+    directory : str
+        The cache directory.
+    max_size : int
+        The maximal size of all entries in bytes.
+
+    Examples
+    --------
+    >>> import tempfile
+    >>> cache = FitCache(tempfile.mkdtemp())
+    >>> key = cache.get_key([np.arange(3.0)], settings={'name': 'Weibull_2p'})
+    >>> cache.load(key) is None
+    True
+    >>> cache.store(key, {'answer': 42})
+    >>> cache.load(key)
+    {'answer': 42}
+    >>> cache.clear()
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_CACHE_SIZE):
+        """
+        Parameters
+        ----------
+        directory : str
+            The cache directory, it is created if it does not exist.
+        max_size : int, optional
+            The maximal size of all entries in bytes. Defaults to 1 GiB.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_size = max_size
+
+    @staticmethod
+    def get_key(arrays, settings=None):
+        """
+        Returns the key of an entry, the sha256 hash of the arrays and the
+        settings.
+
+        Parameters
+        ----------
+        arrays : list of array_like
+            The data, e.g. the samples and the weights of a fit. None
+            elements are allowed. Contiguous float64 arrays are hashed
+            without a copy.
+        settings : dict, optional
+            Settings that change the result, e.g. the dist_descriptions. They
+            must be serializable as JSON (tuples are treated as lists).
+
+        Returns
+        -------
+        str
+            The key, a hexadecimal string.
+        """
+        key = hashlib.sha256()
+        key.update("viroconcom fit cache {}".format(CACHE_VERSION).encode())
+        for array in arrays:
+            if array is None:
+                key.update(b"None")
+                continue
+            array = np.ascontiguousarray(array, dtype=np.float64)
+            key.update(str(array.shape).encode())
+            key.update(memoryview(array).cast('B'))
+        key.update(json.dumps(settings, sort_keys=True, default=repr).encode())
+        return key.hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def load(self, key):
+        """
+        Returns the entry of a key or None if there is no valid entry. The
+        entry is marked as recently used.
+        """
+        path = self._get_path(key)
+        try:
+            with open(path) as file:
+                data = json.load(file)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # A corrupted entry is removed and recomputed.
+            self._remove(path)
+            return None
+        return data
+
+    def store(self, key, data):
+        """
+        Stores the entry (a dict that can be serialized as JSON) of a key and
+        removes the least recently used entries if the cache is too large.
+        """
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, prefix='.' + key, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'w') as file:
+                json.dump(data, file)
+            os.replace(temporary_path, self._get_path(key))
+        except BaseException:
+            self._remove(temporary_path)
+            raise
+        self._evict()
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                self._remove(os.path.join(self.directory, name))
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the entries are not
+        larger than max_size.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                status = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((status.st_mtime, status.st_size, path))
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            self._remove(path)
+            size -= entry_size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
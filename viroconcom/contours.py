@@ -154,11 +154,6 @@ class IFormContour(Contour):
             The computed results.
         """
 
-        # Creates list with size that equals grade of dimensions used
-        data = [None] * self.distribution.n_dim
-
-        distributions = self.distribution.distributions
-
         beta = sts.norm.ppf(1 - self.alpha)
 
         # Create sphere
@@ -173,16 +168,11 @@ class IFormContour(Contour):
             sphere = NSphere(dim=self.distribution.n_dim, n_samples=n_points)
             sphere_points = beta * sphere.unit_sphere_points
 
-        # Get probabilities for coordinates of shape
-        norm_cdf_per_dimension = [sts.norm.cdf(sphere_points[:, dim])
-                               for dim in range(self.distribution.n_dim)]
-
-        # Inverse procedure. Get coordinates from probabilities.
-        for index, distribution in enumerate(distributions):
-            data[index] = distribution.i_cdf(norm_cdf_per_dimension[index], rv_values=data,
-                                             dependencies=self.distribution.dependencies[index])
+        # Inverse procedure. Get coordinates from the probabilities of the
+        # coordinates of shape
+        data = self.distribution.compile().inverse_rosenblatt(sphere_points)
 
-        coordinates = [data]
+        coordinates = [list(data.T)]
 
         return (beta, sphere_points, coordinates)
 
@@ -275,11 +265,6 @@ class ISormContour(Contour):
             The computed results.
         """
 
-        # Creates list with size that equals grade of dimensions used.
-        data = [None] * self.distribution.n_dim
-
-        distributions = self.distribution.distributions
-
         # Use the ICDF of a chi-squared distribution with n dimensions. For
         # reference see equation 20 in Chai and Leira (2018).
         beta = math.sqrt(sts.chi2.ppf(1 - self.alpha, self.distribution.n_dim))
@@ -296,16 +281,11 @@ class ISormContour(Contour):
             sphere = NSphere(dim=self.distribution.n_dim, n_samples=n_points)
             sphere_points = beta * sphere.unit_sphere_points
 
-        # Get probabilities for coordinates of shape.
-        norm_cdf_per_dimension = [sts.norm.cdf(sphere_points[:, dim])
-                               for dim in range(self.distribution.n_dim)]
-
-        # Inverse procedure. Get coordinates from probabilities.
-        for index, distribution in enumerate(distributions):
-            data[index] = distribution.i_cdf(norm_cdf_per_dimension[index], rv_values=data,
-                                             dependencies=self.distribution.dependencies[index])
+        # Inverse procedure. Get coordinates from the probabilities of the
+        # coordinates of shape.
+        data = self.distribution.compile().inverse_rosenblatt(sphere_points)
 
-        coordinates = [data]
+        coordinates = [list(data.T)]
 
         return (beta, sphere_points, coordinates)
 
@@ -4,7 +4,6 @@
 Uni- and multivariate distributions.
 """
 
-import itertools
 from abc import ABC, abstractmethod
 
 import numpy as np
@@ -15,7 +14,11 @@ from .params import FunctionParam, ConstantParam, Wrapper
 
 __all__ = ["Distribution", "ParametricDistribution", "WeibullDistribution",
            "LognormalDistribution", "NormalDistribution", "KernelDensityDistribution",
-           "MultivariateDistribution"]
+           "ConditionalKernelDensityDistribution", "MultivariateDistribution",
+           "CompiledMultivariateDistribution"]
+
+# Default number of points that are evaluated at once
+DEFAULT_CHUNK_SIZE = 100000
 
 
 class Distribution(ABC):
@@ -118,6 +121,17 @@ class ParametricDistribution(Distribution, ABC):
         self._valid_scale = {"min" : -np.inf, "strict_greater" : True,
                              "max" : np.inf, "strict_less" : True }
 
+    def __getstate__(self):
+        """
+        Returns only the parameters, the other attributes are set by __init__
+        when the distribution is unpickled, such that a pickled distribution
+        is small, e.g. if it is sent to worker processes.
+        """
+        return (self.shape, self.loc, self.scale)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
 
     @abstractmethod
     def _scipy_cdf(self, x, shape, loc, scale):
@@ -127,6 +141,11 @@ class ParametricDistribution(Distribution, ABC):
     def _scipy_i_cdf(self, probabilities, shape, loc, scale):
         """Overwrite with appropriate i_cdf function from scipy package. """
 
+    def _scipy_logpdf(self, x, shape, loc, scale):
+        """Overwrite with appropriate logpdf function from scipy package. """
+        raise NotImplementedError(
+            "The distribution '{}' has no logpdf.".format(self.name))
+
     def cdf(self, x, rv_values, dependencies):
         """
         Calculate the cumulative distribution function.
@@ -185,6 +204,35 @@ class ParametricDistribution(Distribution, ABC):
 
         return self._scipy_i_cdf(probabilities, shape_val, loc_val, scale_val)
 
+    def logpdf(self, x, rv_values, dependencies):
+        """
+        Calculate the logarithm of the probability density function.
+
+        Parameters
+        ----------
+        x : array_like
+            Points at which to calculate the logpdf.
+        rv_values : array_like
+            Values of all random variables in variable space in correct order.
+            This can be a 1-dimensional array with length equal to the number of
+            random variables N or a 2-dimensional array with shape (N, M).
+            If x is an array, M must be len(x).
+        dependencies : tuple
+            A 3-element tuple with one entry each for the shape, loc and scale parameters.
+            The entry is the index of the random variable the parameter depends on.
+            The index order has to be the same as in rv_values.
+
+        Returns
+        -------
+        logpdf : ndarray,
+            Logarithm of the probability density function evaluated at x under
+            condition rv_values.
+        """
+
+        shape_val, loc_val, scale_val = self._get_parameter_values(rv_values, dependencies)
+
+        return self._scipy_logpdf(x, shape_val, loc_val, scale_val)
+
     def _get_parameter_values(self, rv_values, dependencies):
         """
         Evaluates the conditional shape, loc, scale parameters.
@@ -347,6 +395,9 @@ class WeibullDistribution(ParametricDistribution):
     def _scipy_i_cdf(self, probabilities, shape, loc, scale):
         return sts.weibull_min.ppf(probabilities, c=shape, loc=loc, scale=scale)
 
+    def _scipy_logpdf(self, x, shape, loc, scale):
+        return sts.weibull_min.logpdf(x, c=shape, loc=loc, scale=scale)
+
 
 class LognormalDistribution(ParametricDistribution):
     """
@@ -392,15 +443,11 @@ class LognormalDistribution(ParametricDistribution):
             shape = self.sigma
             # Make mu a scale parameter
             if isinstance(self.mu, FunctionParam):
-                _func = self.mu._func
-                _a = self.mu.a
-                _b = self.mu.b
-                _c = self.mu.c
                 # Keep possibly already existing wrapper
                 scale_wrapper = Wrapper(np.exp, self.mu._wrapper)
                 # Create new FunctionParam so the passed one does not get altered
-                scale = FunctionParam(_a, _b, _c, "power3", wrapper=scale_wrapper)
-                scale._func = _func
+                scale = FunctionParam(self.mu.a, self.mu.b, self.mu.c,
+                                      self.mu.func_name, wrapper=scale_wrapper)
             else:
                 scale = ConstantParam(np.exp(self.mu(None)))
 
@@ -412,7 +459,17 @@ class LognormalDistribution(ParametricDistribution):
         self._valid_scale = {"min" : 0, "strict_greater" : True,
                              "max" : np.inf, "strict_less" : True }
 
+    def __getstate__(self):
+        # A distribution created with sigma and mu is recreated with them.
+        if hasattr(self, "mu"):
+            return {"sigma": self.sigma, "mu": self.mu}
+        return super().__getstate__()
 
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            self.__init__(**state)
+        else:
+            super().__setstate__(state)
 
     def _scipy_cdf(self, x, shape, _, scale):
         return sts.lognorm.cdf(x, s=shape, scale=scale)
@@ -420,6 +477,9 @@ class LognormalDistribution(ParametricDistribution):
     def _scipy_i_cdf(self, probabilities, shape, _, scale):
         return sts.lognorm.ppf(probabilities, s=shape, scale=scale)
 
+    def _scipy_logpdf(self, x, shape, _, scale):
+        return sts.lognorm.logpdf(x, s=shape, scale=scale)
+
     def __str__(self):
         if hasattr(self, "mu"):
             return  "LognormalDistribution with shape={}, loc={}," \
@@ -464,6 +524,9 @@ class NormalDistribution(ParametricDistribution):
     def _scipy_i_cdf(self, probabilities, _, loc, scale):
         return sts.norm.ppf(probabilities, loc=loc, scale=scale)
 
+    def _scipy_logpdf(self, x, _, loc, scale):
+        return sts.norm.logpdf(x, loc=loc, scale=scale)
+
 
 class MultivariateDistribution():
     """
@@ -565,6 +628,156 @@ class MultivariateDistribution():
                 return ("The length of dependencies was not three.")
         return None
 
+    def compile(self):
+        """
+        Resolves the distributions and dependencies into an evaluation plan.
+
+        The plan evaluates the conditional distributions of all points at
+        once, without resolving the dependencies and validating the
+        parameters point by point. Compile again after a distribution or a
+        parameter was changed.
+
+        Returns
+        -------
+        plan : CompiledMultivariateDistribution
+            The plan, which evaluates the joint pdf and the Rosenblatt
+            transformation of arrays of points.
+        """
+        return CompiledMultivariateDistribution(self)
+
+    def rosenblatt(self, points, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Transforms points into the standard normal space (Rosenblatt
+        transformation).
+
+        The conditional cdfs are evaluated in the order of the dimensions and
+        transformed with the inverse of the standard normal cdf. The points
+        are processed in chunks, thus large arrays, e.g. memory-mapped
+        observations, can be transformed. The cdfs of all distributions,
+        including kernel densities, are evaluated for a whole chunk at once.
+
+        Parameters
+        ----------
+        points : array_like
+            The points, with shape (n_points, n_dim).
+        chunk_size : int, optional
+            The number of points that are transformed at once.
+
+        Returns
+        -------
+        u : ndarray
+            The points in the standard normal space, with shape
+            (n_points, n_dim). Points with a cdf of 0 or 1 are transformed to
+            -inf or inf.
+        radii : ndarray
+            The distance of each point from the origin of the standard normal
+            space. Points with a radius larger than the beta of an IFORM
+            contour lie outside of the contour.
+
+        Raises
+        ------
+        ValueError
+            If points do not have the shape (n_points, n_dim) or a dependent
+            parameter is out of bounds.
+
+        Examples
+        --------
+        >>> from viroconcom.params import ConstantParam
+        >>> mul_var_dist = MultivariateDistribution(
+        ...     [NormalDistribution(None, ConstantParam(1), ConstantParam(2))],
+        ...     [(None, None, None)])
+        >>> u, radii = mul_var_dist.rosenblatt([[1], [5], [-1]])
+        >>> [round(float(radius), 6) for radius in radii]
+        [0.0, 2.0, 1.0]
+        """
+        points, chunks = self._get_chunks(points, chunk_size)
+        plan = self.compile()
+        u = np.empty(points.shape)
+        for chunk in chunks:
+            u[chunk] = plan.rosenblatt(points[chunk])
+        radii = np.sqrt(np.einsum('ij,ij->i', u, u))
+        return u, radii
+
+    def logpdf(self, points, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Calculates the logarithm of the joint probability density function
+        at arbitrary points.
+
+        The joint logpdf is the sum of the conditional logpdfs of the
+        distributions, thus it stays finite in the far tail, where the pdf is
+        rounded to 0. The points are processed in chunks.
+
+        Parameters
+        ----------
+        points : array_like
+            The points, with shape (n_points, n_dim).
+        chunk_size : int, optional
+            The number of points that are evaluated at once.
+
+        Returns
+        -------
+        logpdf : ndarray
+            The joint logpdf of each point, -inf outside of the support.
+
+        Raises
+        ------
+        ValueError
+            If points do not have the shape (n_points, n_dim) or a dependent
+            parameter is out of bounds.
+        NotImplementedError
+            If a distribution has no logpdf.
+
+        Examples
+        --------
+        >>> from viroconcom.params import ConstantParam
+        >>> mul_var_dist = MultivariateDistribution(
+        ...     [NormalDistribution(None, ConstantParam(0), ConstantParam(1))] * 2,
+        ...     [(None, None, None)] * 2)
+        >>> [round(float(value), 4) for value in mul_var_dist.logpdf([[0, 0], [30, 40]])]
+        [-1.8379, -1251.8379]
+        """
+        points, chunks = self._get_chunks(points, chunk_size)
+        plan = self.compile()
+        logpdf = np.empty(len(points))
+        for chunk in chunks:
+            logpdf[chunk] = plan.joint_logpdf(points[chunk])
+        return logpdf
+
+    def pdf(self, points, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Calculates the joint probability density function at arbitrary points.
+
+        Parameters
+        ----------
+        points : array_like
+            The points, with shape (n_points, n_dim).
+        chunk_size : int, optional
+            The number of points that are evaluated at once.
+
+        Returns
+        -------
+        pdf : ndarray
+            The joint pdf of each point, the exponential of logpdf.
+        """
+        return np.exp(self.logpdf(points, chunk_size))
+
+    def _get_chunks(self, points, chunk_size):
+        """
+        Checks the shape of points and returns them (as an array, not
+        copied if they already have a shape) and the slices of the chunks.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1, but was {}."
+                             "".format(chunk_size))
+        if not hasattr(points, 'shape'):
+            points = np.asarray(points, dtype=np.float64)
+        if len(points.shape) != 2 or points.shape[1] != self.n_dim:
+            raise ValueError("points must have the shape (n_points, {}), but had "
+                             "the shape {}.".format(self.n_dim, points.shape))
+        chunks = [slice(start, start + chunk_size)
+                  for start in range(0, len(points), chunk_size)]
+        return points, chunks
+
     def cell_averaged_joint_pdf(self, coords):
         """
         Calculates the cell averaged joint probabilty density function.
@@ -617,33 +830,25 @@ class MultivariateDistribution():
         """
         assert(len(coords) == self.n_dim)
         dimensions = range(self.n_dim)
-        dist = self.distributions[dist_index]
-        dependency = self.dependencies[dist_index]
-        cdf = dist.cdf
+        plan = self.compile()
+        x = np.asarray(coords[dist_index], dtype=np.float64)
 
-        dx = coords[dist_index][1] - coords[dist_index][0]
+        dx = x[1] - x[0]
 
         fbar_shape = tuple((len(coords[i]) for i in dimensions if i <= dist_index))
-        fbar = np.zeros(fbar_shape)
-
-        # Iterate over all possible dependencies.
-        iter_ranges = (range(i) for i in fbar_shape[0:-1])
-        it = itertools.product(*iter_ranges)
 
-        for multi_index in it:
-            f_index = multi_index + (slice(None),)  # = e.g. (i,j,:) for 3 dimensions
+        # All combinations of the coordinates of the preceding dimensions, one
+        # per row. The random variable must be independent of the other
+        # dimensions, so they are set to 0.
+        grids = np.meshgrid(*(coords[i] for i in range(dist_index)), indexing='ij')
+        current_points = [grid.reshape(-1, 1) for grid in grids] + \
+                         [0] * (self.n_dim - dist_index)
 
-            current_point = np.empty(len(coords))
-            for i in range(len(coords)):
-                if i < len(multi_index):
-                    current_point[i] = coords[i][multi_index[i]]
-                else:  # random variable must be independent of this dimensions, so set to 0
-                    current_point[i] = 0
-
-            # calculate averaged pdf
-            lower = cdf(coords[dist_index] - 0.5 * dx, current_point, dependency)
-            upper = cdf(coords[dist_index] + 0.5 * dx, current_point, dependency)
-            fbar[f_index] = (upper - lower)  # / dx
+        # calculate averaged pdf
+        lower = plan.cdf(dist_index, x - 0.5 * dx, current_points)
+        upper = plan.cdf(dist_index, x + 0.5 * dx, current_points)
+        fbar = np.broadcast_to(upper - lower, (int(np.prod(fbar_shape[0:-1])),
+                                               len(x))).reshape(fbar_shape)  # / dx
 
         # Append axes until self.n_dim is reached.
         n_dim_shape = fbar_shape + tuple((1 for i in range(self.n_dim - len(fbar_shape))))
@@ -824,6 +1029,362 @@ class MultivariateDistribution():
         return latex_string_list
 
 
+def _check_parameter_values(distribution, param_index, param_values):
+    """
+    Checks the parameter values of all points at once by their minimum and
+    maximum (NaN values are propagated and rejected).
+    """
+    if np.size(param_values) > 0:
+        distribution._check_parameter_value(param_index, np.min(param_values))
+        distribution._check_parameter_value(param_index, np.max(param_values))
+
+
+class CompiledMultivariateDistribution():
+    """
+    An evaluation plan of a multivariate distribution, created with
+    MultivariateDistribution.compile().
+
+    The dependencies are resolved once: constant parameters are evaluated
+    and validated when the plan is compiled, dependent parameters are
+    evaluated for all points at once and validated by their minimum and
+    maximum. Parametric distributions are evaluated with their scipy
+    functions, other distributions with their cdf and i_cdf methods.
+
+    Points are given as arrays with shape (n_points, n_dim).
+
+    Attributes
+    ----------
+    n_dim : int
+        The number of dimensions.
+
+    Examples
+    --------
+    >>> from viroconcom.params import ConstantParam, FunctionParam
+    >>> mul_var_dist = MultivariateDistribution(
+    ...     [WeibullDistribution(ConstantParam(1.5), None, ConstantParam(3)),
+    ...      LognormalDistribution(sigma=ConstantParam(0.2),
+    ...                            mu=FunctionParam(0.1, 1.5, 0.2, "exp3"))],
+    ...     [(None, None, None), (None, None, 0)])
+    >>> plan = mul_var_dist.compile()
+    >>> u = np.array([[0.5, -1.0], [2.0, 1.0]])
+    >>> x = plan.inverse_rosenblatt(u)
+    >>> bool(np.allclose(plan.rosenblatt(x), u))
+    True
+    """
+
+    def __init__(self, mul_var_dist):
+        """
+        Parameters
+        ----------
+        mul_var_dist : MultivariateDistribution
+            The distribution to compile.
+
+        Raises
+        ------
+        ValueError
+            If a constant parameter is out of bounds.
+        """
+        self.n_dim = mul_var_dist.n_dim
+        self._distributions = list(mul_var_dist.distributions)
+        self._dependencies = [tuple(dependency)
+                              for dependency in mul_var_dist.dependencies]
+
+        # Per dimension the resolved parameters, a value or a tuple of the
+        # parameter and the index of the dimension it depends on. None for
+        # distributions that are not parametric.
+        self._parameters = []
+        for distribution, dependency in zip(self._distributions, self._dependencies):
+            if not isinstance(distribution, ParametricDistribution):
+                self._parameters.append(None)
+                continue
+            params = (distribution.shape, distribution.loc, distribution.scale)
+            defaults = (distribution._default_shape, distribution._default_loc,
+                        distribution._default_scale)
+            parameters = []
+            for i, param in enumerate(params):
+                if param is None:
+                    parameters.append(defaults[i])
+                elif dependency[i] is None:
+                    parameters.append(param(None))
+                    distribution._check_parameter_value(i, parameters[-1])
+                else:
+                    parameters.append((param, dependency[i]))
+            self._parameters.append(parameters)
+
+    def _get_parameter_values(self, dimension, rv_values):
+        """
+        Evaluates the parameters of a dimension for all points at once.
+        """
+        distribution = self._distributions[dimension]
+        parameter_values = []
+        for i, parameter in enumerate(self._parameters[dimension]):
+            if isinstance(parameter, tuple):
+                param, dependency = parameter
+                x = np.asarray(rv_values[dependency], dtype=np.float64)
+                if isinstance(param, (FunctionParam, ConstantParam)):
+                    # Their functions are vectorized.
+                    parameter = np.broadcast_to(param._value(x), x.shape)
+                else:
+                    parameter = np.asarray(param(x), dtype=np.float64)
+                _check_parameter_values(distribution, i, parameter)
+            parameter_values.append(parameter)
+        return parameter_values
+
+    def cdf(self, dimension, x, rv_values):
+        """
+        Calculates the conditional cumulative distribution function of a
+        dimension.
+
+        Parameters
+        ----------
+        dimension : int
+            The index of the dimension.
+        x : array_like
+            Points at which to calculate the cdf.
+        rv_values : array_like
+            Values of the random variables, rv_values[i] are the values of
+            dimension i. They must broadcast with x.
+
+        Returns
+        -------
+        cdf : ndarray
+            The cdf evaluated at x under condition rv_values.
+        """
+        distribution = self._distributions[dimension]
+        if self._parameters[dimension] is None:
+            return np.asarray(distribution.cdf(x, rv_values,
+                                               self._dependencies[dimension]),
+                              dtype=np.float64)
+        return distribution._scipy_cdf(
+            x, *self._get_parameter_values(dimension, rv_values))
+
+    def i_cdf(self, dimension, probabilities, rv_values):
+        """
+        Calculates the conditional inverse cumulative distribution function
+        of a dimension.
+
+        Parameters
+        ----------
+        dimension : int
+            The index of the dimension.
+        probabilities : array_like
+            Probabilities for which to calculate the i_cdf.
+        rv_values : array_like
+            Values of the random variables, rv_values[i] are the values of
+            dimension i. They must broadcast with probabilities.
+
+        Returns
+        -------
+        i_cdf : ndarray
+            The i_cdf evaluated for probabilities under condition rv_values.
+        """
+        distribution = self._distributions[dimension]
+        if self._parameters[dimension] is None:
+            return np.asarray(distribution.i_cdf(probabilities, rv_values,
+                                                 self._dependencies[dimension]),
+                              dtype=np.float64)
+        return distribution._scipy_i_cdf(
+            probabilities, *self._get_parameter_values(dimension, rv_values))
+
+    def logpdf(self, dimension, x, rv_values):
+        """
+        Calculates the logarithm of the conditional probability density
+        function of a dimension.
+
+        Parameters
+        ----------
+        dimension : int
+            The index of the dimension.
+        x : array_like
+            Points at which to calculate the logpdf.
+        rv_values : array_like
+            Values of the random variables, rv_values[i] are the values of
+            dimension i. They must broadcast with x.
+
+        Returns
+        -------
+        logpdf : ndarray
+            The logpdf evaluated at x under condition rv_values.
+
+        Raises
+        ------
+        NotImplementedError
+            If the distribution has no logpdf.
+        """
+        distribution = self._distributions[dimension]
+        if self._parameters[dimension] is None:
+            if not hasattr(distribution, 'logpdf'):
+                raise NotImplementedError(
+                    "The distribution '{}' has no logpdf.".format(distribution.name))
+            return np.asarray(distribution.logpdf(
+                x, rv_values, self._dependencies[dimension]), dtype=np.float64)
+        return distribution._scipy_logpdf(
+            x, *self._get_parameter_values(dimension, rv_values))
+
+    def _as_points(self, points):
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim != 2 or points.shape[1] != self.n_dim:
+            raise ValueError("points must have the shape (n_points, {}), but had "
+                             "the shape {}.".format(self.n_dim, points.shape))
+        return points
+
+    def joint_logpdf(self, points):
+        """
+        Calculates the logarithm of the joint probability density function,
+        the sum of the conditional logpdfs of all dimensions.
+
+        Parameters
+        ----------
+        points : array_like
+            The points, with shape (n_points, n_dim).
+
+        Returns
+        -------
+        logpdf : ndarray
+            The joint logpdf of each point.
+        """
+        rv_values = self._as_points(points).T
+        logpdf = np.zeros(rv_values.shape[1])
+        for dimension in range(self.n_dim):
+            logpdf += self.logpdf(dimension, rv_values[dimension], rv_values)
+        return logpdf
+
+    def joint_pdf(self, points):
+        """
+        Calculates the joint probability density function, the product of
+        the conditional pdfs of all dimensions.
+
+        Parameters
+        ----------
+        points : array_like
+            The points, with shape (n_points, n_dim).
+
+        Returns
+        -------
+        pdf : ndarray
+            The joint pdf of each point.
+        """
+        return np.exp(self.joint_logpdf(points))
+
+    def rosenblatt(self, points):
+        """
+        Transforms points into the standard normal space.
+
+        The conditional cdfs are evaluated in the order of the dimensions
+        and transformed with the inverse of the standard normal cdf.
+
+        Parameters
+        ----------
+        points : array_like
+            The points, with shape (n_points, n_dim).
+
+        Returns
+        -------
+        u : ndarray
+            The points in the standard normal space, with shape
+            (n_points, n_dim).
+        """
+        rv_values = self._as_points(points).T
+        u = np.empty(rv_values.shape)
+        for dimension in range(self.n_dim):
+            u[dimension] = sts.norm.ppf(
+                self.cdf(dimension, rv_values[dimension], rv_values))
+        return u.T
+
+    def inverse_rosenblatt(self, u):
+        """
+        Transforms points of the standard normal space into the space of the
+        distribution.
+
+        The standard normal cdf of the coordinates is transformed with the
+        conditional i_cdfs in the order of the dimensions, as for IFORM
+        contours.
+
+        Parameters
+        ----------
+        u : array_like
+            The points in the standard normal space, with shape
+            (n_points, n_dim).
+
+        Returns
+        -------
+        points : ndarray
+            The points, with shape (n_points, n_dim).
+        """
+        probabilities = sts.norm.cdf(self._as_points(u).T)
+        rv_values = np.empty(probabilities.shape)
+        for dimension in range(self.n_dim):
+            rv_values[dimension] = self.i_cdf(dimension, probabilities[dimension],
+                                              rv_values)
+        return rv_values.T
+
+
+def _find_grid_segment(x, quantile, last):
+    """
+    Finds the segment of a quantile grid that contains x.
+
+    The quantile function is monotonic, thus the grid position of x can be
+    found with a bisection that runs on all points at once.
+
+    Parameters
+    ----------
+    x : ndarray
+        The points.
+    quantile : function
+        Returns the quantile function at integer grid position(s), as arrays
+        that broadcast with x.
+    last : int
+        The last grid position.
+
+    Returns
+    -------
+    low : ndarray of int
+        The last grid position with a quantile <= x.
+    high : ndarray of int
+        The grid position after low.
+    """
+    low = np.zeros(x.shape, dtype=int)
+    high = np.full(x.shape, last, dtype=int)
+    while np.any(high - low > 1):
+        middle = (low + high) // 2
+        below = quantile(middle) <= x
+        low = np.where(below, middle, low)
+        high = np.where(below, high, middle)
+    return low, high
+
+
+def _quantile_grid_logpdf(x, quantile, last):
+    """
+    The logpdf of a quantile function that is sampled at equally spaced
+    probabilities and interpolated linearly.
+
+    The density is the slope of the resulting piecewise linear cdf, i.e.
+    1 / last divided by the width of the grid segment that contains x.
+    Outside of the grid it is zero.
+
+    Parameters
+    ----------
+    x : ndarray
+        The points.
+    quantile : function
+        Returns the quantile function at integer grid position(s), as arrays
+        that broadcast with x.
+    last : int
+        The last grid position.
+
+    Returns
+    -------
+    logpdf : ndarray
+        The logpdf evaluated at x.
+    """
+    low, high = _find_grid_segment(x, quantile, last)
+    width = quantile(high) - quantile(low)
+    inside = (x >= quantile(0)) & (x < quantile(last)) & (width > 0)
+    logpdf = np.full(x.shape, -np.inf)
+    logpdf[inside] = -np.log(last * width[inside])
+    return logpdf[()]
+
+
 class KernelDensityDistribution(Distribution):
     """
     A kernel density distribution.
@@ -896,18 +1457,43 @@ class KernelDensityDistribution(Distribution):
         Returns
         -------
         cdf : ndarray
-            Cumulative distribution function evaluated at x.
-        """
-        result = []
-        for point in x:
-            # scale x
-            x_point = point * (len(self._cdf) - 1) / (max(self._i_cdf) - min(self._i_cdf))
-            # use linear fit if x_point is between two points
-            linear_fit = np.poly1d(np.polyfit([int(x_point), int(x_point) + 1],
-                                              [self._cdf[int(x_point)],
-                                               self._cdf[int(x_point) + 1]], 1))
-            result.append(linear_fit(x_point))
-        return result
+            Cumulative distribution function evaluated at x. The cdf
+            coordinates are interpolated linearly, beyond them the cdf is
+            constant.
+        """
+        cdf = np.asarray(self._cdf, dtype=np.float64)
+        # scale x to the positions of the cdf coordinates
+        x_point = np.asarray(x, dtype=np.float64) * (len(cdf) - 1) / \
+            (np.max(self._i_cdf) - np.min(self._i_cdf))
+        return np.interp(x_point, np.arange(len(cdf)), cdf)
+
+    def logpdf(self, x, rv_values, dependencies):
+        """
+        Calculate the logarithm of the probability density function.
+
+        The density is derived from the icdf coordinates, as the slope of the
+        linearly interpolated cdf.
+
+        Parameters
+        ----------
+        x : array_like
+            Points at which to calculate the logpdf.
+        rv_values : array_like
+            Values of all random variables in variable space in correct order.
+            --Not used for Kernel Density--
+        dependencies : tuple
+            A 3-element tuple with one entry each for the shape, loc and scale parameters.
+            --Not used for Kernel Density--
+
+        Returns
+        -------
+        logpdf : ndarray
+            Logarithm of the probability density function evaluated at x.
+        """
+        quantiles = np.asarray(self._i_cdf, dtype=np.float64)
+        x = np.asarray(x, dtype=np.float64)
+        return _quantile_grid_logpdf(x, lambda grid_index: quantiles[grid_index],
+                                     len(quantiles) - 1)
 
     def i_cdf(self, probability, rv_values, dependencies):
         """
@@ -933,17 +1519,220 @@ class KernelDensityDistribution(Distribution):
         -------
         i_cdf : ndarray,
             Inverse cumulative distribution function evaluated for probabilities.
+            The icdf coordinates are interpolated linearly.
+        """
+        i_cdf = np.asarray(self._i_cdf, dtype=np.float64)
+        # scale probability to the positions of the icdf coordinates
+        x_point = np.asarray(probability, dtype=np.float64) * (len(i_cdf) - 1)
+        return np.interp(x_point, np.arange(len(i_cdf)), i_cdf)
+
+
+class ConditionalKernelDensityDistribution(Distribution):
+    """
+    A kernel density distribution that depends on another random variable.
+
+    For each interval of the conditioning variable a kernel density estimate
+    is represented by its quantile function, sampled on a common grid of
+    probabilities. Between two interval centers the quantile functions are
+    interpolated linearly. Outside of the interval centers the nearest
+    estimate is used.
+
+    Examples
+    --------
+    Create a ConditionalKernelDensityDistribution and evaluate it for
+    multiple conditioning values at once:
+
+    >>> import numpy as np
+    >>> probabilities = np.linspace(0, 1, 5)
+    >>> quantiles = [np.linspace(0, 1, 5), np.linspace(1, 3, 5)]
+    >>> dist = ConditionalKernelDensityDistribution([1, 3], quantiles)
+    >>> x = dist.i_cdf([0.5, 0.5, 0.5], [[1, 2, 3]], (None, None, 0))
+    >>> [float(v) for v in x]
+    [0.5, 1.25, 2.0]
+
+    """
+
+    def __init__(self, interval_centers, quantiles):
+        """
+        Parameters
+        ----------
+        interval_centers : array_like
+            The centers of the intervals of the conditioning variable, in
+            ascending order.
+        quantiles : array_like
+            Array of shape (len(interval_centers), gridsize). Row i contains
+            the quantile function of the kernel density estimate of interval i,
+            evaluated at gridsize equally spaced probabilities from 0 to 1.
+        """
+        self.name = "KernelDensity"
+        self.interval_centers = np.asarray(interval_centers, dtype=np.float64)
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+
+        if self.quantiles.ndim != 2 or \
+                len(self.quantiles) != len(self.interval_centers):
+            raise ValueError("quantiles must contain one row for each interval "
+                             "center, but had shape {} for {} interval centers."
+                             "".format(self.quantiles.shape,
+                                       len(self.interval_centers)))
+        if self.quantiles.shape[1] < 2:
+            raise ValueError("The quantile grid must contain at least two "
+                             "probabilities.")
+
+    def _get_interval_weights(self, rv_values, dependencies):
+        """
+        Finds the two neighbouring intervals and the interpolation weight of
+        the conditioning value(s).
+
+        Returns
+        -------
+        lower : ndarray of int
+            Index of the interval center below the conditioning value.
+        upper : ndarray of int
+            Index of the interval center above the conditioning value.
+        weight : ndarray
+            Weight of the upper interval, the lower interval is weighted with
+            1 - weight.
+        """
+        conditioning = [d for d in dependencies if d is not None]
+        if len(set(conditioning)) != 1:
+            raise ValueError("A ConditionalKernelDensityDistribution must depend "
+                             "on exactly one random variable, but dependencies "
+                             "were {}.".format(dependencies))
+        condition = np.asarray(rv_values[conditioning[0]], dtype=np.float64)
+
+        centers = self.interval_centers
+        n_intervals = len(centers)
+        lower = np.searchsorted(centers, condition, side='right') - 1
+        lower = np.clip(lower, 0, max(n_intervals - 2, 0))
+        upper = np.minimum(lower + 1, n_intervals - 1)
+
+        spacing = centers[upper] - centers[lower]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(spacing > 0,
+                              (condition - centers[lower]) / spacing, 0)
+        weight = np.clip(weight, 0, 1)
+        return lower, upper, weight
+
+    def _blended_quantile(self, grid_index, lower, upper, weight):
+        """
+        The interpolated quantile function at integer grid position(s).
+        """
+        return (1 - weight) * self.quantiles[lower, grid_index] + \
+            weight * self.quantiles[upper, grid_index]
+
+    def cdf(self, x, rv_values, dependencies):
+        """
+        Calculate the cumulative distribution function.
+
+        Parameters
+        ----------
+        x : array_like
+            Points at which to calculate the cdf.
+        rv_values : array_like
+            Values of all random variables in variable space in correct order.
+            This can be a 1-dimensional array with length equal to the number of
+            random variables N or a 2-dimensional array with shape (N, M).
+            If x is an array, M must be len(x).
+        dependencies : tuple
+            A 3-element tuple with one entry each for the shape, loc and scale parameters.
+            All entries that are not None must point to the same random variable.
+
+        Returns
+        -------
+        cdf : ndarray
+            Cumulative distribution function evaluated at x under condition rv_values.
+        """
+        lower, upper, weight = self._get_interval_weights(rv_values, dependencies)
+        x, lower, upper, weight = np.broadcast_arrays(
+            np.asarray(x, dtype=np.float64), lower, upper, weight)
+
+        last = self.quantiles.shape[1] - 1
+        low, high = _find_grid_segment(
+            x, lambda grid_index: self._blended_quantile(grid_index, lower,
+                                                         upper, weight), last)
+
+        q_low = self._blended_quantile(low, lower, upper, weight)
+        q_high = self._blended_quantile(high, lower, upper, weight)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(q_high > q_low, (x - q_low) / (q_high - q_low), 1)
+        fraction = np.clip(fraction, 0, 1)
+
+        result = (low + fraction) / last
+        result = np.where(x < self._blended_quantile(0, lower, upper, weight), 0,
+                          result)
+        result = np.where(x >= self._blended_quantile(last, lower, upper, weight),
+                          1, result)
+        return result[()]
+
+    def logpdf(self, x, rv_values, dependencies):
+        """
+        Calculate the logarithm of the probability density function.
+
+        The density is the slope of the cdf, which interpolates the blended
+        quantile grid linearly.
+
+        Parameters
+        ----------
+        x : array_like
+            Points at which to calculate the logpdf.
+        rv_values : array_like
+            Values of all random variables in variable space in correct order.
+            This can be a 1-dimensional array with length equal to the number of
+            random variables N or a 2-dimensional array with shape (N, M).
+            If x is an array, M must be len(x).
+        dependencies : tuple
+            A 3-element tuple with one entry each for the shape, loc and scale parameters.
+            All entries that are not None must point to the same random variable.
+
+        Returns
+        -------
+        logpdf : ndarray
+            Logarithm of the probability density function evaluated at x under
+            condition rv_values.
+        """
+        lower, upper, weight = self._get_interval_weights(rv_values, dependencies)
+        x, lower, upper, weight = np.broadcast_arrays(
+            np.asarray(x, dtype=np.float64), lower, upper, weight)
+        return _quantile_grid_logpdf(
+            x, lambda grid_index: self._blended_quantile(grid_index, lower,
+                                                         upper, weight),
+            self.quantiles.shape[1] - 1)
+
+    def i_cdf(self, probabilities, rv_values, dependencies):
+        """
+        Calculate percent-point function. (inverse cumulative distribution function)
+
+        Parameters
+        ----------
+        probabilities : array_like
+            Probabilities for which to calculate the i_cdf.
+        rv_values : array_like
+            Values of all random variables in variable space in correct order.
+            This can be a 1-dimensional array with length equal to the number of
+            random variables N or a 2-dimensional array with shape (N, M).
+            If probabilities is an array, M must be len(probabilities).
+        dependencies : tuple
+            A 3-element tuple with one entry each for the shape, loc and scale parameters.
+            All entries that are not None must point to the same random variable.
+
+        Returns
+        -------
+        i_cdf : ndarray,
+            Inverse cumulative distribution function evaluated for probabilities
+            under condition rv_values.
         """
-        result = []
-        for point in probability:
-            # scale probability
-            x_point = point * (len(self._i_cdf) - 1)
-            # use linear fit if x_point is between two points
-            linear_fit = np.poly1d(np.polyfit([int(x_point), int(x_point) + 1],
-                                              [self._i_cdf[int(x_point)],
-                                               self._i_cdf[int(x_point) + 1]], 1))
-            result.append(linear_fit(x_point))
-        return result
+        lower, upper, weight = self._get_interval_weights(rv_values, dependencies)
+        probabilities, lower, upper, weight = np.broadcast_arrays(
+            np.asarray(probabilities, dtype=np.float64), lower, upper, weight)
+
+        last = self.quantiles.shape[1] - 1
+        position = np.clip(probabilities, 0, 1) * last
+        grid_index = np.minimum(np.floor(position).astype(int), last - 1)
+        fraction = position - grid_index
+
+        q_low = self._blended_quantile(grid_index, lower, upper, weight)
+        q_high = self._blended_quantile(grid_index + 1, lower, upper, weight)
+        return (q_low + fraction * (q_high - q_low))[()]
 
 
 if __name__ == "__main__":
@@ -4,15 +4,18 @@
 Fits distributions to data.
 """
 
+import os
+import tempfile
 import warnings
 import time
 import numpy as np
 
-from multiprocessing import Pool, TimeoutError
+from multiprocessing import Pool, TimeoutError, current_process
+from multiprocessing.pool import ThreadPool
 from numbers import Number
 import statsmodels.api as sm
 import scipy.stats as sts
-from scipy.optimize import curve_fit
+from scipy.optimize import curve_fit, minimize, minimize_scalar, brentq
 
 from .settings import (SHAPE_STRING, LOCATION_STRING, SCALE_STRING,
                        LOGNORMAL_EXPMU_PARAMETER_KEYWORD,
@@ -22,10 +25,14 @@ from .settings import (SHAPE_STRING, LOCATION_STRING, SCALE_STRING,
                        WEIBULL_2P_KEYWORD)
 from .params import ConstantParam, FunctionParam
 from .distributions import (WeibullDistribution, LognormalDistribution, NormalDistribution,
-                            KernelDensityDistribution, MultivariateDistribution)
+                            KernelDensityDistribution,
+                            ConditionalKernelDensityDistribution,
+                            MultivariateDistribution)
+from .serialization import to_dict, from_dict, _param_to_dict, _param_from_dict
+from .caching import FitCache
 
 
-__all__ = ["Fit"]
+__all__ = ["Fit", "ModelSelection"]
 
 
 # Functions for fitting
@@ -39,6 +46,21 @@ def _exp3(x, a, b, c):
     return a + b * np.exp(c * x)
 
 
+# Jacobians of the functions with respect to (a, b, c)
+def _power3_jacobian(x, a, b, c):
+    x = np.asarray(x, dtype=np.float64)
+    power = x ** c
+    # The derivative with respect to c is 0 at x = 0 (for c > 0).
+    log_x = np.log(np.where(x > 0, x, 1))
+    return np.column_stack((np.ones_like(x), power, b * power * log_x))
+
+
+def _exp3_jacobian(x, a, b, c):
+    x = np.asarray(x, dtype=np.float64)
+    exponential = np.exp(c * x)
+    return np.column_stack((np.ones_like(x), exponential, b * x * exponential))
+
+
 # Bounds for function parameters
 # 0 < a < inf
 # 0 < b < inf
@@ -46,6 +68,134 @@ def _exp3(x, a, b, c):
 _bounds = ([np.finfo(np.float64).tiny, np.finfo(np.float64).tiny, -np.inf],
           [np.inf, np.inf, np.inf])
 
+# Minimal number of samples in an interval to fit a distribution to it
+MIN_DATA_POINTS_FOR_FIT = 10
+
+# Methods to divide a dimension into intervals, see Fit
+INTERVAL_METHODS = ('equal_width', 'equal_count', 'hybrid')
+
+# Number of samples per dimension that are processed at once if an array is
+# fitted with Fit.from_chunks
+STREAMING_CHUNK_SIZE = 100000
+
+# Maximal number of function evaluations of the fit of a dependence function
+DEPENDENCE_FUNCTION_MAX_NFEV = 10000
+
+# Settings of the solver for the shape of Weibull distributions
+WEIBULL_NEWTON_MAX_ITERATIONS = 50
+WEIBULL_NEWTON_TOLERANCE = 1e-12
+
+
+def _fit_interval(args):
+    """
+    Fits the distribution to the samples of a single interval.
+
+    Module level function, such that it can be sent to a process pool.
+    Returns None if the distribution could not be fitted.
+    """
+    sample, name, shape_guess, weights = args
+    try:
+        return Fit._fit_distribution(sample, name, shape_guess, weights)
+    except ValueError:
+        return None
+
+
+def _share_samples(samples):
+    """
+    Writes the samples once into a memory-mapped file, such that worker
+    processes can attach to them instead of receiving a pickled copy.
+
+    Returns the path and the shape of the memory-mapped array or None if the
+    dimensions have different numbers of samples.
+    """
+    if len(set(len(sample) for sample in samples)) != 1:
+        return None
+    shape = (len(samples), len(samples[0]))
+    file_descriptor, path = tempfile.mkstemp(prefix='viroconcom_', suffix='.dat')
+    os.close(file_descriptor)
+    try:
+        shared = np.memmap(path, dtype=np.float64, mode='w+', shape=shape)
+        for dimension, sample in enumerate(samples):
+            shared[dimension] = sample
+        shared.flush()
+        del shared
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, shape
+
+
+def _evaluate_candidate(samples, dimension, kwargs):
+    """
+    Fits a candidate distribution of a dimension and computes its
+    log-likelihood, see ModelSelection.
+
+    Module level function, such that it can be sent to a process pool.
+    Returns the results of Fit._get_distribution and the log-likelihood or
+    the error message if the candidate could not be fitted.
+    """
+    try:
+        result = Fit._get_distribution(dimension, samples, **kwargs)
+    except (RuntimeError, ValueError) as error:
+        return None, str(error)
+    distribution, dependency = result[0], result[1]
+    return result, ModelSelection._log_likelihood(
+        distribution, dependency, samples, dimension, kwargs.get('weights'))
+
+
+def _evaluate_shared_candidate(path, shape, dimension, kwargs, weighted=False):
+    """
+    Evaluates a candidate in a worker process with samples written by
+    _share_samples. If weighted, the last row holds the weights.
+
+    Module level function, such that it can be sent to a process pool.
+    """
+    samples = list(np.asarray(np.memmap(path, dtype=np.float64, mode='r', shape=shape)))
+    if weighted:
+        kwargs = dict(kwargs, weights=samples.pop())
+    return _evaluate_candidate(samples, dimension, kwargs)
+
+
+def _iter_chunks(chunks, chunk_size):
+    """
+    Yields the chunks given to Fit.from_chunks as arrays of shape (number of
+    dimensions, number of samples in the chunk).
+    """
+    if callable(chunks):
+        chunks = chunks()
+    elif isinstance(chunks, np.ndarray):
+        chunks = [chunks[:, start:start + chunk_size]
+                  for start in range(0, chunks.shape[1], chunk_size)]
+    for chunk in chunks:
+        yield np.atleast_2d(np.asarray(chunk, dtype=np.float64))
+
+
+def _assign_intervals(values, interval_centers, interval_width):
+    """
+    Returns the index of the interval each value belongs to and whether it
+    belongs to an interval at all. As in Fit._get_fitting_values an interval
+    contains the values v with center - width / 2 <= v < center + width / 2.
+    """
+    lower = interval_centers - 0.5 * interval_width
+    upper = interval_centers + 0.5 * interval_width
+    index = np.searchsorted(lower, values, side='right') - 1
+    inside = index >= 0
+    inside[inside] = values[inside] < upper[index[inside]]
+    return index, inside
+
+
+def _get_shared_distribution(path, shape, dimension, kwargs, weighted=False):
+    """
+    Fits a dimension in a worker process to samples written by _share_samples.
+    If weighted, the last row holds the weights of the samples.
+
+    Module level function, such that it can be sent to a process pool.
+    """
+    samples = list(np.asarray(np.memmap(path, dtype=np.float64, mode='r', shape=shape)))
+    if weighted:
+        kwargs = dict(kwargs, weights=samples.pop())
+    return Fit._get_distribution(dimension, samples, **kwargs)
+
 
 class BasicFit():
     """
@@ -62,13 +212,18 @@ class BasicFit():
     scale : float
         The scale parameter for the fit.
 
-    samples : list of float
+    samples : list of float or None
         The raw data that is used for this fit. For that case that there is no dependency this
-        list contains the whole data of the dimension.
+        list contains the whole data of the dimension. For a fit in an interval
+        it is a view into the sorted samples of the dimension, i.e. no copy.
+        None if the fit was created with keep_samples=False.
+
+    n_samples : int
+        The number of samples that were used for this fit.
 
     """
 
-    def __init__(self, shape, loc, scale, samples):
+    def __init__(self, shape, loc, scale, samples, n_samples=None):
 
         # parameters for the distribution
         if type(shape) == ConstantParam:
@@ -98,6 +253,9 @@ class BasicFit():
 
         # Raw data
         self.samples = samples
+        if n_samples is None:
+            n_samples = 0 if samples is None else len(samples)
+        self.n_samples = n_samples
 
     def __str__(self):
         return "BasicFit with shape={}, loc={}, scale={}.".format(
@@ -117,21 +275,21 @@ class FitInspectionData():
     shape_at : list of float
         This list contains the values of the divided dimension the shape parameter depends on.
 
-    shape_value : list of float
+    shape_value : ndarray of float
         The associated values of the parameter shape to the divided dimension the shape
         parameter depends on.
 
     loc_at : list of float
         This list contains the values of the divided dimension the location parameter depends on.
 
-    loc_value : list of float
+    loc_value : ndarray of float
         The associated values of the parameter loc to the divided dimension the location
         parameter depends on.
 
     scale_at : list of float
         This list contains the values of the divided dimension the scale parameter depends on.
 
-    scale_value : list of float
+    scale_value : ndarray of float
         The associated values of the parameter scale to the divided dimension the scale
         parameter depends on.
 
@@ -147,6 +305,33 @@ class FitInspectionData():
         This list with the length of the number of used intervals for the scale parameter
         contains lists with the used samples for the respective fit.
 
+    shape_n_samples, loc_n_samples, scale_n_samples : ndarray of int
+        The number of samples of each fit, also available if the samples
+        are not kept.
+
+    shape_ks, loc_ks, scale_ks : ndarray of float
+        The Kolmogorov-Smirnov statistic of each fit, NaN if the Fit was not
+        created with goodness_of_fit=True.
+
+    shape_ad, loc_ad, scale_ad : ndarray of float
+        The Anderson-Darling statistic of each fit, NaN if the Fit was not
+        created with goodness_of_fit=True.
+
+    params : list of Param
+        The fitted parameters (shape, loc, scale) of the distribution of this
+        dimension, (sigma, None, mu) for 'Lognormal_SigmaMu'. None for kernel
+        densities.
+
+    Notes
+    -----
+    The samples of the intervals are views into one sorted copy of the
+    samples of the dimension. Parameters that depend on the same dimension
+    share the same views. If the Fit was created with keep_samples=False,
+    the lists contain None instead of samples.
+
+    The results of the fits are stored column wise in arrays, use
+    get_columns() to get all of them for a parameter at once.
+
     """
 
     def __init__(self):
@@ -154,29 +339,47 @@ class FitInspectionData():
         # Number of the intervals this dimension is divided
         self.used_number_of_intervals = None
 
-        # Parameter values and the data they belong to
+        # Parameter values and the data they belong to. The values are stored
+        # column wise: one row for each parameter of the fitted distribution
+        # (shape, loc, scale) and one column for each interval.
         self.shape_at = None
-        self._shape_value = [[], [], []]
+        self._shape_value = np.empty((3, 0))
+        self.shape_n_samples = np.empty(0, dtype=int)
+        self.shape_ks = np.empty(0)
+        self.shape_ad = np.empty(0)
 
         self.loc_at = None
-        self._loc_value = [[], [], []]
+        self._loc_value = np.empty((3, 0))
+        self.loc_n_samples = np.empty(0, dtype=int)
+        self.loc_ks = np.empty(0)
+        self.loc_ad = np.empty(0)
 
         self.scale_at = None
-        self._scale_value = [[], [], []]
+        self._scale_value = np.empty((3, 0))
+        self.scale_n_samples = np.empty(0, dtype=int)
+        self.scale_ks = np.empty(0)
+        self.scale_ad = np.empty(0)
 
         # Raw data for each parameter of this dimension
         self.shape_samples = []
         self.loc_samples = []
         self.scale_samples = []
 
+        # Storage of the fits that are appended one by one, the columns
+        # above are views into it
+        self._buffers = {}
+
+        # Fitted parameters of the distribution
+        self.params = None
+
     @property
     def shape_value(self):
         """
-        Takes out the list that contains the shape parameters.
+        Takes out the array that contains the shape parameters.
 
         Returns
         -------
-        list of float
+        ndarray of float
              The associated values of the parameter shape to the divided dimension the shape
              parameter depends on.
         Notes
@@ -188,11 +391,11 @@ class FitInspectionData():
     @property
     def loc_value(self):
         """
-        Takes out the list that contains the location parameters.
+        Takes out the array that contains the location parameters.
 
         Returns
         -------
-        list of float
+        ndarray of float
              The associated values of the parameter loc to the divided dimension the location
              parameter depends on.
         Notes
@@ -204,11 +407,11 @@ class FitInspectionData():
     @property
     def scale_value(self):
         """
-        Takes out the list that contains the scale parameters.
+        Takes out the array that contains the scale parameters.
 
         Returns
         -------
-        list of float
+        ndarray of float
              The associated values of the parameter scale to the divided dimension the scale
              parameter depends on.
         Notes
@@ -217,6 +420,15 @@ class FitInspectionData():
         """
         return self._scale_value[2]
 
+    @staticmethod
+    def _check_param(param):
+        """
+        Raises a ValueError if the parameter is unknown.
+        """
+        if param not in (SHAPE_STRING, LOCATION_STRING, SCALE_STRING):
+            err_msg = "Parameter '{}' is unknown.".format(param)
+            raise ValueError(err_msg)
+
     def get_dependent_param_points(self, param):
         """
         This function can be used to get the param_at and the param_value lists as tuple for a
@@ -245,7 +457,81 @@ class FitInspectionData():
             err_msg = "Parameter '{}' is unknown.".format(param)
             raise ValueError(err_msg)
 
-    def append_basic_fit(self, param ,basic_fit):
+    def get_columns(self, param):
+        """
+        Returns the results of all fits of a parameter as columns.
+
+        Parameters
+        ----------
+        param : str
+            The respective parameter.
+        Returns
+        -------
+        dict of ndarray
+             The arrays 'at' (the interval centers, None if the parameter
+             does not depend on another dimension), 'shape', 'loc', 'scale'
+             (the fitted parameters of each interval), 'n_samples' (the
+             number of samples of each interval), 'ks' and 'ad' (the
+             Kolmogorov-Smirnov and Anderson-Darling statistics of each
+             interval).
+        Raises
+        ------
+        ValueError
+            If the parameter is unknown.
+        """
+        self._check_param(param)
+        values = getattr(self, '_{}_value'.format(param))
+        return {'at': getattr(self, '{}_at'.format(param)),
+                SHAPE_STRING: values[0],
+                LOCATION_STRING: values[1],
+                SCALE_STRING: values[2],
+                'n_samples': getattr(self, '{}_n_samples'.format(param)),
+                'ks': getattr(self, '{}_ks'.format(param)),
+                'ad': getattr(self, '{}_ad'.format(param))}
+
+    def set_basic_fits(self, param, param_at, param_values, n_samples, samples=None,
+                       goodness_of_fit=None):
+        """
+        Sets the results of all fits of a parameter at once.
+
+        Parameters
+        ----------
+        param : str
+            The respective parameter the data should be associated.
+        param_at : ndarray
+            The interval centers of the fits.
+        param_values : array_like
+            Array with shape (3, number of fits) that contains the fitted
+            parameters (shape, loc, scale) of each fit.
+        n_samples : array_like
+            The number of samples of each fit (the sum of the weights if the
+            samples are weighted).
+        samples : list, optional
+            The samples of each fit. If None, no samples are kept.
+        goodness_of_fit : tuple of ndarray, optional
+            The Kolmogorov-Smirnov and the Anderson-Darling statistic of each
+            fit. If None, they are NaN.
+
+        Raises
+        ------
+        ValueError
+            If the parameter is unknown.
+        """
+        self._check_param(param)
+        param_values = np.asarray(param_values, dtype=np.float64).reshape(3, -1)
+        if samples is None:
+            samples = [None] * param_values.shape[1]
+        if goodness_of_fit is None:
+            goodness_of_fit = np.full((2, param_values.shape[1]), np.nan)
+        setattr(self, '{}_at'.format(param), param_at)
+        setattr(self, '_{}_value'.format(param), param_values)
+        setattr(self, '{}_n_samples'.format(param), np.asarray(n_samples))
+        setattr(self, '{}_samples'.format(param), list(samples))
+        setattr(self, '{}_ks'.format(param), np.asarray(goodness_of_fit[0], dtype=np.float64))
+        setattr(self, '{}_ad'.format(param), np.asarray(goodness_of_fit[1], dtype=np.float64))
+        self._buffers.pop(param, None)
+
+    def append_basic_fit(self, param ,basic_fit, goodness_of_fit=(np.nan, np.nan)):
         """
         This function can be used to add a single fit to the hold data.
 
@@ -255,30 +541,44 @@ class FitInspectionData():
             The respective parameter the data should be associated.
         basic_fit : BasicFit
             The data of the single fit hold in a BasicData object.
+        goodness_of_fit : tuple of float, optional
+            The Kolmogorov-Smirnov and the Anderson-Darling statistic of the
+            fit. Defaults to NaN.
 
         Raises
         ------
         ValueError
             If the parameter is unknown.
         """
-        if param == SHAPE_STRING:
-            self._shape_value[0].append(basic_fit.shape)
-            self._shape_value[1].append(basic_fit.loc)
-            self._shape_value[2].append(basic_fit.scale)
-            self.shape_samples.append(basic_fit.samples)
-        elif param == LOCATION_STRING:
-            self._loc_value[0].append(basic_fit.shape)
-            self._loc_value[1].append(basic_fit.loc)
-            self._loc_value[2].append(basic_fit.scale)
-            self.loc_samples.append(basic_fit.samples)
-        elif param == SCALE_STRING:
-            self._scale_value[0].append(basic_fit.shape)
-            self._scale_value[1].append(basic_fit.loc)
-            self._scale_value[2].append(basic_fit.scale)
-            self.scale_samples.append(basic_fit.samples)
-        else:
-            err_msg = "Parameter '{}' is unknown.".format(param)
-            raise ValueError(err_msg)
+        self._check_param(param)
+        n_samples = getattr(self, '{}_n_samples'.format(param))
+        n_fits = len(n_samples)
+        buffers = self._buffers.get(param)
+        if buffers is None or len(buffers['n_samples']) == n_fits or \
+                np.result_type(n_samples, basic_fit.n_samples) != n_samples.dtype:
+            # The storage grows geometrically, thus appending is cheap.
+            capacity = max(2 * n_fits, 8)
+            buffers = {'value': np.empty((3, capacity)),
+                       'n_samples': np.empty(capacity, dtype=np.result_type(
+                           n_samples, basic_fit.n_samples)),
+                       'ks': np.empty(capacity),
+                       'ad': np.empty(capacity)}
+            buffers['value'][:, :n_fits] = getattr(self, '_{}_value'.format(param))
+            buffers['n_samples'][:n_fits] = n_samples
+            for statistic in ('ks', 'ad'):
+                buffers[statistic][:n_fits] = getattr(
+                    self, '{}_{}'.format(param, statistic))
+            self._buffers[param] = buffers
+
+        buffers['value'][:, n_fits] = (basic_fit.shape, basic_fit.loc, basic_fit.scale)
+        buffers['n_samples'][n_fits] = basic_fit.n_samples
+        buffers['ks'][n_fits], buffers['ad'][n_fits] = goodness_of_fit
+        setattr(self, '_{}_value'.format(param), buffers['value'][:, :n_fits + 1])
+        setattr(self, '{}_n_samples'.format(param), buffers['n_samples'][:n_fits + 1])
+        for statistic in ('ks', 'ad'):
+            setattr(self, '{}_{}'.format(param, statistic),
+                    buffers[statistic][:n_fits + 1])
+        getattr(self, '{}_samples'.format(param)).append(basic_fit.samples)
 
     def get_basic_fit(self, param, index):
         """
@@ -300,18 +600,199 @@ class FitInspectionData():
         ValueError
             If the parameter is unknown.
         """
-        if param == SHAPE_STRING:
-            return BasicFit(self._shape_value[0][index], self._shape_value[1][index],
-                            self._shape_value[2][index], self.shape_samples[index])
-        elif param == LOCATION_STRING:
-            return BasicFit(self._loc_value[0][index], self._loc_value[1][index],
-                            self._loc_value[2][index], self.loc_samples[index])
-        elif param == SCALE_STRING:
-            return BasicFit(self._scale_value[0][index], self._scale_value[1][index],
-                            self._scale_value[2][index], self.scale_samples[index])
+        self._check_param(param)
+        values = getattr(self, '_{}_value'.format(param))
+        return BasicFit(values[0][index], values[1][index], values[2][index],
+                        getattr(self, '{}_samples'.format(param))[index],
+                        getattr(self, '{}_n_samples'.format(param))[index])
+
+    def _to_dict(self):
+        """
+        Returns the results of the fits as dict of plain values, without
+        the samples.
+        """
+        data = {'used_number_of_intervals': self.used_number_of_intervals,
+                'params': None if self.params is None else
+                [_param_to_dict(param) for param in self.params]}
+        for param in (SHAPE_STRING, LOCATION_STRING, SCALE_STRING):
+            columns = self.get_columns(param)
+            data[param] = dict(
+                (name, None if column is None else np.asarray(column).tolist())
+                for name, column in columns.items())
+        return data
+
+    @classmethod
+    def _from_dict(cls, data):
+        """
+        Creates fit inspection data from the dict of _to_dict. The samples of
+        the fits are None.
+        """
+        fit_inspection_data = cls()
+        fit_inspection_data.used_number_of_intervals = data['used_number_of_intervals']
+        if data['params'] is not None:
+            fit_inspection_data.params = [_param_from_dict(param)
+                                          for param in data['params']]
+        for param in (SHAPE_STRING, LOCATION_STRING, SCALE_STRING):
+            columns = data[param]
+            fit_inspection_data.set_basic_fits(
+                param, None if columns['at'] is None else np.array(columns['at']),
+                [columns[SHAPE_STRING], columns[LOCATION_STRING], columns[SCALE_STRING]],
+                columns['n_samples'], goodness_of_fit=(columns['ks'], columns['ad']))
+        return fit_inspection_data
+
+
+class _IntervalStatistics():
+    """
+    Accumulates the data of the intervals of a dimension chunk by chunk.
+
+    For the normal and the lognormal distribution the number of samples, the
+    mean and the sum of the squared deviations from the mean (of the
+    logarithm for the lognormal distribution) are accumulated for each
+    interval, which is sufficient for the maximum likelihood estimates. For
+    all other distributions a uniform random subsample of at most
+    reservoir_size samples is kept for each interval: every sample gets a
+    random key and the samples with the smallest keys are kept.
+    """
+
+    def __init__(self, name, number_of_intervals, reservoir_size, random_state):
+        self.name = name
+        self.reservoir_size = reservoir_size
+        self.random_state = random_state
+        self.counts = np.zeros(number_of_intervals, dtype=np.int64)
+        self.closed_form = name in (NORMAL_KEYWORD,
+                                    LOGNORMAL_EXPMU_PARAMETER_KEYWORD,
+                                    LOGNORMAL_MU_PARAMETER_KEYWORD)
+        if self.closed_form:
+            self.means = np.zeros(number_of_intervals)
+            self.squares = np.zeros(number_of_intervals)
         else:
-            err_msg = "Parameter '{}' is unknown.".format(param)
-            raise ValueError(err_msg)
+            self.values = np.empty(0)
+            self.keys = np.empty(0)
+            self.intervals = np.empty(0, dtype=np.intp)
+
+    def add(self, values, intervals):
+        """
+        Adds the values of a chunk, intervals holds the index of the interval
+        of each value.
+        """
+        number_of_intervals = len(self.counts)
+        chunk_counts = np.bincount(intervals, minlength=number_of_intervals)
+        if self.closed_form:
+            if self.name != NORMAL_KEYWORD:
+                if np.any(values <= 0):
+                    raise ValueError(
+                        "The samples of a lognormal distribution must be "
+                        "positive to be fitted from chunks.")
+                values = np.log(values)
+            used = chunk_counts > 0
+            chunk_means = np.zeros(number_of_intervals)
+            chunk_means[used] = np.bincount(
+                intervals, weights=values,
+                minlength=number_of_intervals)[used] / chunk_counts[used]
+            chunk_squares = np.bincount(
+                intervals, weights=(values - chunk_means[intervals]) ** 2,
+                minlength=number_of_intervals)
+
+            # Merge the statistics of the chunk (Chan et al., 1979).
+            counts = self.counts[used]
+            total = counts + chunk_counts[used]
+            delta = chunk_means[used] - self.means[used]
+            self.squares[used] += chunk_squares[used] + \
+                delta ** 2 * counts * chunk_counts[used] / total
+            self.means[used] += delta * chunk_counts[used] / total
+        else:
+            values = np.concatenate((self.values, values))
+            keys = np.concatenate((self.keys,
+                                   self.random_state.random_sample(len(intervals))))
+            intervals = np.concatenate((self.intervals, intervals))
+            order = np.lexsort((keys, intervals))
+            sorted_intervals = intervals[order]
+            rank = np.arange(len(order)) - np.searchsorted(
+                sorted_intervals, sorted_intervals, side='left')
+            keep = order[rank < self.reservoir_size]
+            self.values = values[keep]
+            self.keys = keys[keep]
+            self.intervals = intervals[keep]
+        self.counts += chunk_counts
+
+    def get_samples(self, index):
+        """
+        Returns the kept samples of an interval.
+        """
+        start, stop = np.searchsorted(self.intervals, [index, index + 1])
+        return self.values[start:stop]
+
+    def fit(self, index, shape_guess=None):
+        """
+        Fits the distribution to an interval, returns the parameters as
+        Fit._fit_distribution.
+        """
+        if not self.closed_form:
+            return Fit._fit_distribution(self.get_samples(index), self.name,
+                                         shape_guess)
+        mean = self.means[index]
+        deviation = np.sqrt(self.squares[index] / self.counts[index])
+        if self.name == NORMAL_KEYWORD:
+            params = (0, mean, deviation)
+        else:
+            params = (deviation, 0, np.exp(mean))
+        return tuple(ConstantParam(param) for param in params)
+
+    def fit_intervals(self, interval_centers, dependency):
+        """
+        Fits the distribution to all intervals with enough data.
+
+        Returns the centers of the used intervals, the parameters of each
+        used interval as array with shape (3, number of intervals), the
+        number of samples and the kept samples of each used interval. Emits
+        the same warnings and raises the same errors as
+        Fit._get_fitting_values.
+        """
+        param_values = np.full((3, len(interval_centers)), np.nan)
+        deleted_centers = []
+        shape_guess = None
+        for i, step in enumerate(interval_centers):
+            if self.counts[i] >= MIN_DATA_POINTS_FOR_FIT and \
+                    self.name == 'KernelDensity':
+                # Kernel densities are estimated by the caller.
+                continue
+            elif self.counts[i] >= MIN_DATA_POINTS_FOR_FIT:
+                try:
+                    current_params = self.fit(i, shape_guess)
+                except ValueError:
+                    deleted_centers.append(i)
+                    warnings.warn(
+                        "There is not enough data for step '{}' in dimension "
+                        "'{}'. This step is skipped. Consider analyzing your "
+                        "data or reducing the number of intervals."
+                            .format(step, dependency),
+                        RuntimeWarning, stacklevel=3)
+                    continue
+                param_values[:, i] = [param(None) for param in current_params]
+                shape_guess = param_values[0, i]
+            else:
+                deleted_centers.append(i)
+                warnings.warn(
+                    "'Due to the restriction of MIN_DATA_POINTS_FOR_FIT='{}' "
+                    "there is not enough data (n='{}') for the interval "
+                    "centered at '{}' in dimension '{}'. This step is skipped. "
+                    "Consider analyzing your data or reducing the number of "
+                    "intervals."
+                        .format(MIN_DATA_POINTS_FOR_FIT, self.counts[i], step,
+                                dependency),
+                    RuntimeWarning, stacklevel=3)
+        if len(interval_centers) < 3:
+            nr_of_intervals = str(len(interval_centers))
+            raise RuntimeError("Your settings resulted in " + nr_of_intervals +
+                               " intervals. However, at least 3 intervals are "
+                               "required. Consider changing the interval width "
+                               "setting.")
+        used = np.ones(len(interval_centers), dtype=bool)
+        used[deleted_centers] = False
+        samples = [self.get_samples(i) for i in np.flatnonzero(used)] \
+            if not self.closed_form else None
+        return interval_centers[used], param_values[:, used], \
+            self.counts[used], samples
 
 
 class Fit():
@@ -331,6 +812,11 @@ class Fit():
     multiple_fit_inspection_data : list of FitInspectionData
         Contains fit inspection data objects for each dimension.
 
+    samples : ndarray or list of ndarray
+        The fitted samples as float64 array with one row per dimension (a
+        list of arrays if the dimensions have different numbers of samples).
+        None if the Fit was created with keep_samples=False.
+
     Examples
     --------
     Create a Fit and visualize the result in a IFORM contour:
@@ -413,16 +899,24 @@ class Fit():
 
     """
 
-    def __init__(self, samples, dist_descriptions, timeout=None):
+    def __init__(self, samples, dist_descriptions, timeout=None,
+                 interval_workers=None, interval_backend='process',
+                 keep_samples=True, weights=None, deduplicate=False,
+                 goodness_of_fit=False, cache=None):
         """
         Creates a Fit, by computing the distribution that describes the samples 'best'.
 
         Parameters
         ----------
-        samples : list of list
+        samples : list of list or ndarray or DataFrame
             List that contains data to be fitted : samples[0] -> first variable (i.e. wave height)
                                                    samples[1] -> second variable
                                                    ...
+            Also a 2-d array with one row per variable, a structured array
+            with one field per variable or a pandas DataFrame with one column
+            per variable. The samples are converted once into a contiguous
+            float64 array with one row per variable (without a copy if they
+            already are one), see the attribute samples.
         dist_descriptions : list of dict
             contains dictionary for each parameter. See note for further information.
 
@@ -430,12 +924,67 @@ class Fit():
             The maximum time in seconds there the contour has to be computed.
             This parameter also controls multiprocessing. If timeout is None
             serial processing is performed, if it is not None multiprocessing
-            is used. Defaults to None.
+            is used. The dimensions are then fitted by a single process pool
+            which attaches to a memory-mapped copy of the samples, such that
+            the samples are not pickled for each dimension. Defaults to None.
+
+        interval_workers : int, optional
+            Number of workers that fit the distributions of the intervals of a
+            dependent parameter in parallel. The results are collected in the
+            order of the intervals. The pool is created once and shared by all
+            dimensions (once per dimension if timeout is set). This is
+            independent of the multiprocessing controlled by timeout. If None,
+            the intervals are fitted serially. Defaults to None.
+
+        interval_backend : str, optional
+            Either 'process' or 'thread', the kind of pool used for
+            interval_workers. Inside of a daemonic process (e.g. if timeout is
+            set) a thread pool is used instead of a process pool, because
+            daemonic processes can not have children. Defaults to 'process'.
+
+        keep_samples : bool, optional
+            If False, the fit inspection data does not keep references to
+            the raw samples of the fits, such that they can be freed after
+            fitting. The fit can then not be updated. Defaults to True.
+
+        weights : array_like, optional
+            Non-negative weight of each sample (the same for all dimensions),
+            e.g. the counts of a scatter diagram, see from_scatter_diagram.
+            The distributions are then fitted by weighted maximum likelihood
+            and the number of samples of an interval is the sum of the
+            weights. Defaults to None.
+
+        deduplicate : bool, optional
+            If True, equal observations (equal values in all dimensions) are
+            fitted as one sample weighted by the number of these observations
+            (times their weights), which reduces the work of the fits for
+            quantised data. The fit inspection data then holds the unique
+            samples. Requires that all dimensions have the same number of
+            samples. Defaults to False.
+
+        goodness_of_fit : bool, optional
+            If True, the Kolmogorov-Smirnov and the Anderson-Darling statistic
+            of each fitted distribution (of each interval and of each
+            parameter without dependency) are computed while fitting and
+            stored in the fit inspection data, see FitInspectionData.
+            Defaults to False.
+
+        cache : str or FitCache, optional
+            A cache directory or FitCache. The fit is stored under a hash of
+            the samples, the weights and the dist_descriptions. If the same
+            data with the same settings was fitted before, the stored
+            mul_var_dist and fit inspection data are loaded instead of
+            fitting again. keep_samples is not part of the key, with
+            keep_samples the samples of the fits are sliced from the samples
+            again, as when fitting. Defaults to None (no cache).
 
         Raises
         ------
         TimeoutError
             If the calculation takes too long and the given value for timeout is exceeded.
+        ValueError
+            If interval_backend or an interval_method is unknown or if the
+            weights do not match the samples or are negative.
 
         Note
         ----
@@ -449,7 +998,8 @@ class Fit():
             - Lognormal (shape, scale),
             - Lognormal_SigmaMu (sigma, mu),
             - Normal,
-            - KernelDensity (no dependency)
+            - KernelDensity (all dependent parameters must depend on the
+              same dimension)
 
         dependency : list of int
             Length of 3 in the order (shape, loc, scale) contains:
@@ -475,38 +1025,186 @@ class Fit():
             Width of the bins. When the width of the bins is given, the number of bins is
             determined automatically.
 
+        Optionally, the intervals of this variable can be chosen with:
+
+        interval_method : str
+            How the data of this variable is separated into bins for fits which depend
+            upon it (defaults to 'equal_width'):
+
+            - equal_width -> bins of equal width, as described above
+            - equal_count -> number_of_intervals bins that hold the same number of
+              samples (the same sum of weights), with edges at the quantiles of the
+              samples. If only width_of_intervals is given, the number of bins is the
+              number of equal width bins.
+            - hybrid -> equal width bins, but adjacent bins with less than
+              MIN_DATA_POINTS_FOR_FIT samples are merged, e.g. in the sparse tail
+
+            The data of equal_count bins and merged hybrid bins is fitted at the
+            (weighted) median of the bin instead of its center.
+
         """
         self.dist_descriptions = dist_descriptions # Compute references this attribute at plot.py
 
+        if interval_backend not in ('process', 'thread'):
+            raise ValueError("interval_backend must be either 'process' or "
+                             "'thread', but was '{}'.".format(interval_backend))
+        samples = Fit._as_columns(samples)
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != (len(samples[0]),):
+                raise ValueError("weights must have one value for each sample, "
+                                 "but had the shape {}.".format(weights.shape))
+            if not np.all(weights >= 0) or not np.all(np.isfinite(weights)):
+                raise ValueError("weights must be finite and not negative.")
+        if cache is not None:
+            if not isinstance(cache, FitCache):
+                cache = FitCache(cache)
+            # Keys that are added to the dist_descriptions by a Fit are ignored.
+            cache_key = cache.get_key(list(samples) + [weights], settings={
+                'dist_descriptions': [
+                    dict((key, value) for key, value in dist_description.items()
+                         if not key.startswith('list_') and
+                         key != 'used_number_of_intervals')
+                    for dist_description in dist_descriptions],
+                'deduplicate': deduplicate,
+                'goodness_of_fit': goodness_of_fit})
+        if deduplicate:
+            samples, weights = Fit._deduplicate(samples, weights)
+        fit_options = {'interval_workers': interval_workers,
+                       'interval_backend': interval_backend,
+                       'keep_samples': keep_samples,
+                       'weights': weights,
+                       'goodness_of_fit': goodness_of_fit,
+                       'ranges': Fit._get_ranges(samples, weights)}
+
         list_number_of_intervals = []
         list_width_of_intervals = []
+        list_interval_methods = []
         for dist_description in dist_descriptions:
             list_number_of_intervals.append(dist_description.get('number_of_intervals'))
             list_width_of_intervals.append(dist_description.get('width_of_intervals'))
+            list_interval_methods.append(Fit._get_interval_method(dist_description))
         for dist_description in dist_descriptions:
             dist_description['list_number_of_intervals'] = list_number_of_intervals
             dist_description['list_width_of_intervals'] = list_width_of_intervals
+            dist_description['list_interval_methods'] = list_interval_methods
+
+        # Samples and options needed to update the fit
+        self.samples = samples if keep_samples else None
+        self._fit_options = fit_options
+        self._deduplicate = deduplicate
+
+        if cache is not None:
+            entry = cache.load(cache_key)
+            if entry is not None:
+                self._load_cache_entry(entry)
+                return
 
         # Results will be computed for each dimension
-        multiple_results = []
         self.multiple_fit_inspection_data = []
         distributions = []
         dependencies = []
 
-        for dimension in range(len(samples)):
-            dist_description = dist_descriptions[dimension]
+        # Use multiprocessing if a timeout is defined.
+        if timeout:
+            self._fit_parallel(samples, dist_descriptions, fit_options, timeout,
+                               distributions, dependencies)
+        else:
+            self._fit_serial(samples, fit_options, distributions, dependencies)
 
-            # Use multiprocessing if a timeout is defined.
-            if timeout:
-                pool = Pool()
-                multiple_results.append(
-                    pool.apply_async(self._get_distribution,
-                                     (dimension, samples),
-                                     dist_description)
-                )
+        # Save multivariate distribution
+        self.mul_var_dist = MultivariateDistribution(distributions, dependencies)
+
+        if cache is not None:
+            cache.store(cache_key, self._get_cache_entry())
+
+    def _get_cache_entry(self):
+        """
+        Returns the results of the fit as dict of plain values, see FitCache.
+        """
+        return {'mul_var_dist': to_dict(self.mul_var_dist),
+                'multiple_fit_inspection_data': [
+                    fit_inspection_data._to_dict()
+                    for fit_inspection_data in self.multiple_fit_inspection_data],
+                'used_number_of_intervals': [
+                    dist_description.get('used_number_of_intervals')
+                    for dist_description in self.dist_descriptions]}
+
+    def _load_cache_entry(self, entry):
+        """
+        Sets the results of the fit from a dict of _get_cache_entry.
+        """
+        self.mul_var_dist = from_dict(entry['mul_var_dist'])
+        self.multiple_fit_inspection_data = [
+            FitInspectionData._from_dict(data)
+            for data in entry['multiple_fit_inspection_data']]
+        for dist_description, used_number_of_intervals in zip(
+                self.dist_descriptions, entry['used_number_of_intervals']):
+            if used_number_of_intervals is not None:
+                dist_description['used_number_of_intervals'] = used_number_of_intervals
+        if self.samples is not None:
+            self._set_interval_samples()
+
+    def _set_interval_samples(self):
+        """
+        Sets the samples of the fits of the fit inspection data of a loaded
+        fit. The intervals are computed as when fitting, the samples of a
+        fit are views into the samples sorted by the dimension its parameter
+        depends on. Intervals that were skipped while fitting are left out.
+        """
+        weights = self._fit_options['weights']
+        sort_cache = {}
+        for dimension, (dist_description, fit_inspection_data) in enumerate(
+                zip(self.dist_descriptions, self.multiple_fit_inspection_data)):
+            sample = np.asarray(self.samples[dimension], dtype=np.float64)
+            sorted_samples = {}
+            for index, param in enumerate((SHAPE_STRING, LOCATION_STRING, SCALE_STRING)):
+                n_fits = len(getattr(fit_inspection_data, '{}_n_samples'.format(param)))
+                dependency = dist_description.get('dependency', (None, None, None))[index]
+                if n_fits == 0:
+                    continue
+                if dependency is None:
+                    setattr(fit_inspection_data, '{}_samples'.format(param),
+                            [sample] * n_fits)
+                    continue
+                sort_indice, _, _, interval_centers, interval_starts, interval_stops = \
+                    Fit._get_sorted_intervals(
+                        self.samples, dependency,
+                        dist_description['list_number_of_intervals'][dependency],
+                        dist_description['list_width_of_intervals'][dependency],
+                        weights, dist_description['list_interval_methods'][dependency],
+                        self._fit_options['ranges'][dependency], sort_cache)
+                if dependency not in sorted_samples:
+                    sorted_samples[dependency] = sample[sort_indice]
+                used = np.isin(interval_centers,
+                               getattr(fit_inspection_data, '{}_at'.format(param)))
+                setattr(fit_inspection_data, '{}_samples'.format(param),
+                        [sorted_samples[dependency][start:stop] for start, stop in
+                         zip(interval_starts[used], interval_stops[used])])
+
+    def _fit_serial(self, samples, fit_options, distributions, dependencies,
+                    previous_fit_inspection_data=None):
+        """
+        Fits all dimensions one after another.
+
+        The results are appended to distributions, dependencies and
+        multiple_fit_inspection_data. If previous_fit_inspection_data is
+        given, the fits of the intervals that did not change are reused.
+        The sort order and the intervals of each dimension other dimensions
+        depend on are computed once and shared by all of them, as is the pool
+        that fits the intervals.
+        """
+        sort_cache = {}
+        interval_pool = Fit._get_interval_pool(fit_options.get('interval_workers'),
+                                               fit_options.get('interval_backend'))
+        try:
+            for dimension in range(len(samples)):
+                dist_description = self.dist_descriptions[dimension]
+                kwargs = dict(dist_description, sort_cache=sort_cache,
+                              interval_pool=interval_pool, **fit_options)
+                if previous_fit_inspection_data is not None:
+                    kwargs['previous'] = previous_fit_inspection_data[dimension]
 
-            else:
-                kwargs = dist_description
                 distribution, dependency, used_number_of_intervals, \
                 fit_inspection_data = self._get_distribution(
                     dimension=dimension,
@@ -523,9 +1221,131 @@ class Fit():
                             used_number_of_intervals[dep_index]
 
                 self.multiple_fit_inspection_data.append(fit_inspection_data)
+        finally:
+            if interval_pool is not None:
+                interval_pool.terminate()
+
+    def update(self, new_samples, new_weights=None):
+        """
+        Adds new observations to the samples and updates the fit.
+
+        Only the intervals whose samples changed are fitted again, warm
+        started with the parameters previously fitted to the nearest
+        interval. The dependence functions are only fitted again if the
+        estimates of the intervals changed, starting from the previous
+        coefficients. If the range of a dimension with a given
+        number_of_intervals grows, its intervals change and all of them are
+        fitted again.
+
+        Parameters
+        ----------
+        new_samples : list of list or ndarray or DataFrame
+            The new observations, in one of the forms of the samples of Fit.
+        new_weights : array_like, optional
+            Weight of each new observation. Defaults to weights of 1 if the
+            fit is weighted.
+
+        Returns
+        -------
+        Fit
+            This fit, with an updated mul_var_dist and
+            multiple_fit_inspection_data.
+
+        Raises
+        ------
+        RuntimeError
+            If the fit does not hold its samples, i.e. it was created with
+            keep_samples=False or from chunks.
+        ValueError
+            If the new samples do not have the dimensions of the fit or the
+            weights do not match the new samples.
+
+        Examples
+        --------
+        >>> prng = np.random.RandomState(42)
+        >>> dist_description = {'name': 'Weibull_2p',
+        ...                     'dependency': (None, None, None)}
+        >>> my_fit = Fit((prng.weibull(1.5, 1000),), (dist_description,))
+        >>> my_fit = my_fit.update((prng.weibull(1.5, 100),))
+        >>> len(my_fit.samples[0])
+        1100
+        """
+        if self.samples is None:
+            raise RuntimeError("The fit does not hold its samples, thus it can "
+                               "not be updated. Create it with keep_samples=True.")
+        new_samples = Fit._as_columns(new_samples)
+        if len(new_samples) != len(self.samples):
+            raise ValueError("new_samples must have {} dimensions, but had {}.".format(
+                len(self.samples), len(new_samples)))
+
+        fit_options = self._fit_options
+        weights = fit_options.get('weights')
+        if weights is not None or new_weights is not None:
+            if new_weights is None:
+                new_weights = np.ones(len(new_samples[0]))
+            new_weights = np.asarray(new_weights, dtype=np.float64)
+            if new_weights.shape != (len(new_samples[0]),) or \
+                    not np.all(new_weights >= 0) or not np.all(np.isfinite(new_weights)):
+                raise ValueError("new_weights must have one finite, not negative "
+                                 "value for each new sample.")
+            if weights is None:
+                weights = np.ones(len(self.samples[0]))
+            weights = np.concatenate((weights, new_weights))
+        samples = Fit._as_columns(
+            [np.concatenate((sample, new_sample))
+             for sample, new_sample in zip(self.samples, new_samples)])
+        if self._deduplicate:
+            samples, weights = Fit._deduplicate(samples, weights)
+        fit_options = dict(fit_options, weights=weights,
+                           ranges=Fit._get_ranges(samples, weights))
+
+        previous_fit_inspection_data = self.multiple_fit_inspection_data
+        self.samples = samples
+        self._fit_options = fit_options
+        self.multiple_fit_inspection_data = []
+        distributions = []
+        dependencies = []
+        self._fit_serial(samples, fit_options, distributions, dependencies,
+                         previous_fit_inspection_data)
+        self.mul_var_dist = MultivariateDistribution(distributions, dependencies)
+        return self
+
+    def _fit_parallel(self, samples, dist_descriptions, fit_options, timeout,
+                      distributions, dependencies):
+        """
+        Fits all dimensions with a single process pool.
+
+        The samples are written once into a memory-mapped file the workers
+        attach to. The results are appended to distributions, dependencies
+        and multiple_fit_inspection_data.
+
+        Raises
+        ------
+        TimeoutError
+            If the calculation takes too long and the given value for timeout is exceeded.
+        """
+        weights = fit_options.get('weights')
+        if weights is None:
+            shared = _share_samples(samples)
+        else:
+            # The weights are shared as an additional row.
+            shared = _share_samples(list(samples) + [weights])
+            fit_options = dict(fit_options, weights=None)
+        pool = Pool(processes=min(len(samples), os.cpu_count() or 1))
+        try:
+            multiple_results = []
+            for dimension in range(len(samples)):
+                kwargs = dict(dist_descriptions[dimension], **fit_options)
+                if shared is None:
+                    kwargs['weights'] = weights
+                    multiple_results.append(pool.apply_async(
+                        Fit._get_distribution, (dimension, samples), kwargs))
+                else:
+                    multiple_results.append(pool.apply_async(
+                        _get_shared_distribution,
+                        (shared[0], shared[1], dimension, kwargs,
+                         weights is not None)))
 
-        # If multiprocessing is used we have to collect the results differently.
-        if timeout:
             # Define start time
             start_time = time.time()
             # Get distributions
@@ -554,138 +1374,996 @@ class Fit():
                     if dep is not None:
                         self.dist_descriptions[dep]['used_number_of_intervals'] = \
                             used_number_of_intervals[dep_index]
+        finally:
+            pool.terminate()
+            if shared is not None:
+                os.remove(shared[0])
 
-            # Add used number of intervals for dimensions with no dependency
-            for fit_inspection_data in self.multiple_fit_inspection_data:
-                if not fit_inspection_data.used_number_of_intervals:
-                    fit_inspection_data.used_number_of_intervals = 1
-
-        # Save multivariate distribution
-        self.mul_var_dist = MultivariateDistribution(distributions, dependencies)
+        # Add used number of intervals for dimensions with no dependency
+        for fit_inspection_data in self.multiple_fit_inspection_data:
+            if not fit_inspection_data.used_number_of_intervals:
+                fit_inspection_data.used_number_of_intervals = 1
 
     @staticmethod
-    def _fit_distribution(sample, name):
+    def _as_columns(samples):
         """
-        Fits the distribution and returns the parameters.
+        Converts samples to a contiguous float64 array with one row per
+        dimension.
 
         Parameters
         ----------
-        sample : list of float
-            Raw data the distribution is fitted on.
-        name : str
-            Name of the distribution ("Weibull_2p", "Weibull_3p", "Lognormal" or
-            "Lognormal_SigmaMu", "Normal", "KernelDensity"). They keyword list
-            is defined in settings.py.
+        samples : list of list or ndarray or DataFrame
+            A sequence of samples, one for each dimension, a 2-d array with
+            one row per dimension, a structured array with one field per
+            dimension or a pandas DataFrame with one column per dimension.
         Returns
         -------
-        tuple of ConstantParam
-             The computed parameters in the order of (shape, loc, scale).
-        Raises
-        ------
-        ValueError
-            If the distribution is unknown.
+        ndarray or list of ndarray
+            The samples, a list of float64 arrays if the dimensions have
+            different numbers of samples. Arrays that are already contiguous
+            float64 arrays are not copied.
         """
-        if name == WEIBULL_2P_KEYWORD:
-            # Do not fit the location parameter because it is 0 for a 2-p. dist.
-            params = sts.weibull_min.fit(sample, floc=0)
-        elif name == WEIBULL_3P_KEYWORD or \
-                        name == WEIBULL_3P_KEYWORD_ALTERNATIVE:
-            params = sts.weibull_min.fit(sample)
-        elif name == NORMAL_KEYWORD:
-            params = list(sts.norm.fit(sample))
-            # Shape doesn't exist for normal
-            params.insert(0, 0)
-        elif name == LOGNORMAL_EXPMU_PARAMETER_KEYWORD or \
-                        name == LOGNORMAL_MU_PARAMETER_KEYWORD:
-            # For lognormal loc is set to 0
-            params = sts.lognorm.fit(sample, floc=0)
-        elif name == 'KernelDensity':
-            dens = sm.nonparametric.KDEUnivariate(sample)
-            dens.fit(gridsize=2000)
-            # Kernel density doesn't have shape, loc, scale
-            return (dens.cdf, dens.icdf)
-        else:
-            err_msg = "Distribution '{}' is unknown.".format(name)
-            raise ValueError(err_msg)
+        if hasattr(samples, 'columns'):
+            # The values of a DataFrame of a single float64 block are the
+            # transpose of a contiguous array with one row per column.
+            return np.ascontiguousarray(
+                np.asarray(samples.values, dtype=np.float64).T)
+        if isinstance(samples, np.ndarray):
+            if samples.dtype.names is not None:
+                return np.array([samples[name] for name in samples.dtype.names],
+                                dtype=np.float64)
+            if samples.ndim == 2:
+                return np.ascontiguousarray(samples, dtype=np.float64)
+        if len(set(len(sample) for sample in samples)) != 1:
+            return [np.asarray(sample, dtype=np.float64) for sample in samples]
+        return np.array(samples, dtype=np.float64)
 
-        return (ConstantParam(params[0]),
-                ConstantParam(params[1]),
-                ConstantParam(params[2]))
+    @staticmethod
+    def _get_ranges(samples, weights=None):
+        """
+        Returns the smallest and the largest value of each dimension as array
+        with shape (number of dimensions, 2). Samples without weight are
+        ignored.
+        """
+        ranges = np.empty((len(samples), 2))
+        for dimension, sample in enumerate(samples):
+            if weights is not None and len(weights) == len(sample):
+                sample = sample[weights > 0]
+            if len(sample):
+                ranges[dimension] = sample.min(), sample.max()
+            else:
+                ranges[dimension] = np.nan
+        return ranges
 
     @staticmethod
-    def _get_function(function_name):
+    def _deduplicate(samples, weights=None):
         """
-        Returns the function.
+        Merges equal observations into one weighted sample.
 
         Parameters
         ----------
-        function_name : str
-            Options are 'power3', 'exp3'.
-
+        samples : list of list
+            The samples of all dimensions, all with the same length.
+        weights : ndarray, optional
+            Weight of each observation, if None each has weight 1.
         Returns
         -------
-        func
-             The actual function named function_name.
-
+        samples : ndarray
+            The unique observations, one row per dimension.
+        weights : ndarray
+            The number of equal observations (the sum of their weights).
         Raises
         ------
         ValueError
-            If the function is unknown.
+            If the dimensions have different numbers of samples.
         """
-
-        if function_name == 'power3':
-            return _power3
-        elif function_name == 'exp3':
-            return _exp3
-        elif function_name is None:
-            return None
-        else:
-            err_msg = "Function '{}' is unknown.".format(function_name)
-            raise ValueError(err_msg)
-
-    @staticmethod
-    def _append_params(name, param_values, dependency, index, sample):
+        if len(set(len(sample) for sample in samples)) != 1:
+            raise ValueError("To deduplicate the samples all dimensions must "
+                             "have the same number of samples.")
+        unique_samples, inverse = np.unique(
+            np.array(samples, dtype=np.float64), axis=1, return_inverse=True)
+        unique_weights = np.bincount(inverse.reshape(-1), weights=weights,
+                                     minlength=unique_samples.shape[1])
+        return unique_samples, unique_weights
+
+    @classmethod
+    def from_scatter_diagram(cls, counts, bin_centers, dist_descriptions, **kwargs):
         """
-        Distributions are being fitted and the results are appended to param_points.
+        Creates a Fit from a scatter diagram, i.e. from the number of
+        observations in each bin of a grid.
+
+        Each non-empty bin is a single sample at the bin centers, weighted by
+        its count, thus the cost of the fit scales with the number of
+        non-empty bins instead of with the number of observations.
+
+        Parameters
+        ----------
+        counts : array_like
+            The number of observations in each bin, with one axis for each
+            dimension, e.g. counts[i, j] for the bin at bin_centers[0][i] and
+            bin_centers[1][j].
+        bin_centers : list of array_like
+            The centers of the bins of each dimension.
+        dist_descriptions : list of dict
+            The descriptions of the distributions, see Fit.
+        kwargs :
+            Further arguments of Fit, e.g. timeout.
+
+        Returns
+        -------
+        Fit
+            The fit of the scatter diagram.
+
+        Raises
+        ------
+        ValueError
+            If the shape of counts does not match the bin centers.
+
+        Examples
+        --------
+        >>> counts = [[0, 2, 1], [3, 8, 2], [1, 4, 9]]
+        >>> hs = [0.5, 1.5, 2.5]
+        >>> tz = [3, 5, 7]
+        >>> dist_description_hs = {'name': 'Weibull_2p',
+        ...                        'dependency': (None, None, None)}
+        >>> dist_description_tz = {'name': 'Lognormal',
+        ...                        'dependency': (None, None, None)}
+        >>> my_fit = Fit.from_scatter_diagram(
+        ...     counts, (hs, tz), (dist_description_hs, dist_description_tz))
+        """
+        counts = np.asarray(counts, dtype=np.float64)
+        if counts.shape != tuple(len(centers) for centers in bin_centers):
+            raise ValueError(
+                "counts must have the shape {} given by the bin centers, but "
+                "had the shape {}.".format(
+                    tuple(len(centers) for centers in bin_centers), counts.shape))
+        non_empty = np.nonzero(counts)
+        samples = [np.asarray(centers, dtype=np.float64)[index]
+                   for centers, index in zip(bin_centers, non_empty)]
+        return cls(samples, dist_descriptions, weights=counts[non_empty], **kwargs)
+
+    @classmethod
+    def from_chunks(cls, chunks, dist_descriptions, reservoir_size=10000,
+                    random_state=None, chunk_size=STREAMING_CHUNK_SIZE):
+        """
+        Creates a Fit from data that is read chunk by chunk, e.g. data that
+        does not fit into memory.
+
+        The data is read twice. The first pass computes the range of each
+        dimension and thus the intervals. The second pass accumulates the
+        data of each interval: sufficient statistics for the normal and the
+        lognormal distribution, which are fitted exactly, and a uniform
+        random subsample of at most reservoir_size samples per interval for
+        all other distributions.
+
+        Parameters
+        ----------
+        chunks : ndarray or callable or iterable
+            Either an array (e.g. a np.memmap) with shape (number of
+            dimensions, number of samples), a callable that returns a new
+            iterator over the chunks each time it is called or a sequence of
+            chunks. Each chunk is array_like with shape (number of dimensions,
+            number of samples in the chunk), like the samples of Fit.
+        dist_descriptions : list of dict
+            The descriptions of the distributions, see Fit.
+        reservoir_size : int, optional
+            Maximal number of samples that are kept for each interval of a
+            distribution that is not fitted by sufficient statistics.
+            Defaults to 10000.
+        random_state : int or RandomState, optional
+            Seed of the random subsamples.
+        chunk_size : int, optional
+            Number of samples per chunk if chunks is an array.
+
+        Returns
+        -------
+        Fit
+            The fit, its mul_var_dist can be used like the one of a Fit of
+            the whole data. The fit inspection data holds the kept subsamples
+            or, if there are none, None instead of samples.
+
+        Raises
+        ------
+        ValueError
+            If chunks is an iterator, which can not be read twice, if a
+            chunk does not have one row per dimension, if reservoir_size is
+            smaller than the minimal number of samples of an interval fit or
+            if an interval_method other than 'equal_width' is used, since the
+            quantiles of the data are not known before the second pass.
+        """
+        if not callable(chunks) and iter(chunks) is chunks:
+            raise ValueError(
+                "chunks is read twice, thus it must not be an iterator. Pass "
+                "a function that returns a new iterator instead.")
+        if reservoir_size < MIN_DATA_POINTS_FOR_FIT:
+            raise ValueError(
+                "reservoir_size must be at least {}, but was {}.".format(
+                    MIN_DATA_POINTS_FOR_FIT, reservoir_size))
+        if not isinstance(random_state, np.random.RandomState):
+            random_state = np.random.RandomState(random_state)
+        for dist_description in dist_descriptions:
+            if Fit._get_interval_method(dist_description) != 'equal_width':
+                raise ValueError("from_chunks only supports the interval_method "
+                                 "'equal_width'.")
+
+        self = cls.__new__(cls)
+        self.dist_descriptions = dist_descriptions
+        self.samples = None
+        number_of_dimensions = len(dist_descriptions)
+
+        # First pass: the ranges of the dimensions.
+        minimum = np.full(number_of_dimensions, np.inf)
+        maximum = np.full(number_of_dimensions, -np.inf)
+        for chunk in _iter_chunks(chunks, chunk_size):
+            if chunk.shape[0] != number_of_dimensions:
+                raise ValueError(
+                    "Each chunk must have {} rows, one for each dimension, but "
+                    "had {}.".format(number_of_dimensions, chunk.shape[0]))
+            if chunk.shape[1]:
+                minimum = np.minimum(minimum, chunk.min(axis=1))
+                maximum = np.maximum(maximum, chunk.max(axis=1))
+
+        # The intervals of each dimension other dimensions depend on.
+        list_number_of_intervals = []
+        list_width_of_intervals = []
+        for dist_description in dist_descriptions:
+            list_number_of_intervals.append(dist_description.get('number_of_intervals'))
+            list_width_of_intervals.append(dist_description.get('width_of_intervals'))
+        for dist_description in dist_descriptions:
+            dist_description['list_number_of_intervals'] = list_number_of_intervals
+            dist_description['list_width_of_intervals'] = list_width_of_intervals
+        intervals = {}
+        statistics = {}
+        for dimension, dist_description in enumerate(dist_descriptions):
+            dependency = dist_description.get('dependency', (None, None, None))
+            if dist_description['name'] == 'KernelDensity' and \
+                    len(set(dep for dep in dependency if dep is not None)) > 1:
+                raise NotImplementedError(
+                    "KernelDensity can only be conditional on a single dimension.")
+            for dep in set(dependency):
+                if dep is not None and dep not in intervals:
+                    intervals[dep] = Fit._get_intervals(
+                        minimum[dep], maximum[dep], list_number_of_intervals[dep],
+                        list_width_of_intervals[dep])
+                statistics[(dimension, dep)] = _IntervalStatistics(
+                    dist_description['name'],
+                    1 if dep is None else len(intervals[dep][0]),
+                    reservoir_size, random_state)
+
+        # Second pass: the data of the intervals.
+        for chunk in _iter_chunks(chunks, chunk_size):
+            assignments = dict((dep, _assign_intervals(chunk[dep], *intervals[dep]))
+                               for dep in intervals)
+            for (dimension, dep), interval_statistics in statistics.items():
+                if dep is None:
+                    interval_statistics.add(
+                        chunk[dimension], np.zeros(chunk.shape[1], dtype=np.intp))
+                else:
+                    index, inside = assignments[dep]
+                    interval_statistics.add(chunk[dimension][inside], index[inside])
+
+        self.multiple_fit_inspection_data = []
+        distributions = []
+        dependencies = []
+        for dimension, dist_description in enumerate(dist_descriptions):
+            distribution, dependency, used_number_of_intervals, \
+            fit_inspection_data = Fit._get_streamed_distribution(
+                dimension, dist_description, statistics, intervals)
+            distributions.append(distribution)
+            dependencies.append(dependency)
+            for dep_index, dep in enumerate(dependency):
+                if dep is not None:
+                    dist_descriptions[dep]['used_number_of_intervals'] = \
+                        used_number_of_intervals[dep_index]
+            self.multiple_fit_inspection_data.append(fit_inspection_data)
+
+        self.mul_var_dist = MultivariateDistribution(distributions, dependencies)
+        return self
+
+    @staticmethod
+    def _get_streamed_distribution(dimension, dist_description, statistics,
+                                   intervals):
+        """
+        Returns the distribution of a dimension fitted by from_chunks, in the
+        same form as _get_distribution.
+        """
+        name = dist_description['name']
+        dependency = dist_description.get('dependency', (None, None, None))
+        functions = dist_description.get(
+            'functions', ('polynomial', 'polynomial', 'polynomial'))
+        fit_inspection_data = FitInspectionData()
+        used_number_of_intervals = [None, None, None]
+
+        if name == 'KernelDensity':
+            if all(dep is None for dep in dependency):
+                sample = statistics[(dimension, None)].get_samples(0)
+                return KernelDensityDistribution(Fit._fit_distribution(sample, name)), \
+                       dependency, used_number_of_intervals, fit_inspection_data
+            dep = [dep for dep in dependency if dep is not None][0]
+            interval_centers, _, _, dist_values = \
+                statistics[(dimension, dep)].fit_intervals(intervals[dep][0], dep)
+            quantiles = [Fit._fit_kernel_density_quantiles(dist_value)
+                         for dist_value in dist_values]
+            for i, dep in enumerate(dependency):
+                if dep is not None:
+                    used_number_of_intervals[i] = len(interval_centers)
+            return ConditionalKernelDensityDistribution(interval_centers, quantiles), \
+                   dependency, used_number_of_intervals, fit_inspection_data
+
+        params = [None, None, None]
+        for index in range(len(dependency)):
+            if params[index] is not None:
+                continue
+            interval_statistics = statistics[(dimension, dependency[index])]
+            if dependency[index] is None:
+                current_params = interval_statistics.fit(0)
+                basic_fit = BasicFit(*current_params,
+                                     None if interval_statistics.closed_form
+                                     else interval_statistics.get_samples(0),
+                                     interval_statistics.counts[0])
+                for i in range(index, len(dependency)):
+                    if dependency[i] is None:
+                        fit_inspection_data.append_basic_fit(
+                            (SHAPE_STRING, LOCATION_STRING, SCALE_STRING)[i],
+                            basic_fit)
+                        if i == 2 and name == LOGNORMAL_MU_PARAMETER_KEYWORD:
+                            params[i] = ConstantParam(np.log(current_params[i](0)))
+                        else:
+                            params[i] = current_params[i]
+            else:
+                interval_centers, param_values, n_samples, dist_values = \
+                    interval_statistics.fit_intervals(
+                        intervals[dependency[index]][0], dependency[index])
+                for i in range(index, len(dependency)):
+                    if dependency[i] is not None and dependency[i] == dependency[index]:
+                        fit_inspection_data.set_basic_fits(
+                            (SHAPE_STRING, LOCATION_STRING, SCALE_STRING)[i],
+                            interval_centers, param_values, n_samples, dist_values)
+                        used_number_of_intervals[i] = len(interval_centers)
+                        if i == 2 and name == LOGNORMAL_MU_PARAMETER_KEYWORD:
+                            fit_points = np.log(param_values[i])
+                        else:
+                            fit_points = param_values[i]
+                        params[i] = Fit._fit_dependence_function(
+                            interval_centers, fit_points, functions[i],
+                            Fit._get_param_name(name, i), dimension)
+
+        fit_inspection_data.params = params
+        distribution = Fit._create_distribution(name, params)
+        return distribution, dependency, used_number_of_intervals, fit_inspection_data
+
+    @staticmethod
+    def _fit_distribution(sample, name, shape_guess=None, weights=None):
+        """
+        Fits the distribution and returns the parameters.
 
         Parameters
         ----------
-        name : str
-            Name of distribution (e.g. 'Weibull_2p' or 'Lognormal').
-        param_values : list of list,
-            Contains lists that contain values for each param : order (shape, loc, scale).
-        dependency : list of int
-            Length of 3 in the order (shape, loc, scale) contains :
-            None -> no dependency
-            int -> depends on particular dimension
-        index : int
-            The current parameter as int in the order of (shape, loc, scale) (i.e. 0 -> shape).
         sample : list of float
-            Values that are used to fit the distribution.
+            Raw data the distribution is fitted on.
+        name : str
+            Name of the distribution ("Weibull_2p", "Weibull_3p", "Lognormal" or
+            "Lognormal_SigmaMu", "Normal", "KernelDensity"). They keyword list
+            is defined in settings.py.
+        shape_guess : float, optional
+            Initial value of the shape parameter of a Weibull distribution,
+            e.g. the shape that was fitted to a neighbouring interval.
+        weights : ndarray, optional
+            Non-negative weight of each sample, e.g. the counts of the bins
+            of a scatter diagram. If given, weighted maximum likelihood
+            estimates are computed.
+        Returns
+        -------
+        tuple of ConstantParam
+             The computed parameters in the order of (shape, loc, scale).
+        Raises
+        ------
+        ValueError
+            If the distribution is unknown.
+        """
+        if weights is not None:
+            # Samples without weight do not contribute to the likelihood.
+            sample = np.asarray(sample, dtype=np.float64)
+            weights = np.asarray(weights, dtype=np.float64)
+            sample = sample[weights > 0]
+            weights = weights[weights > 0]
+
+        if name == WEIBULL_2P_KEYWORD:
+            # Do not fit the location parameter because it is 0 for a 2-p. dist.
+            params = Fit._fit_weibull_2p(sample, shape_guess, weights)
+        elif name == WEIBULL_3P_KEYWORD or \
+                        name == WEIBULL_3P_KEYWORD_ALTERNATIVE:
+            params = Fit._fit_weibull_3p(sample, shape_guess, weights)
+        elif name == NORMAL_KEYWORD:
+            params = list(Fit._fit_normal(sample, weights))
+            # Shape doesn't exist for normal
+            params.insert(0, 0)
+        elif name == LOGNORMAL_EXPMU_PARAMETER_KEYWORD or \
+                        name == LOGNORMAL_MU_PARAMETER_KEYWORD:
+            # For lognormal loc is set to 0
+            params = Fit._fit_lognormal(sample, weights)
+        elif name == 'KernelDensity':
+            dens = sm.nonparametric.KDEUnivariate(sample)
+            if weights is None:
+                dens.fit(gridsize=2000)
+            else:
+                # Weights are only supported without the FFT.
+                dens.fit(gridsize=2000, weights=weights, fft=False)
+            # Kernel density doesn't have shape, loc, scale
+            return (dens.cdf, dens.icdf)
+        else:
+            err_msg = "Distribution '{}' is unknown.".format(name)
+            raise ValueError(err_msg)
+
+        return (ConstantParam(params[0]),
+                ConstantParam(params[1]),
+                ConstantParam(params[2]))
+
+    @staticmethod
+    def _solve_weibull_shape(log_sample, shape_guess=None, weights=None):
+        """
+        Solves the likelihood equation of the shape of a 2-p. Weibull distribution.
+
+        The maximum likelihood estimate of the shape k is the root of
+
+        :math:`g(k) = \\frac{\\sum x_i^k \\ln x_i}{\\sum x_i^k} - \\frac{1}{k} - \\overline{\\ln x}`,
 
+        which is strictly increasing in k. Newton's method is used, steps
+        that leave the bracket of the root are replaced by bisection and
+        Brent's method is used if Newton's method does not converge.
+
+        Parameters
+        ----------
+        log_sample : ndarray
+            The logarithm of the (positive) sample.
+        shape_guess : float, optional
+            Initial value of the shape parameter. If None, the estimate of
+            Menon (1963) is used.
+        weights : ndarray, optional
+            Weight of each value, the sums and means are then weighted.
         Returns
         -------
-        BasicFit
-             The information of this single fit.
+        shape : float
+            The shape parameter.
+        scale : float
+            The scale parameter.
+        Raises
+        ------
+        ValueError
+            If all values of the sample are equal.
+        """
+        # Work with log_sample - max(log_sample) <= 0, such that exp(k * centered)
+        # can not overflow.
+        max_log = log_sample.max()
+        centered = log_sample - max_log
+        mean_centered = np.average(centered, weights=weights)
+        std_log = np.sqrt(np.average((centered - mean_centered) ** 2, weights=weights))
+        if not std_log > 0:
+            raise ValueError("The shape of a Weibull distribution can not be "
+                             "estimated from a sample with equal values.")
+
+        def get_powers(shape):
+            # The terms x_i^k (relative to the maximum) times the weights.
+            powers = np.exp(shape * centered)
+            if weights is not None:
+                powers *= weights
+            return powers
+
+        def likelihood_equation(shape):
+            powers = get_powers(shape)
+            weighted_mean = np.dot(powers, centered) / powers.sum()
+            return weighted_mean - 1 / shape - mean_centered
+
+        def likelihood_equation_and_derivative(shape):
+            powers = get_powers(shape)
+            powers_sum = powers.sum()
+            weighted_mean = np.dot(powers, centered) / powers_sum
+            weighted_square = np.dot(powers, centered ** 2) / powers_sum
+            return weighted_mean - 1 / shape - mean_centered, \
+                weighted_square - weighted_mean ** 2 + 1 / shape ** 2
+
+        if shape_guess is None or not shape_guess > 0:
+            shape_guess = np.pi / np.sqrt(6) / std_log
+
+        shape = None
+        current = shape_guess
+        lower, upper = 0.0, np.inf
+        for _ in range(WEIBULL_NEWTON_MAX_ITERATIONS):
+            value, derivative = likelihood_equation_and_derivative(current)
+            if value > 0:
+                upper = current
+            else:
+                lower = current
+            new = current - value / derivative
+            if not lower < new < upper:
+                new = 0.5 * (lower + upper) if np.isfinite(upper) else 2 * current
+            if abs(new - current) <= WEIBULL_NEWTON_TOLERANCE * current:
+                shape = new
+                break
+            current = new
+
+        if shape is None:
+            if not np.isfinite(upper):
+                upper = 2 * current
+                while likelihood_equation(upper) <= 0:
+                    upper *= 2
+            shape = brentq(likelihood_equation, max(lower, 1e-6 * upper), upper)
+
+        scale = np.exp(max_log) * np.average(
+            np.exp(shape * centered), weights=weights) ** (1 / shape)
+        return shape, scale
+
+    @staticmethod
+    def _fit_weibull_2p(sample, shape_guess=None, weights=None):
+        """
+        Maximum likelihood estimates of a 2-p. Weibull distribution.
+
+        Samples with values that are not positive and finite are passed to
+        the numerical optimizer of scipy (see _fit_weighted).
+
+        Returns
+        -------
+        tuple of float
+             The parameters in the order (shape, loc, scale).
+        """
+        sample = np.asarray(sample, dtype=np.float64)
+        if len(sample) < 2 or not np.all(np.isfinite(sample)) or \
+                not np.all(sample > 0) or np.all(sample == sample[0]):
+            return Fit._fit_weighted(sts.weibull_min, sample, weights, floc=0)
+        shape, scale = Fit._solve_weibull_shape(np.log(sample), shape_guess, weights)
+        return shape, 0, scale
+
+    @staticmethod
+    def _fit_weibull_3p(sample, shape_guess=None, weights=None):
+        """
+        Maximum likelihood estimates of a 3-p. Weibull distribution.
+
+        The location is found by maximizing the profile likelihood, i.e. for
+        each location the shape and scale are the maximum likelihood estimates
+        of a 2-p. Weibull distribution fitted to sample - loc. If the profile
+        likelihood has its maximum at the bounds of the search interval (e.g.
+        because the likelihood is unbounded for shape < 1) the numerical
+        optimizer of scipy is used (see _fit_weighted).
+
+        Returns
+        -------
+        tuple of float
+             The parameters in the order (shape, loc, scale).
+        """
+        sample = np.asarray(sample, dtype=np.float64)
+        if len(sample) < 3 or not np.all(np.isfinite(sample)):
+            return Fit._fit_weighted(sts.weibull_min, sample, weights)
+        min_sample = sample.min()
+        spread = sample.max() - min_sample
+        if not spread > 0:
+            return Fit._fit_weighted(sts.weibull_min, sample, weights)
+
+        n = len(sample) if weights is None else weights.sum()
+        # Each evaluation is warm started with the shape of the previous one.
+        last = {'shape': shape_guess}
+
+        def negative_profile_log_likelihood(loc):
+            log_shifted = np.log(sample - loc)
+            shape, scale = Fit._solve_weibull_shape(log_shifted, last['shape'],
+                                                    weights)
+            last['shape'] = shape
+            log_sum = log_shifted.sum() if weights is None \
+                else np.dot(weights, log_shifted)
+            return -(n * np.log(shape) - n * shape * np.log(scale) +
+                     (shape - 1) * log_sum - n)
+
+        lower_bound = min_sample - spread
+        upper_bound = min_sample - 1e-6 * spread
+        result = minimize_scalar(negative_profile_log_likelihood,
+                                 bounds=(lower_bound, upper_bound),
+                                 method='bounded',
+                                 options={'xatol': 1e-10 * spread})
+        if not result.success or \
+                negative_profile_log_likelihood(lower_bound) <= result.fun or \
+                negative_profile_log_likelihood(upper_bound) <= result.fun:
+            return Fit._fit_weighted(sts.weibull_min, sample, weights)
+
+        loc = result.x
+        shape, scale = Fit._solve_weibull_shape(np.log(sample - loc), last['shape'],
+                                                weights)
+        return shape, loc, scale
+
+    @staticmethod
+    def _fit_normal(sample, weights=None):
+        """
+        Maximum likelihood estimates of a normal distribution.
+
+        The estimates are computed in closed form, the mean and the
+        (biased) standard deviation of the sample. Samples with values that
+        are not finite are passed to the numerical optimizer of scipy.
+
+        Returns
+        -------
+        tuple of float
+             The parameters in the order (loc, scale).
+        """
+        sample = np.asarray(sample, dtype=np.float64)
+        if len(sample) == 0 or not np.all(np.isfinite(sample)):
+            return Fit._fit_weighted(sts.norm, sample, weights)
+        loc = np.average(sample, weights=weights)
+        scale = np.sqrt(np.average((sample - loc) ** 2, weights=weights))
+        return loc, scale
+
+    @staticmethod
+    def _fit_lognormal(sample, weights=None):
+        """
+        Maximum likelihood estimates of a lognormal distribution with loc=0.
+
+        With the location fixed at 0 the estimates are the mean and the
+        (biased) standard deviation of log(sample), thus no optimizer is
+        needed. Samples with values that are not positive and finite are
+        passed to the numerical optimizer of scipy.
+
+        Returns
+        -------
+        tuple of float
+             The parameters in the order (shape, loc, scale).
+        """
+        sample = np.asarray(sample, dtype=np.float64)
+        if len(sample) == 0 or not np.all(np.isfinite(sample)) or \
+                not np.all(sample > 0):
+            return Fit._fit_weighted(sts.lognorm, sample, weights, floc=0)
+        log_sample = np.log(sample)
+        mu = np.average(log_sample, weights=weights)
+        sigma = np.sqrt(np.average((log_sample - mu) ** 2, weights=weights))
+        return sigma, 0, np.exp(mu)
+
+    @staticmethod
+    def _fit_weighted(distribution, sample, weights=None, **fixed):
+        """
+        Maximum likelihood estimates computed by a numerical optimizer.
+
+        Without weights this is the fit method of the scipy distribution. With
+        weights the weighted negative log-likelihood is minimized, starting
+        from the unweighted estimates.
+
+        Parameters
+        ----------
+        distribution : scipy.stats.rv_continuous
+            The distribution, e.g. scipy.stats.weibull_min.
+        sample : ndarray
+            Raw data the distribution is fitted on.
+        weights : ndarray, optional
+            Weight of each sample.
+        fixed : float
+            Parameters that are not fitted, as for the fit method of scipy,
+            e.g. floc=0.
+        Returns
+        -------
+        tuple of float
+             The parameters in the order of scipy (shapes, loc, scale).
+        """
+        params = list(distribution.fit(sample, **fixed))
+        if weights is None:
+            return tuple(params)
+
+        names = (distribution.shapes.split(', ') if distribution.shapes else []) + \
+            ['loc', 'scale']
+        free = [i for i, name in enumerate(names) if 'f' + name not in fixed]
+
+        def negative_log_likelihood(values):
+            current = list(params)
+            for i, value in zip(free, values):
+                current[i] = value
+            log_pdf = distribution.logpdf(sample, *current)
+            if not np.all(np.isfinite(log_pdf)):
+                return np.inf
+            return -np.dot(weights, log_pdf)
+
+        result = minimize(negative_log_likelihood, [params[i] for i in free],
+                          method='Nelder-Mead')
+        if not result.success:
+            warnings.warn(
+                "The weighted fit of the distribution '{}' did not converge: {} "
+                "The parameters of the last iteration are used.".format(
+                    distribution.name, result.message),
+                RuntimeWarning, stacklevel=2)
+        for i, value in zip(free, result.x):
+            params[i] = value
+        return tuple(params)
+
+    @staticmethod
+    def _fit_kernel_density_quantiles(sample, gridsize=2000, weights=None):
+        """
+        Fits a kernel density and returns its quantile function.
+
+        Parameters
+        ----------
+        sample : list of float
+            Raw data the kernel density is fitted on.
+        gridsize : int, optional
+            Number of equally spaced probabilities (from 0 to 1) at which the
+            quantile function is evaluated. Defaults to 2000.
+        weights : ndarray, optional
+            Weight of each sample.
+        Returns
+        -------
+        ndarray
+             The quantiles of the kernel density estimate.
+        """
+        dens = sm.nonparametric.KDEUnivariate(np.asarray(sample, dtype=np.float64))
+        if weights is None:
+            dens.fit(gridsize=gridsize)
+        else:
+            # Weights are only supported without the FFT.
+            dens.fit(gridsize=gridsize, weights=weights, fft=False)
+        return np.interp(np.linspace(0, 1, gridsize), dens.cdf, dens.support)
+
+    @staticmethod
+    def _get_function(function_name):
+        """
+        Returns the function.
+
+        Parameters
+        ----------
+        function_name : str
+            Options are 'power3', 'exp3'.
+
+        Returns
+        -------
+        func
+             The actual function named function_name.
+
+        Raises
+        ------
+        ValueError
+            If the function is unknown.
+        """
+
+        if function_name == 'power3':
+            return _power3
+        elif function_name == 'exp3':
+            return _exp3
+        elif function_name is None:
+            return None
+        else:
+            err_msg = "Function '{}' is unknown.".format(function_name)
+            raise ValueError(err_msg)
+
+    @staticmethod
+    def _get_interval_pool(workers, backend='process'):
         """
+        Creates the pool that fits the intervals, see _fit_intervals.
 
-        # Fit distribution
-        current_params = Fit._fit_distribution(sample, name)
+        Parameters
+        ----------
+        workers : int
+            Number of workers of the pool.
+        backend : str, optional
+            Either 'process' or 'thread'.
 
-        # Create basic fit object
-        basic_fit = BasicFit(*current_params, sample)
+        Returns
+        -------
+        Pool or ThreadPool
+            The pool, which has to be terminated by the caller, or None if
+            there are less than two workers.
+        """
+        if not workers or workers < 2:
+            return None
+        # Daemonic processes (e.g. the workers used if a timeout is set) are
+        # not allowed to have children.
+        if backend == 'thread' or current_process().daemon:
+            return ThreadPool(processes=workers)
+        return Pool(processes=workers)
 
-        for i in range(index, len(dependency)):
-            # Check if there is a dependency and whether it is the right one
-            if dependency[i] is not None and \
-                            dependency[i] == dependency[index]:
-                # Calculated parameter is appended to param_values
-                param_values[i].append(current_params[i])
-        return basic_fit
+    @staticmethod
+    def _fit_intervals(interval_samples, name, pool=None, interval_weights=None,
+                       shape_guesses=None):
+        """
+        Fits the distribution to the samples of each interval.
+
+        Parameters
+        ----------
+        interval_samples : list of ndarray
+            The samples of each interval.
+        name : str
+            Name of distribution (e.g. 'Weibull_2p' or 'Lognormal').
+        pool : Pool or ThreadPool, optional
+            The pool that fits the intervals, see _get_interval_pool. If None,
+            the intervals are fitted serially.
+        interval_weights : list of ndarray, optional
+            The weights of the samples of each interval.
+        shape_guesses : list of float, optional
+            Initial values of the shapes of the intervals, e.g. of a previous
+            fit. If None, each fit is seeded with the previous interval if
+            the intervals are fitted serially.
+
+        Returns
+        -------
+        list
+            For each interval the parameters (shape, loc, scale) as tuple of
+            ConstantParam or None if the fit failed. The order is the same as
+            in interval_samples.
+        """
+        if interval_weights is None:
+            interval_weights = [None] * len(interval_samples)
+        if pool is None or len(interval_samples) < 2:
+            # Seed each fit with the shape that was fitted to the previous
+            # interval, which reduces the iterations of the Weibull solvers.
+            results = []
+            shape_guess = None
+            for i, (interval_sample, weights) in enumerate(
+                    zip(interval_samples, interval_weights)):
+                if shape_guesses is not None:
+                    shape_guess = shape_guesses[i]
+                results.append(_fit_interval((interval_sample, name, shape_guess,
+                                              weights)))
+                if results[-1] is not None:
+                    shape_guess = results[-1][0](None)
+            return results
+
+        if shape_guesses is None:
+            shape_guesses = [None] * len(interval_samples)
+        tasks = [(interval_sample, name, shape_guess, weights)
+                 for interval_sample, shape_guess, weights
+                 in zip(interval_samples, shape_guesses, interval_weights)]
+        return pool.map(_fit_interval, tasks)
+
+    @staticmethod
+    def _get_intervals(minimum, maximum, number_of_intervals=None, bin_width=None):
+        """
+        Returns the intervals a dimension is divided into.
+
+        Parameters
+        ----------
+        minimum : float
+            The smallest value of the dimension.
+        maximum : float
+            The largest value of the dimension.
+        number_of_intervals : int
+            Number of intervals between minimum and maximum.
+        bin_width : float
+            Width of the intervals, the first interval starts at 0.
+        Returns
+        -------
+        interval_centers : ndarray
+            The centers of the intervals.
+        interval_width : float
+            The width of the intervals.
+        Raises
+        ------
+        RuntimeError
+            If the parameter number_of_intervals or bin_width was not specified.
+        """
+        if number_of_intervals:
+            interval_centers, interval_width = np.linspace(
+                minimum, maximum,
+                num=number_of_intervals, endpoint=False, retstep=True)
+            interval_centers += 0.5 * interval_width
+        elif bin_width:
+            interval_width = bin_width
+            interval_centers = np.arange(
+                0.5 * interval_width,
+                maximum + 0.5 * interval_width,
+                interval_width)
+        else:
+            raise RuntimeError(
+                "Either the parameters number_of_intervals or bin_width has to be specified, "
+                "otherwise the intervals are not specified. Exiting.")
+        return interval_centers, interval_width
+
+    @staticmethod
+    def _get_interval_method(dist_description):
+        """
+        Returns the interval_method of a distribution description.
+
+        Raises
+        ------
+        ValueError
+            If the interval_method is unknown.
+        """
+        method = dist_description.get('interval_method', 'equal_width')
+        if method not in INTERVAL_METHODS:
+            raise ValueError("interval_method must be one of {}, but was '{}'.".format(
+                ", ".join("'{}'".format(m) for m in INTERVAL_METHODS), method))
+        return method
+
+    @staticmethod
+    def _get_interval_slices(sorted_sample, cumulative_weights, minimum, maximum,
+                             number_of_intervals=None, bin_width=None,
+                             method='equal_width'):
+        """
+        Returns the intervals a sorted dimension is divided into as slices.
+
+        Parameters
+        ----------
+        sorted_sample : ndarray
+            The sorted samples of the dimension.
+        cumulative_weights : ndarray
+            The cumulative sum of the weights of the sorted samples, with a
+            leading 0 (thus one element longer than sorted_sample).
+        minimum : float
+            The smallest value of the dimension.
+        maximum : float
+            The largest value of the dimension.
+        number_of_intervals : int
+            Number of intervals between minimum and maximum.
+        bin_width : float
+            Width of the intervals, the first interval starts at 0.
+        method : str
+            The interval_method, see Fit.
+        Returns
+        -------
+        interval_centers : ndarray
+            The values the intervals are fitted at.
+        interval_starts : ndarray
+            The index of the first sample of each interval.
+        interval_stops : ndarray
+            The index after the last sample of each interval.
+        Raises
+        ------
+        RuntimeError
+            If the parameter number_of_intervals or bin_width was not specified.
+        """
+        interval_centers, interval_width = Fit._get_intervals(
+            minimum, maximum, number_of_intervals, bin_width)
+        total_weight = cumulative_weights[-1]
+
+        def get_medians(starts, stops):
+            # The (weighted) median of the samples of each interval.
+            half = 0.5 * (cumulative_weights[starts] + cumulative_weights[stops])
+            indices = np.searchsorted(cumulative_weights[1:], half, side='left')
+            return sorted_sample[np.minimum(indices, len(sorted_sample) - 1)]
+
+        if method == 'equal_count':
+            # All edges from a single search of the quantiles in the
+            # cumulative weights. Equal values stay in the same interval.
+            levels = np.arange(1, len(interval_centers)) / len(interval_centers)
+            indices = np.searchsorted(cumulative_weights[1:], levels * total_weight,
+                                      side='left')
+            edges = np.unique(sorted_sample[np.minimum(indices, len(sorted_sample) - 1)])
+            edges = edges[(edges > minimum) & (edges <= maximum)]
+            interval_starts = np.concatenate((
+                [np.searchsorted(sorted_sample, minimum, side='left')],
+                np.searchsorted(sorted_sample, edges, side='left')))
+            interval_stops = np.append(interval_starts[1:], np.searchsorted(
+                sorted_sample, maximum, side='right'))
+            return get_medians(interval_starts, interval_stops), \
+                interval_starts, interval_stops
+
+        # Since the samples are sorted, each interval is a contiguous slice
+        # [interval_starts[i], interval_stops[i]) of the sorted samples.
+        interval_starts = np.searchsorted(
+            sorted_sample, interval_centers - 0.5 * interval_width, side='left')
+        interval_stops = np.searchsorted(
+            sorted_sample, interval_centers + 0.5 * interval_width, side='left')
+        if method == 'hybrid':
+            # Merge sparse intervals with their following interval, and a
+            # sparse last group with its preceding one.
+            counts = cumulative_weights[interval_stops] - cumulative_weights[interval_starts]
+            groups = [[]]
+            group_count = 0
+            for i, count in enumerate(counts):
+                groups[-1].append(i)
+                group_count += count
+                if group_count >= MIN_DATA_POINTS_FOR_FIT:
+                    groups.append([])
+                    group_count = 0
+            if not groups[-1]:
+                groups.pop()
+            elif len(groups) > 1:
+                groups[-2].extend(groups.pop())
+            merged = np.array([len(group) > 1 for group in groups], dtype=bool)
+            firsts = np.array([group[0] for group in groups])
+            lasts = np.array([group[-1] for group in groups])
+            interval_starts = interval_starts[firsts]
+            interval_stops = interval_stops[lasts]
+            interval_centers = np.where(
+                merged, get_medians(interval_starts, interval_stops),
+                interval_centers[firsts])
+        return interval_centers, interval_starts, interval_stops
 
     @staticmethod
     def _get_fitting_values(sample, samples, name, dependency, index,
-                            number_of_intervals=None, bin_width=None):
+                            number_of_intervals=None, bin_width=None,
+                            pool=None, weights=None,
+                            previous=None, method='equal_width',
+                            dependent_range=None, sort_cache=None):
         """
         Returns values for fitting.
 
@@ -707,6 +2385,29 @@ class Fit():
             Order : (shape, loc, scale) (i.e. 0 -> shape).
         number_of_intervals : int
             Number of distributions used to fit shape, loc, scale.
+        pool : Pool or ThreadPool, optional
+            The pool that fits the intervals in parallel, see
+            Fit._get_interval_pool. If None, the intervals are fitted serially.
+        weights : ndarray, optional
+            Weight of each sample. The number of samples of an interval is
+            then the sum of the weights.
+        previous : dict, optional
+            The columns of a previous fit of the parameter, see
+            FitInspectionData.get_columns. If the samples were only extended
+            since, an interval with the same center and number of samples
+            holds the same samples, thus its previous fit is reused. The
+            other intervals are warm started with the previous shapes.
+        method : str, optional
+            The interval_method of the dimension the parameter depends on,
+            see Fit. Defaults to 'equal_width'.
+        dependent_range : tuple of float, optional
+            The smallest and the largest value (with weight) of the dimension
+            the parameter depends on. Computed if not given.
+        sort_cache : dict, optional
+            Cache of the sort order and the intervals of the dimensions
+            parameters depend on, filled at the first use of a dimension.
+            All parameters that use the cache must use the same samples,
+            weights and interval settings.
         Notes
         -----
         For that case that number_of_intervals and also bin_width is given the parameter
@@ -717,14 +2418,17 @@ class Fit():
         interval_centers : ndarray
             Array with length of the number of bins that contains the centers of the
             calculated bins.
-        dist_values : list of list
+        dist_values : list of ndarray
             List with length of the number of intervals that contains for each bin center
             the used samples for the current fit.
-        param_values : list of list
-            List with length of three that contains for each parameter (shape, loc, scale)
-            a list with length of the number of bins that contains the calculated parameters.
-        multiple_basic_fit : list of BasicFit
-            Contains information for each fit.
+        param_values : ndarray
+            Array with shape (3, number of intervals) that contains for each parameter
+            (shape, loc, scale) the calculated parameters of each interval.
+        n_samples : ndarray
+            The number of samples that were used for the fit of each interval.
+        dist_weights : list of ndarray or None
+            The weights of the samples of each used interval, None if the
+            samples are not weighted.
         Raises
         ------
         RuntimeError
@@ -732,53 +2436,73 @@ class Fit():
         RuntimeError
             If there was not enough data and the number of intervals was less than three.
         """
-        MIN_DATA_POINTS_FOR_FIT = 10
-
-        # Compute intervals.
-        if number_of_intervals:
-            interval_centers, interval_width = np.linspace(
-                min(samples[dependency[index]]), max(samples[dependency[index]]),
-                num=number_of_intervals, endpoint=False, retstep=True)
-            interval_centers += 0.5 * interval_width
-        elif bin_width:
-            interval_width = bin_width
-            interval_centers = np.arange(
-                0.5 * interval_width,
-                max(samples[dependency[index]]) + 0.5 * interval_width,
-                interval_width)
+        sample = np.asarray(sample, dtype=np.float64)
+        sort_indice, sorted_weights, cumulative_weights, interval_centers, \
+            interval_starts, interval_stops = Fit._get_sorted_intervals(
+                samples, dependency[index], number_of_intervals, bin_width,
+                weights, method, dependent_range, sort_cache)
+        sorted_sample = sample[sort_indice]
+
+        # Return values, one column for each interval.
+        param_values = np.full((3, len(interval_centers)), np.nan)
+        if weights is None:
+            n_samples = interval_stops - interval_starts
+            interval_weights = None
         else:
-            raise RuntimeError(
-                "Either the parameters number_of_intervals or bin_width has to be specified, "
-                "otherwise the intervals are not specified. Exiting.")
-
-        # Sort samples.
-        samples = np.stack((sample, samples[dependency[index]])).T
-        sort_indice = np.argsort(samples[:, 1])
-        sorted_samples = samples[sort_indice]
-
-        # Return values.
-        param_values = [[], [], []]
+            n_samples = cumulative_weights[interval_stops] - \
+                cumulative_weights[interval_starts]
+            interval_weights = [sorted_weights[start:stop] for start, stop
+                                in zip(interval_starts, interval_stops)]
         dist_values = []
-
-        # List of all basic fits.
-        multiple_basic_fit = []
+        dist_weights = None if weights is None else []
 
         # Deleted interval_centers by index.
         deleted_centers = []
 
         # Define the data interval that is used for the fit.
+        interval_samples = [sorted_sample[start:stop] for start, stop
+                            in zip(interval_starts, interval_stops)]
+        has_enough_data = n_samples >= MIN_DATA_POINTS_FOR_FIT
+
+        # Fit distribution to selected data.
+        fitted_params = [None] * len(interval_samples)
+        shape_guesses = None
+        if previous is not None and len(previous['at']):
+            previous_index = dict((center, j) for j, center in enumerate(previous['at']))
+            for i, center in enumerate(interval_centers):
+                j = previous_index.get(center)
+                if j is not None and previous['n_samples'][j] == n_samples[i]:
+                    fitted_params[i] = tuple(ConstantParam(previous[param][j]) for param
+                                             in (SHAPE_STRING, LOCATION_STRING, SCALE_STRING))
+            order = np.argsort(previous['at'])
+            shape_guesses = np.interp(interval_centers, previous['at'][order],
+                                      previous[SHAPE_STRING][order])
+        if name != 'KernelDensity':
+            used_indices = [i for i, enough in enumerate(has_enough_data)
+                            if enough and fitted_params[i] is None]
+            for i, current_params in zip(used_indices, Fit._fit_intervals(
+                    [interval_samples[i] for i in used_indices], name, pool,
+                    None if weights is None else
+                    [interval_weights[i] for i in used_indices],
+                    None if shape_guesses is None else
+                    [shape_guesses[i] for i in used_indices])):
+                fitted_params[i] = current_params
+
         for i, step in enumerate(interval_centers):
-            mask = ((sorted_samples[:, 1] >= step - 0.5 * interval_width) &
-                    (sorted_samples[:, 1] < step + 0.5 * interval_width))
-            samples_in_interval = sorted_samples[mask, 0]
-            if len(samples_in_interval) >= MIN_DATA_POINTS_FOR_FIT:
-                try:
-                    # Fit distribution to selected data.
-                    basic_fit = Fit._append_params(
-                        name, param_values, dependency, index, samples_in_interval)
-                    multiple_basic_fit.append(basic_fit)
+            samples_in_interval = interval_samples[i]
+            if has_enough_data[i] and name == 'KernelDensity':
+                # Kernel densities have no parameters (shape, loc, scale), the
+                # densities are estimated by the caller from dist_values.
+                dist_values.append(samples_in_interval)
+                if weights is not None:
+                    dist_weights.append(interval_weights[i])
+            elif has_enough_data[i]:
+                if fitted_params[i] is not None:
+                    param_values[:, i] = [param(None) for param in fitted_params[i]]
                     dist_values.append(samples_in_interval)
-                except ValueError:
+                    if weights is not None:
+                        dist_weights.append(interval_weights[i])
+                else:
                     # For case that to few fitting data for the step were found
                     # the step is deleted.
                     deleted_centers.append(i) # Add index of unused center.
@@ -799,7 +2523,7 @@ class Fit():
                     "Consider analyzing your data or reducing the number of "
                     "intervals."
                         .format(MIN_DATA_POINTS_FOR_FIT,
-                        len(samples_in_interval),
+                        n_samples[i],
                         step,
                         dependency[index]),
                     RuntimeWarning, stacklevel=2)
@@ -812,10 +2536,148 @@ class Fit():
 
         # Delete interval centers that were not used.
         interval_centers = np.delete(interval_centers, deleted_centers)
+        param_values = np.delete(param_values, deleted_centers, axis=1)
+        n_samples = np.delete(n_samples, deleted_centers)
+
+        return interval_centers, dist_values, param_values, n_samples, dist_weights
+
+    @staticmethod
+    def _get_sorted_intervals(samples, dimension, number_of_intervals=None,
+                              bin_width=None, weights=None, method='equal_width',
+                              dependent_range=None, sort_cache=None):
+        """
+        Sorts the samples by a dimension and divides them into intervals of
+        that dimension, see _get_fitting_values.
+
+        Returns
+        -------
+        tuple
+            The sort order, the sorted weights (None without weights), the
+            cumulative sorted weights, the interval centers and the start and
+            stop index of each interval in the sorted samples. The tuple is
+            stored in sort_cache under dimension.
+        """
+        if sort_cache is not None and dimension in sort_cache:
+            return sort_cache[dimension]
+        dependent_sample = np.asarray(samples[dimension], dtype=np.float64)
+
+        # Sort samples.
+        sort_indice = np.argsort(dependent_sample)
+        sorted_dependent_sample = dependent_sample[sort_indice]
+        if weights is not None:
+            sorted_weights = np.asarray(weights, dtype=np.float64)[sort_indice]
+            cumulative_weights = np.concatenate(([0], np.cumsum(sorted_weights)))
+        else:
+            sorted_weights = None
+            cumulative_weights = np.arange(len(sorted_dependent_sample) + 1)
+
+        # Compute intervals. Samples without weight do not extend the range.
+        if dependent_range is None:
+            dependent_range = Fit._get_ranges(
+                [dependent_sample], None if weights is None else np.asarray(weights))[0]
+        interval_centers, interval_starts, interval_stops = Fit._get_interval_slices(
+            sorted_dependent_sample, cumulative_weights, dependent_range[0],
+            dependent_range[1], number_of_intervals, bin_width, method)
+        result = (sort_indice, sorted_weights, cumulative_weights, interval_centers,
+                  interval_starts, interval_stops)
+        if sort_cache is not None:
+            sort_cache[dimension] = result
+        return result
+
+    @staticmethod
+    def _get_cdf(name, x, shape, loc, scale):
+        """
+        Returns the cdf of the distribution at x. The parameters (shape, loc,
+        scale) are arrays that broadcast with x.
+        """
+        if name == WEIBULL_2P_KEYWORD or name == WEIBULL_3P_KEYWORD or \
+                name == WEIBULL_3P_KEYWORD_ALTERNATIVE:
+            with np.errstate(invalid='ignore'):
+                return -np.expm1(-np.maximum((x - loc) / scale, 0) ** shape)
+        elif name == NORMAL_KEYWORD:
+            return sts.norm.cdf((x - loc) / scale)
+        elif name == LOGNORMAL_EXPMU_PARAMETER_KEYWORD or \
+                name == LOGNORMAL_MU_PARAMETER_KEYWORD:
+            with np.errstate(divide='ignore'):
+                return sts.norm.cdf(np.log(np.maximum(x - loc, 0) / scale) / shape)
+        else:
+            err_msg = "Distribution '{}' is unknown.".format(name)
+            raise ValueError(err_msg)
+
+    @staticmethod
+    def _get_goodness_of_fit(name, interval_samples, param_values, interval_weights=None):
+        """
+        Returns the Kolmogorov-Smirnov and the Anderson-Darling statistic of
+        the fits of all intervals.
 
-        return interval_centers, dist_values, param_values, multiple_basic_fit
+        The samples of all intervals are sorted at once and the empirical
+        cdf of each interval is compared with the fitted cdf in one pass.
+        With weights, the empirical cdf of an interval increases by the
+        weight of each sample divided by the sum of the weights, and the
+        Anderson-Darling statistic is scaled with the sum of the weights.
 
-    def _get_distribution(self, dimension, samples, **kwargs):
+        Parameters
+        ----------
+        name : str
+            Name of the distribution.
+        interval_samples : list of ndarray
+            The samples of each interval.
+        param_values : array_like
+            Array with shape (3, number of intervals) that contains the
+            fitted parameters (shape, loc, scale) of each interval.
+        interval_weights : list of ndarray, optional
+            The weights of the samples of each interval.
+        Returns
+        -------
+        ks : ndarray
+            The Kolmogorov-Smirnov statistic of each interval.
+        ad : ndarray
+            The Anderson-Darling statistic of each interval.
+        """
+        param_values = np.asarray(param_values, dtype=np.float64).reshape(3, -1)
+        lengths = np.array([len(interval_sample) for interval_sample in interval_samples],
+                           dtype=int)
+        ks = np.full(len(lengths), np.nan)
+        ad = np.full(len(lengths), np.nan)
+        used = np.flatnonzero(lengths)
+        if not len(used):
+            return ks, ad
+        lengths = lengths[used]
+        ids = np.repeat(np.arange(len(used)), lengths)
+        values = np.concatenate([np.asarray(interval_samples[i], dtype=np.float64)
+                                 for i in used])
+        if interval_weights is None:
+            weights = np.ones(len(values))
+        else:
+            weights = np.concatenate([np.asarray(interval_weights[i], dtype=np.float64)
+                                      for i in used])
+
+        # Sort by value within each interval, the intervals stay in order.
+        order = np.lexsort((values, ids))
+        values = values[order]
+        weights = weights[order]
+        params = param_values[:, used][:, ids]
+        eps = np.finfo(np.float64).eps
+        cdf = np.clip(Fit._get_cdf(name, values, *params), eps, 1 - eps)
+
+        # Empirical cdf after (upper) and before (lower) each sample.
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        cumulative_weights = np.cumsum(weights)
+        totals = np.add.reduceat(weights, starts)
+        offsets = cumulative_weights[starts] - weights[starts]
+        upper = (cumulative_weights - offsets[ids]) / totals[ids]
+        lower = upper - weights / totals[ids]
+
+        ks[used] = np.maximum.reduceat(np.maximum(upper - cdf, cdf - lower), starts)
+        # Integral of (ecdf - cdf)^2 / (cdf (1 - cdf)) dcdf, summed over the
+        # steps of the empirical cdf.
+        terms = (lower ** 2 - upper ** 2) * np.log(cdf) + \
+                ((1 - upper) ** 2 - (1 - lower) ** 2) * np.log1p(-cdf)
+        ad[used] = totals * (np.add.reduceat(terms, starts) - 1)
+        return ks, ad
+
+    @staticmethod
+    def _get_distribution(dimension, samples, **kwargs):
         """
         Returns the fitted distribution, the dependency and information to
         visualize all fits for this dimension.
@@ -844,11 +2706,23 @@ class Fit():
         Raises
         ------
         NotImplementedError
-            If the the name of a dependent distribution was 'KernelDensity'.
+            If a 'KernelDensity' distribution depends on more than one
+            dimension.
         RuntimeError
             If not a good fit was found.
         """
 
+        # The intervals of all parameters are fitted by one pool.
+        if kwargs.get('interval_pool') is None:
+            interval_pool = Fit._get_interval_pool(
+                kwargs.get('interval_workers'), kwargs.get('interval_backend', 'process'))
+            if interval_pool is not None:
+                try:
+                    return Fit._get_distribution(
+                        dimension, samples, **dict(kwargs, interval_pool=interval_pool))
+                finally:
+                    interval_pool.terminate()
+
         # Save settings for distribution
         sample = samples[dimension]
         if 'name' in kwargs:
@@ -860,6 +2734,14 @@ class Fit():
         functions = kwargs.get('functions', ('polynomial', 'polynomial', 'polynomial'))
         list_number_of_intervals = kwargs.get('list_number_of_intervals')
         list_width_of_intervals = kwargs.get('list_width_of_intervals')
+        list_interval_methods = kwargs.get('list_interval_methods')
+        interval_pool = kwargs.get('interval_pool')
+        keep_samples = kwargs.get('keep_samples', True)
+        weights = kwargs.get('weights')
+        previous = kwargs.get('previous')
+        goodness_of_fit = kwargs.get('goodness_of_fit', False)
+        ranges = kwargs.get('ranges')
+        sort_cache = kwargs.get('sort_cache')
 
         # Fit inspection data for current dimension
         fit_inspection_data = FitInspectionData()
@@ -869,10 +2751,49 @@ class Fit():
 
         # Handle KernelDensity separated
         if name == 'KernelDensity':
-            if dependency != (None, None, None):
-                raise NotImplementedError("KernelDensity can not be conditional.")
-            return KernelDensityDistribution(Fit._fit_distribution(sample, name)), dependency, \
-                   used_number_of_intervals, fit_inspection_data
+            if all(dep is None for dep in dependency):
+                return KernelDensityDistribution(
+                    Fit._fit_distribution(sample, name, weights=weights)), \
+                       dependency, used_number_of_intervals, fit_inspection_data
+
+            if len(set(dep for dep in dependency if dep is not None)) > 1:
+                raise NotImplementedError(
+                    "KernelDensity can only be conditional on a single dimension.")
+            index = [dep is not None for dep in dependency].index(True)
+            method = 'equal_width' if list_interval_methods is None \
+                else list_interval_methods[dependency[index]]
+            dependent_range = None if ranges is None else ranges[dependency[index]]
+
+            # Reuse the binning of the parametric distributions, but estimate
+            # a kernel density instead of fitting parameters in each interval.
+            if list_number_of_intervals[dependency[index]]:
+                interval_centers, dist_values, _, _, dist_weights = \
+                    Fit._get_fitting_values(
+                        sample, samples, name, dependency, index,
+                        number_of_intervals=list_number_of_intervals[dependency[index]],
+                        weights=weights, method=method,
+                        dependent_range=dependent_range, sort_cache=sort_cache)
+            elif list_width_of_intervals[dependency[index]]:
+                interval_centers, dist_values, _, _, dist_weights = \
+                    Fit._get_fitting_values(
+                        sample, samples, name, dependency, index,
+                        bin_width=list_width_of_intervals[dependency[index]],
+                        weights=weights, method=method,
+                        dependent_range=dependent_range, sort_cache=sort_cache)
+            else:
+                raise RuntimeError(
+                    "Either the parameters number_of_intervals or bin_width has to be "
+                    "specified, otherwise the intervals are not specified. Exiting.")
+
+            if dist_weights is None:
+                dist_weights = [None] * len(dist_values)
+            quantiles = [Fit._fit_kernel_density_quantiles(dist_value, weights=dist_weight)
+                         for dist_value, dist_weight in zip(dist_values, dist_weights)]
+            for i, dep in enumerate(dependency):
+                if dep is not None:
+                    used_number_of_intervals[i] = len(interval_centers)
+            return ConditionalKernelDensityDistribution(interval_centers, quantiles), \
+                   dependency, used_number_of_intervals, fit_inspection_data
 
         # Initialize params (shape, loc, scale)
         params = [None, None, None]
@@ -885,10 +2806,22 @@ class Fit():
 
             # In case that there is no dependency for this param
             if dependency[index] is None:
-                current_params = Fit._fit_distribution(sample, name)
+                shape_guess = None
+                if previous is not None and len(previous.shape_value):
+                    shape_guess = previous.shape_value[0]
+                current_params = Fit._fit_distribution(sample, name, shape_guess,
+                                                       weights=weights)
 
                 # Basic fit for no dependency
-                basic_fit = BasicFit(*current_params, sample)
+                basic_fit = BasicFit(*current_params,
+                                     sample if keep_samples else None,
+                                     len(sample) if weights is None else np.sum(weights))
+                statistics = (np.nan, np.nan)
+                if goodness_of_fit:
+                    ks, ad = Fit._get_goodness_of_fit(
+                        name, [sample], [[param(None)] for param in current_params],
+                        None if weights is None else [weights])
+                    statistics = (ks[0], ad[0])
                 for i in range(index, len(functions)):
                     # Check if the other parameters have also no dependency
                     if dependency[i] is None:
@@ -896,13 +2829,13 @@ class Fit():
                         # Add basic fit to fit inspection data
                         if i == 0:
                             fit_inspection_data.append_basic_fit(SHAPE_STRING,
-                                                                 basic_fit)
+                                                                 basic_fit, statistics)
                         elif i == 1:
                             fit_inspection_data.append_basic_fit(LOCATION_STRING,
-                                                                 basic_fit)
+                                                                 basic_fit, statistics)
                         elif i == 2:
                             fit_inspection_data.append_basic_fit(SCALE_STRING,
-                                                                 basic_fit)
+                                                                 basic_fit, statistics)
 
                         if i == 2 and name == LOGNORMAL_MU_PARAMETER_KEYWORD:
                             params[i] = ConstantParam(np.log(current_params[i](0)))
@@ -910,89 +2843,95 @@ class Fit():
                             params[i] = current_params[i]
             # In case that there is a dependency
             else:
+                previous_columns = None
+                if previous is not None:
+                    previous_columns = previous.get_columns(
+                        (SHAPE_STRING, LOCATION_STRING, SCALE_STRING)[index])
+                    if previous_columns['at'] is None:
+                        previous_columns = None
+                method = 'equal_width' if list_interval_methods is None \
+                    else list_interval_methods[dependency[index]]
+                dependent_range = None if ranges is None else ranges[dependency[index]]
                 # If the number of intervals is given.
                 if list_number_of_intervals[dependency[index]]:
-                    interval_centers, dist_values, param_values, multiple_basic_fit = \
+                    interval_centers, dist_values, param_values, n_samples, dist_weights = \
                         Fit._get_fitting_values(
                             sample, samples, name, dependency, index,
-                            number_of_intervals=list_number_of_intervals[dependency[index]])
+                            number_of_intervals=list_number_of_intervals[dependency[index]],
+                            pool=interval_pool,
+                            weights=weights, previous=previous_columns,
+                            method=method, dependent_range=dependent_range,
+                            sort_cache=sort_cache)
                 # If a the (constant) width of the intervals is given.
                 elif list_width_of_intervals[dependency[index]]:
-                    interval_centers, dist_values, param_values, multiple_basic_fit = \
+                    interval_centers, dist_values, param_values, n_samples, dist_weights = \
                         Fit._get_fitting_values(
                             sample, samples, name, dependency, index,
-                            bin_width=list_width_of_intervals[dependency[index]])
+                            bin_width=list_width_of_intervals[dependency[index]],
+                            pool=interval_pool,
+                            weights=weights, previous=previous_columns,
+                            method=method, dependent_range=dependent_range,
+                            sort_cache=sort_cache)
+                statistics = None
+                if goodness_of_fit:
+                    statistics = Fit._get_goodness_of_fit(name, dist_values,
+                                                          param_values, dist_weights)
 
                 for i in range(index, len(functions)):
                     # Check if the other parameters have the same dependency
                     if dependency[i] is not None and dependency[i] == dependency[index]:
-                        # Add basic fits to fit inspection data
-                        for basic_fit in multiple_basic_fit:
-                            if i == 0:
-                                fit_inspection_data.append_basic_fit(
-                                    SHAPE_STRING,
-                                    basic_fit)
-                            elif i == 1:
-                                fit_inspection_data.append_basic_fit(
-                                    LOCATION_STRING,
-                                    basic_fit)
-                            elif i == 2:
-                                fit_inspection_data.append_basic_fit(
-                                    SCALE_STRING,
-                                    basic_fit)
-
-                        # Add interval centers to fit inspection data
-                        if i == 0:
-                            fit_inspection_data.shape_at = interval_centers
-                        elif i == 1:
-                            fit_inspection_data.loc_at = interval_centers
-                        elif i == 2:
-                            fit_inspection_data.scale_at = interval_centers
+                        # Add basic fits and interval centers to fit inspection data
+                        fit_inspection_data.set_basic_fits(
+                            (SHAPE_STRING, LOCATION_STRING, SCALE_STRING)[i],
+                            interval_centers, param_values, n_samples,
+                            dist_values if keep_samples else None, statistics)
 
                         # Add used number of intervals for current parameter
                         used_number_of_intervals[i] = len(interval_centers)
 
                         if i == 2 and name == LOGNORMAL_MU_PARAMETER_KEYWORD:
-                            fit_points = [np.log(p(None)) for p in param_values[i]]
+                            fit_points = np.log(param_values[i])
                         else:
-                            fit_points = [p(None) for p in param_values[i]]
+                            fit_points = param_values[i]
+                        # Reuse the previous function if the fitted points did not change.
+                        previous_param = None
+                        if previous is not None and previous.params is not None:
+                            previous_param = previous.params[i]
+                            previous_at, previous_values = \
+                                previous.get_dependent_param_points(
+                                    (SHAPE_STRING, LOCATION_STRING, SCALE_STRING)[i])
+                            if previous_at is not None and \
+                                    np.array_equal(previous_at, interval_centers) and \
+                                    np.array_equal(previous_values, param_values[i]):
+                                params[i] = previous_param
+                                continue
                         # Fit parameters with particular function
-                        try:
-                            param_popt, param_pcov = curve_fit(
-                                Fit._get_function(functions[i]),
-                                interval_centers, fit_points, bounds=_bounds)
-                        except RuntimeError:
-                            # Case that optimal parameters not found
-                            if i == 0 and name == LOGNORMAL_MU_PARAMETER_KEYWORD:
-                                param_name = "sigma"
-                            elif i == 2 and name == LOGNORMAL_MU_PARAMETER_KEYWORD:
-                                param_name = "mu"
-                            elif i == 0:
-                                param_name = SHAPE_STRING
-                            elif i == 1:
-                                param_name = LOCATION_STRING
-                            elif i == 2:
-                                param_name = SCALE_STRING
-
-                            warnings.warn(
-                                "Optimal Parameters not found for parameter '{}' in dimension "
-                                "'{}'. Maybe switch the given function for a better fit. Trying "
-                                "again with a higher number of calls to function '{}'.".format(
-                                    param_name, dimension, functions[i]),
-                                RuntimeWarning, stacklevel=2)
-                            try:
-                                param_popt, param_pcov = curve_fit(
-                                    Fit._get_function(functions[i]), interval_centers, fit_points,
-                                    bounds=_bounds, maxfev=int(1e6))
-                            except RuntimeError:
-                                raise RuntimeError(
-                                    "Can't fit curve for parameter '{}' in dimension '{}'. "
-                                    "Number of iterations exceeded.".format(param_name, dimension))
-
-                        # Save parameter
-                        params[i] = FunctionParam(*param_popt, functions[i])
-
-        # Return particular distribution
+                        params[i] = Fit._fit_dependence_function(
+                            interval_centers, fit_points, functions[i],
+                            Fit._get_param_name(name, i), dimension,
+                            Fit._get_coefficients(previous_param, functions[i]))
+
+        fit_inspection_data.params = params
+        distribution = Fit._create_distribution(name, params)
+        return distribution, dependency, used_number_of_intervals, fit_inspection_data
+
+    @staticmethod
+    def _create_distribution(name, params):
+        """
+        Returns the distribution with the given parameters.
+
+        Parameters
+        ----------
+        name : str
+            Name of distribution (e.g. 'Weibull_2p' or 'Lognormal').
+        params : list of Param
+            The parameters in the order (shape, loc, scale). For
+            'Lognormal_SigmaMu' it is (sigma, None, mu).
+        Returns
+        -------
+        Distribution
+            The distribution or None if the name is unknown.
+        """
         distribution = None
         if name == WEIBULL_2P_KEYWORD or name == WEIBULL_3P_KEYWORD or \
                         name == WEIBULL_3P_KEYWORD_ALTERNATIVE:
@@ -1003,13 +2942,410 @@ class Fit():
             distribution = LognormalDistribution(*params)
         elif name == NORMAL_KEYWORD:
             distribution = NormalDistribution(*params)
-        return distribution, dependency, used_number_of_intervals, fit_inspection_data
+        return distribution
+
+    @staticmethod
+    def _get_param_name(name, index):
+        """
+        Returns the name of a parameter of a distribution for messages.
+        """
+        if index == 0 and name == LOGNORMAL_MU_PARAMETER_KEYWORD:
+            return "sigma"
+        elif index == 2 and name == LOGNORMAL_MU_PARAMETER_KEYWORD:
+            return "mu"
+        return (SHAPE_STRING, LOCATION_STRING, SCALE_STRING)[index]
+
+    @staticmethod
+    def _get_jacobian(function_name):
+        """
+        Returns the Jacobian of the function with respect to its coefficients.
+
+        Parameters
+        ----------
+        function_name : str
+            Options are 'power3', 'exp3'.
+
+        Returns
+        -------
+        func
+             The Jacobian of the function named function_name.
+
+        Raises
+        ------
+        ValueError
+            If the function is unknown.
+        """
+        if function_name == 'power3':
+            return _power3_jacobian
+        elif function_name == 'exp3':
+            return _exp3_jacobian
+        else:
+            err_msg = "Function '{}' is unknown.".format(function_name)
+            raise ValueError(err_msg)
+
+    @staticmethod
+    def _get_initial_coefficients(function_name, x, y):
+        """
+        Returns initial values of the coefficients of a dependence function.
+
+        For a fixed a the functions are linear after taking logarithms,
+        log(y - a) = log(b) + c * log(x) for power3 and
+        log(y - a) = log(b) + c * x for exp3. This linear fit is computed
+        for some values of a below min(y) and the coefficients with the
+        smallest squared error are returned.
+
+        Parameters
+        ----------
+        function_name : str
+            Options are 'power3', 'exp3'.
+        x : ndarray
+            The centers of the intervals.
+        y : ndarray
+            The fitted parameters of the intervals.
+
+        Returns
+        -------
+        tuple of float
+            The coefficients (a, b, c) within the bounds of the fit or None
+            if there are not enough points for the linear fit.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        tiny = np.finfo(np.float64).tiny
+        function = Fit._get_function(function_name)
+        best = None
+        best_error = np.inf
+        for fraction in (0, 0.5, 0.9):
+            a = max(fraction * y.min(), tiny)
+            usable = y - a > 0
+            if function_name == 'power3':
+                usable &= x > 0
+                linear_x = np.log(x[usable])
+            else:
+                linear_x = x[usable]
+            if np.count_nonzero(usable) < 2 or np.ptp(linear_x) == 0:
+                continue
+            c, log_b = np.polyfit(linear_x, np.log(y[usable] - a), 1)
+            b = max(np.exp(log_b), tiny)
+            with np.errstate(over='ignore', invalid='ignore'):
+                error = np.sum((function(x, a, b, c) - y) ** 2)
+            if np.isfinite(error) and error < best_error:
+                best = (a, b, c)
+                best_error = error
+        return best
+
+    @staticmethod
+    def _get_coefficients(param, function_name):
+        """
+        Returns the coefficients (a, b, c) of a dependence function if it is
+        the function function_name, otherwise None.
+        """
+        if isinstance(param, FunctionParam) and param.func_name == function_name:
+            return param.a, param.b, param.c
+        return None
+
+    @staticmethod
+    def _fit_dependence_function(interval_centers, fit_points, function_name,
+                                 param_name, dimension, p0=None):
+        """
+        Fits a dependence function to the parameters of the interval fits.
+
+        Parameters
+        ----------
+        interval_centers : ndarray
+            The centers of the intervals of the dimension the parameter
+            depends on.
+        fit_points : ndarray
+            The fitted parameter in each interval.
+        function_name : str
+            Name of the dependence function, 'power3' or 'exp3'.
+        param_name : str
+            Name of the parameter, used in messages.
+        dimension : int
+            The dimension of the parameter, used in messages.
+        p0 : tuple of float, optional
+            Initial values of the coefficients, e.g. of a previous fit. If
+            None, the initial values are estimated by a linearised fit, see
+            _get_initial_coefficients.
+        Returns
+        -------
+        FunctionParam
+            The fitted dependence function.
+        Raises
+        ------
+        RuntimeError
+            If not a good fit was found within DEPENDENCE_FUNCTION_MAX_NFEV
+            function evaluations.
+
+        Notes
+        -----
+        The coefficients are found by curve_fit with the analytic Jacobian
+        of the function. If the first attempt does not converge, it is
+        retried from the default initial values with at most
+        DEPENDENCE_FUNCTION_MAX_NFEV function evaluations.
+        """
+        function = Fit._get_function(function_name)
+        jacobian = Fit._get_jacobian(function_name)
+        if p0 is None:
+            p0 = Fit._get_initial_coefficients(function_name, interval_centers,
+                                               fit_points)
+        try:
+            param_popt, param_pcov = curve_fit(
+                function, interval_centers, fit_points, p0=p0, jac=jacobian,
+                bounds=_bounds)
+        except RuntimeError:
+            # Case that optimal parameters not found
+            warnings.warn(
+                "Optimal Parameters not found for parameter '{}' in dimension "
+                "'{}'. Maybe switch the given function for a better fit. Trying "
+                "again from the default initial values of function '{}' with at "
+                "most {} function evaluations.".format(
+                    param_name, dimension, function_name,
+                    DEPENDENCE_FUNCTION_MAX_NFEV),
+                RuntimeWarning, stacklevel=3)
+            try:
+                param_popt, param_pcov = curve_fit(
+                    function, interval_centers, fit_points, jac=jacobian,
+                    bounds=_bounds, max_nfev=DEPENDENCE_FUNCTION_MAX_NFEV)
+            except RuntimeError:
+                raise RuntimeError(
+                    "Can't fit curve for parameter '{}' in dimension '{}'. "
+                    "Number of iterations exceeded.".format(param_name, dimension))
+        return FunctionParam(*param_popt, function_name)
 
     def __str__(self):
         return "Fit() instance with dist_dscriptions: " + "".join(
             [str(d) for d in self.dist_descriptions])
 
 
+class ModelSelection():
+    """
+    Fits candidate models and ranks them by their log-likelihood or an
+    information criterion.
+
+    The candidates are given per dimension. Since the joint log-likelihood
+    is the sum of the conditional log-likelihoods of the dimensions, the
+    best candidate of each dimension is chosen independently, which gives
+    the best joint model.
+
+    Attributes
+    ----------
+    table : list of dict
+        One entry for each candidate with the keys 'dimension', 'candidate'
+        (the index of the candidate in its dimension), 'name', 'dependency',
+        'functions', 'log_likelihood', 'n_parameters', 'aic', 'bic', 'rank'
+        (1 is the best candidate of the dimension, None if the fit failed)
+        and 'error' (the error message if the fit failed, otherwise None).
+    best_descriptions : list of dict
+        The description of the best candidate of each dimension.
+    mul_var_dist : MultivariateDistribution
+        The distribution that consists of the best candidates.
+    multiple_fit_inspection_data : list of FitInspectionData
+        The fit inspection data of the best candidate of each dimension.
+
+    Examples
+    --------
+    >>> prng = np.random.RandomState(42)
+    >>> sample_hs = prng.weibull(1.5, 1000) * 3
+    >>> sample_tz = 0.1 + 1.5 * np.exp(0.2 * sample_hs) + prng.lognormal(2, 0.2, 1000)
+    >>> candidates_hs = [{'name': 'Weibull_2p', 'dependency': (None, None, None),
+    ...                   'width_of_intervals': 2},
+    ...                  {'name': 'Lognormal', 'dependency': (None, None, None),
+    ...                   'width_of_intervals': 2}]
+    >>> candidates_tz = [{'name': 'Lognormal', 'dependency': (0, None, 0),
+    ...                   'functions': ('exp3', None, 'power3')},
+    ...                  {'name': 'Normal', 'dependency': (None, 0, 0),
+    ...                   'functions': (None, 'power3', 'power3')}]
+    >>> selection = ModelSelection((sample_hs, sample_tz),
+    ...                            (candidates_hs, candidates_tz), criterion='bic')
+    >>> [description['name'] for description in selection.best_descriptions]
+    ['Weibull_2p', 'Lognormal']
+    """
+
+    def __init__(self, samples, candidates, criterion='aic', workers=None,
+                 weights=None):
+        """
+        Fits all candidates and selects the best candidate of each dimension.
+
+        Parameters
+        ----------
+        samples : list of list or ndarray or DataFrame
+            The samples, as for Fit. All dimensions must have the same number
+            of samples.
+        candidates : list of list of dict
+            For each dimension a list of dist_descriptions (see Fit). The
+            intervals of a dimension (number_of_intervals or
+            width_of_intervals) are taken from its first candidate.
+        criterion : str, optional
+            'aic', 'bic' or 'log_likelihood'. Defaults to 'aic'.
+        workers : int, optional
+            Number of processes that fit the candidates concurrently. The
+            processes attach to a memory-mapped copy of the samples. If None,
+            the candidates are fitted serially.
+        weights : array_like, optional
+            Weight of each sample, see Fit.
+
+        Raises
+        ------
+        ValueError
+            If the criterion is unknown, if a candidate is a
+            'KernelDensity' (which has no likelihood to compare) or if the
+            dimensions have different numbers of samples.
+        RuntimeError
+            If no candidate of a dimension could be fitted.
+        """
+        if criterion not in ('aic', 'bic', 'log_likelihood'):
+            raise ValueError("criterion must be 'aic', 'bic' or 'log_likelihood', "
+                             "but was '{}'.".format(criterion))
+        samples = Fit._as_columns(samples)
+        if len(candidates) != len(samples):
+            raise ValueError("candidates must have one list of candidates for "
+                             "each of the {} dimensions.".format(len(samples)))
+        if len(set(len(sample) for sample in samples)) != 1:
+            raise ValueError("All dimensions must have the same number of samples.")
+        for dimension_candidates in candidates:
+            for candidate in dimension_candidates:
+                if candidate['name'] == 'KernelDensity':
+                    raise ValueError("A 'KernelDensity' has no likelihood to compare "
+                                     "and can not be a candidate.")
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+
+        list_number_of_intervals = [dimension_candidates[0].get('number_of_intervals')
+                                    for dimension_candidates in candidates]
+        list_width_of_intervals = [dimension_candidates[0].get('width_of_intervals')
+                                   for dimension_candidates in candidates]
+        list_interval_methods = [Fit._get_interval_method(dimension_candidates[0])
+                                 for dimension_candidates in candidates]
+        tasks = []
+        for dimension, dimension_candidates in enumerate(candidates):
+            for index, candidate in enumerate(dimension_candidates):
+                kwargs = dict(candidate,
+                              list_number_of_intervals=list_number_of_intervals,
+                              list_width_of_intervals=list_width_of_intervals,
+                              list_interval_methods=list_interval_methods)
+                tasks.append((dimension, index, kwargs))
+
+        results = self._evaluate(samples, weights, tasks, workers)
+
+        n = len(samples[0]) if weights is None else weights.sum()
+        self.table = []
+        best = {}
+        for (dimension, index, kwargs), (result, log_likelihood) in zip(tasks, results):
+            candidate = candidates[dimension][index]
+            entry = {'dimension': dimension,
+                     'candidate': index,
+                     'name': candidate['name'],
+                     'dependency': candidate.get('dependency', (None, None, None)),
+                     'functions': candidate.get('functions'),
+                     'log_likelihood': None,
+                     'n_parameters': None,
+                     'aic': None,
+                     'bic': None,
+                     'rank': None,
+                     'error': None}
+            if result is None:
+                entry['error'] = log_likelihood
+            else:
+                k = ModelSelection._count_parameters(candidate)
+                entry['log_likelihood'] = log_likelihood
+                entry['n_parameters'] = k
+                entry['aic'] = 2 * k - 2 * log_likelihood
+                entry['bic'] = k * np.log(n) - 2 * log_likelihood
+                best.setdefault(dimension, []).append((entry, result))
+            self.table.append(entry)
+
+        self.best_descriptions = []
+        self.multiple_fit_inspection_data = []
+        distributions = []
+        dependencies = []
+        for dimension in range(len(samples)):
+            if dimension not in best:
+                raise RuntimeError("No candidate of dimension '{}' could be "
+                                   "fitted.".format(dimension))
+            if criterion == 'log_likelihood':
+                ranked = sorted(best[dimension], key=lambda item: -item[0][criterion])
+            else:
+                ranked = sorted(best[dimension], key=lambda item: item[0][criterion])
+            for rank, (entry, _) in enumerate(ranked):
+                entry['rank'] = rank + 1
+            entry, result = ranked[0]
+            distribution, dependency, used_number_of_intervals, \
+            fit_inspection_data = result
+            self.best_descriptions.append(candidates[dimension][entry['candidate']])
+            self.multiple_fit_inspection_data.append(fit_inspection_data)
+            distributions.append(distribution)
+            dependencies.append(dependency)
+        self.mul_var_dist = MultivariateDistribution(distributions, dependencies)
+
+    @staticmethod
+    def _evaluate(samples, weights, tasks, workers):
+        """
+        Evaluates the candidates, concurrently if workers is given.
+        """
+        if not workers or workers < 2:
+            # All candidates share the sort orders and the intervals.
+            sort_cache = {}
+            return [_evaluate_candidate(samples, dimension,
+                                        dict(kwargs, weights=weights,
+                                             sort_cache=sort_cache))
+                    for dimension, _, kwargs in tasks]
+
+        shared = _share_samples(samples if weights is None
+                                else list(samples) + [weights])
+        pool = Pool(processes=workers)
+        try:
+            return pool.starmap(
+                _evaluate_shared_candidate,
+                [(shared[0], shared[1], dimension, kwargs, weights is not None)
+                 for dimension, _, kwargs in tasks])
+        finally:
+            pool.terminate()
+            os.remove(shared[0])
+
+    @staticmethod
+    def _log_likelihood(distribution, dependency, samples, dimension, weights=None):
+        """
+        Returns the log-likelihood of the samples of a dimension given the
+        samples of the dimensions it depends on. Returns -inf if a sample is
+        outside of the support or a parameter is invalid.
+        """
+        rv_values = np.asarray(samples, dtype=np.float64)
+        try:
+            with np.errstate(divide='ignore'):
+                log_pdf = distribution.logpdf(rv_values[dimension], rv_values,
+                                              dependency)
+        except ValueError:
+            return -np.inf
+        if weights is not None:
+            log_pdf = log_pdf[weights > 0]
+            weights = weights[weights > 0]
+            log_likelihood = np.dot(weights, log_pdf)
+        else:
+            log_likelihood = np.sum(log_pdf)
+        if np.isnan(log_likelihood):
+            return -np.inf
+        return log_likelihood
+
+    @staticmethod
+    def _count_parameters(dist_description):
+        """
+        Returns the number of fitted coefficients of a candidate: one for
+        each constant parameter and three for each dependence function.
+        Parameters that are fixed by the distribution (e.g. the location of
+        a 2-p. Weibull distribution) are not counted.
+        """
+        name = dist_description['name']
+        dependency = dist_description.get('dependency', (None, None, None))
+        if name == WEIBULL_3P_KEYWORD or name == WEIBULL_3P_KEYWORD_ALTERNATIVE:
+            free = (0, 1, 2)
+        elif name == NORMAL_KEYWORD:
+            free = (1, 2)
+        else:
+            free = (0, 2)
+        return sum(1 if dependency[i] is None else 3 for i in free)
+
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
@@ -13,6 +13,14 @@ import warnings # TODO remove warnings as soon as changes are done
 __all__ = ["Param", "ConstantParam", "FunctionParam", "Wrapper"]
 
 
+def _identity(x):
+    """
+    The wrapper function of a FunctionParam without wrapper. Module level
+    function, such that it is pickled by reference.
+    """
+    return x
+
+
 class Param(ABC):
     """
     Abstract base class for callable parameters.
@@ -91,17 +99,10 @@ class FunctionParam(Param):
         self.b = b
         self.c = c
 
-        if func_type == "power3":
-            self._func = self._power3
-            self.func_name = "power3"
-        elif func_type == "exp3":
-            self._func = self._exp3
-            self.func_name = "exp3"
-        else:
-            raise ValueError("{} is not a known kind of function.".format(func_type))
+        self._set_function(func_type)
 
         if wrapper is None:
-            self._wrapper = Wrapper(self._identity)
+            self._wrapper = Wrapper(_identity)
         elif isinstance(wrapper, Wrapper):
             self._wrapper = wrapper
         elif callable(wrapper):
@@ -110,8 +111,32 @@ class FunctionParam(Param):
             raise ValueError("Wrapper has to be a callable.")
         # TODO test wrapper with Wrapper and with function object
 
-    def _identity(self, x):
-        return x
+    def _set_function(self, func_type):
+        if func_type == "power3":
+            self._func = self._power3
+            self.func_name = "power3"
+        elif func_type == "exp3":
+            self._func = self._exp3
+            self.func_name = "exp3"
+        else:
+            raise ValueError("{} is not a known kind of function.".format(func_type))
+
+    def __getstate__(self):
+        """
+        Returns the coefficients, the name of the function and the wrapper
+        (None for the identity) instead of the bound methods, such that a
+        pickled FunctionParam is small, e.g. if it is sent to worker
+        processes.
+        """
+        wrapper = self._wrapper
+        if wrapper.func is _identity and wrapper.inner_wrapper is None:
+            wrapper = None
+        return (self.a, self.b, self.c, self.func_name, wrapper)
+
+    def __setstate__(self, state):
+        self.a, self.b, self.c, func_type, wrapper = state
+        self._set_function(func_type)
+        self._wrapper = Wrapper(_identity) if wrapper is None else wrapper
 
     # The 3-parameter power function (a dependence function).
     def _power3(self, x):
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Saves and loads fitted multivariate distributions as JSON.
+
+A stored distribution consists of plain values only (the names of the
+distributions and dependence functions, the constants and coefficients of
+the parameters, the dependencies and the grids of kernel densities), thus it
+can be loaded without fitting and does not depend on pickled objects.
+"""
+
+import json
+
+import numpy as np
+
+from .params import ConstantParam, FunctionParam, Wrapper
+from .distributions import (WeibullDistribution, LognormalDistribution,
+                            NormalDistribution, KernelDensityDistribution,
+                            ConditionalKernelDensityDistribution,
+                            MultivariateDistribution)
+
+
+__all__ = ["to_dict", "from_dict", "dump", "load"]
+
+# Identifies stored distributions
+SCHEMA_NAME = "viroconcom.MultivariateDistribution"
+
+# Version of the schema, increased with each incompatible change
+SCHEMA_VERSION = 1
+
+_PARAMETRIC_DISTRIBUTIONS = {"Weibull": WeibullDistribution,
+                             "Lognormal": LognormalDistribution,
+                             "Normal": NormalDistribution}
+
+
+def _wrapper_to_list(wrapper):
+    """
+    Returns the names of the numpy functions of a wrapper, the outermost
+    first. Identity functions are omitted.
+    """
+    functions = []
+    while wrapper is not None:
+        func = wrapper.func
+        name = getattr(func, '__name__', None)
+        if isinstance(func, np.ufunc):
+            functions.append(name)
+        elif name != '_identity':
+            raise ValueError("The wrapper function '{}' can not be stored, only "
+                             "numpy ufuncs are supported.".format(func))
+        wrapper = wrapper.inner_wrapper
+    return functions
+
+
+def _wrapper_from_list(functions):
+    """
+    Returns the wrapper of the numpy functions with the given names or None
+    if there are none.
+    """
+    wrapper = None
+    for name in reversed(functions):
+        func = getattr(np, name, None)
+        if not isinstance(func, np.ufunc):
+            raise ValueError("'{}' is not a numpy ufunc.".format(name))
+        wrapper = Wrapper(func, wrapper)
+    return wrapper
+
+
+def _param_to_dict(param):
+    """
+    Returns the dict of a parameter, None if the parameter is None.
+    """
+    if param is None:
+        return None
+    if isinstance(param, ConstantParam):
+        return {"constant": param(None)}
+    if isinstance(param, FunctionParam):
+        return {"function": param.func_name,
+                "a": float(param.a),
+                "b": float(param.b),
+                "c": float(param.c),
+                "wrapper": _wrapper_to_list(param._wrapper)}
+    raise ValueError("The parameter type '{}' can not be stored.".format(
+        type(param).__name__))
+
+
+def _param_from_dict(data):
+    """
+    Returns the parameter of a dict created by _param_to_dict.
+    """
+    if data is None:
+        return None
+    if "constant" in data:
+        return ConstantParam(data["constant"])
+    return FunctionParam(data["a"], data["b"], data["c"], data["function"],
+                         wrapper=_wrapper_from_list(data.get("wrapper", [])))
+
+
+def _distribution_to_dict(distribution):
+    """
+    Returns the dict of a distribution.
+    """
+    if isinstance(distribution, ConditionalKernelDensityDistribution):
+        return {"type": "ConditionalKernelDensity",
+                "interval_centers": distribution.interval_centers.tolist(),
+                "quantiles": distribution.quantiles.tolist()}
+    if isinstance(distribution, KernelDensityDistribution):
+        return {"type": "KernelDensity",
+                "cdf": np.asarray(distribution._cdf, dtype=np.float64).tolist(),
+                "i_cdf": np.asarray(distribution._i_cdf, dtype=np.float64).tolist()}
+    if isinstance(distribution, LognormalDistribution) and hasattr(distribution, "mu"):
+        return {"type": "Lognormal",
+                "sigma": _param_to_dict(distribution.sigma),
+                "mu": _param_to_dict(distribution.mu)}
+    for name, distribution_class in _PARAMETRIC_DISTRIBUTIONS.items():
+        if type(distribution) is distribution_class:
+            return {"type": name,
+                    "shape": _param_to_dict(distribution.shape),
+                    "loc": _param_to_dict(distribution.loc),
+                    "scale": _param_to_dict(distribution.scale)}
+    raise ValueError("The distribution type '{}' can not be stored.".format(
+        type(distribution).__name__))
+
+
+def _distribution_from_dict(data):
+    """
+    Returns the distribution of a dict created by _distribution_to_dict.
+    """
+    distribution_type = data["type"]
+    if distribution_type == "ConditionalKernelDensity":
+        return ConditionalKernelDensityDistribution(data["interval_centers"],
+                                                    data["quantiles"])
+    if distribution_type == "KernelDensity":
+        return KernelDensityDistribution((np.array(data["cdf"], dtype=np.float64),
+                                          np.array(data["i_cdf"], dtype=np.float64)))
+    if distribution_type == "Lognormal" and "mu" in data:
+        return LognormalDistribution(sigma=_param_from_dict(data["sigma"]),
+                                     mu=_param_from_dict(data["mu"]))
+    if distribution_type in _PARAMETRIC_DISTRIBUTIONS:
+        return _PARAMETRIC_DISTRIBUTIONS[distribution_type](
+            _param_from_dict(data["shape"]), _param_from_dict(data["loc"]),
+            _param_from_dict(data["scale"]))
+    raise ValueError("The distribution type '{}' is unknown.".format(distribution_type))
+
+
+def to_dict(mul_var_dist):
+    """
+    Converts a multivariate distribution into a dict of plain values.
+
+    Parameters
+    ----------
+    mul_var_dist : MultivariateDistribution
+        The distribution, e.g. the mul_var_dist of a Fit.
+
+    Returns
+    -------
+    dict
+        The distribution, which can be written with json.
+
+    Raises
+    ------
+    ValueError
+        If a distribution, a parameter or a wrapper can not be stored. Only
+        the distributions of this package and wrappers of numpy ufuncs are
+        supported.
+    """
+    return {"schema": SCHEMA_NAME,
+            "version": SCHEMA_VERSION,
+            "distributions": [_distribution_to_dict(distribution)
+                              for distribution in mul_var_dist.distributions],
+            "dependencies": [list(dependency)
+                             for dependency in mul_var_dist.dependencies]}
+
+
+def from_dict(data):
+    """
+    Creates a multivariate distribution from a dict created by to_dict.
+
+    Parameters
+    ----------
+    data : dict
+        The stored distribution.
+
+    Returns
+    -------
+    MultivariateDistribution
+        The distribution.
+
+    Raises
+    ------
+    ValueError
+        If data is not a stored distribution or was stored with a newer
+        version of the schema.
+    """
+    if data.get("schema") != SCHEMA_NAME:
+        raise ValueError("The data is not a stored multivariate distribution.")
+    if data.get("version", 0) > SCHEMA_VERSION:
+        raise ValueError("The distribution was stored with version {} of the "
+                         "schema, but only versions up to {} are supported."
+                         .format(data["version"], SCHEMA_VERSION))
+    distributions = [_distribution_from_dict(distribution)
+                     for distribution in data["distributions"]]
+    dependencies = [tuple(dependency) for dependency in data["dependencies"]]
+    return MultivariateDistribution(distributions, dependencies)
+
+
+def dump(mul_var_dist, file):
+    """
+    Writes a multivariate distribution as JSON.
+
+    Parameters
+    ----------
+    mul_var_dist : MultivariateDistribution
+        The distribution, e.g. the mul_var_dist of a Fit.
+    file : str or file
+        The path of the file or a text file object.
+
+    Examples
+    --------
+    >>> import io
+    >>> from viroconcom.params import ConstantParam, FunctionParam
+    >>> shape = ConstantParam(1.5)
+    >>> scale = FunctionParam(1, 2, 0.5, "power3")
+    >>> mul_var_dist = MultivariateDistribution(
+    ...     [WeibullDistribution(shape, None, ConstantParam(3)),
+    ...      WeibullDistribution(shape, None, scale)],
+    ...     [(None, None, None), (None, None, 0)])
+    >>> file = io.StringIO()
+    >>> dump(mul_var_dist, file)
+    >>> loaded = load(io.StringIO(file.getvalue()))
+    >>> str(loaded.distributions[1].scale)
+    '1.0+2.0x^{0.5}'
+    """
+    data = to_dict(mul_var_dist)
+    if isinstance(file, str):
+        with open(file, 'w') as opened_file:
+            json.dump(data, opened_file)
+    else:
+        json.dump(data, file)
+
+
+def load(file):
+    """
+    Reads a multivariate distribution written by dump.
+
+    Parameters
+    ----------
+    file : str or file
+        The path of the file or a text file object.
+
+    Returns
+    -------
+    MultivariateDistribution
+        The distribution.
+
+    Raises
+    ------
+    ValueError
+        If the file does not contain a stored distribution.
+    """
+    if isinstance(file, str):
+        with open(file) as opened_file:
+            data = json.load(opened_file)
+    else:
+        data = json.load(file)
+    return from_dict(data)